@@ -0,0 +1,162 @@
+from Simulador import Simulador
+from Checkpoint_binario import escribir_checkpoint, leer_cabecera
+from concurrent.futures import Future, ThreadPoolExecutor
+import glob
+import os
+import re
+import time
+import numpy as np
+
+# Checkpoints automáticos en segundo plano. Conectado a un Simulador, tras cada paso comprueba
+# si han pasado cada_pasos pasos o cada_segundos segundos desde el último checkpoint; si es así,
+# copia el estado (una copia de arrays, O(N)) y un hilo aparte lo escribe en formato binario en
+# un archivo temporal que después se renombra de forma atómica, así que en el directorio solo hay
+# checkpoints completos aunque el proceso muera a mitad de una escritura. Se conservan los
+# `conservar` más recientes. Si al tocar un checkpoint el anterior aún se está escribiendo, se
+# pospone al paso siguiente en lugar de esperar.
+#
+# reanudar(sim, directorio) carga el checkpoint válido más reciente con el tiempo, los pasos y el
+# estado exactos (float64 sin conversión, mismo orden de cuerpos), de modo que continuar desde él
+# da los mismos resultados bit a bit que si la ejecución no se hubiera interrumpido.
+
+
+def _archivo(directorio: str, prefijo: str, pasos: int) -> str:
+    return os.path.join(directorio, f"{prefijo}_{pasos:012d}.bin")
+
+
+def checkpoints(directorio: str, prefijo: str = "checkpoint") -> list[str]:
+    # Checkpoints del directorio, del más antiguo al más reciente (por número de pasos)
+    patron = re.compile(re.escape(prefijo) + r"_(\d+)\.bin$")
+    encontrados = []
+    for archivo in glob.glob(os.path.join(glob.escape(directorio), f"{glob.escape(prefijo)}_*.bin")):
+        coincidencia = patron.search(os.path.basename(archivo))
+        if coincidencia:
+            encontrados.append((int(coincidencia.group(1)), archivo))
+    return [archivo for _, archivo in sorted(encontrados)]
+
+
+def es_valido(archivo: str) -> bool:
+    # Cabecera legible y archivo con todas sus columnas (no truncado)
+    try:
+        cabecera = leer_cabecera(archivo)
+        fin = max(columna["desplazamiento"] + int(np.prod(columna["forma"])) * np.dtype(columna["dtype"]).itemsize
+                  for columna in cabecera["columnas"].values())
+        return os.path.getsize(archivo) >= fin
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def ultimo_valido(directorio: str, prefijo: str = "checkpoint") -> str | None:
+    for archivo in reversed(checkpoints(directorio, prefijo)):
+        if es_valido(archivo):
+            return archivo
+    return None
+
+
+def reanudar(sim: Simulador, directorio: str, prefijo: str = "checkpoint") -> str | None:
+    # Carga en sim el checkpoint válido más reciente y devuelve su ruta (None si no hay ninguno)
+    archivo = ultimo_valido(directorio, prefijo)
+    if archivo is None:
+        return None
+    # Se carga en memoria (no perezoso), así que la rotación puede borrar el archivo
+    sim.cargar(archivo, 'binario', perezoso=False)
+    # Los pasos jerárquicos guardan el nivel de cada cuerpo entre pasos
+    niveles = leer_cabecera(archivo)["metadatos"].get("niveles")
+    if niveles is not None and hasattr(sim.integrador, 'niveles'):
+        sim.integrador.niveles = np.array(niveles, dtype=np.int64)
+    return archivo
+
+
+class AutoCheckpoint:
+    def __init__(self, directorio: str, cada_pasos: int | None = None, cada_segundos: float | None = None,
+                 conservar: int = 3, prefijo: str = "checkpoint"):
+        if cada_pasos is None and cada_segundos is None:
+            raise ValueError("Indique cada_pasos, cada_segundos o ambos.")
+        if cada_pasos is not None and cada_pasos < 1:
+            raise ValueError("El intervalo de pasos debe ser al menos 1.")
+        if cada_segundos is not None and cada_segundos <= 0:
+            raise ValueError("El intervalo de tiempo debe ser positivo.")
+        if conservar < 1:
+            raise ValueError("Hay que conservar al menos un checkpoint.")
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.cada_pasos = cada_pasos
+        self.cada_segundos = cada_segundos
+        self.conservar = conservar
+        self.prefijo = prefijo
+        self.escritos: list[str] = []  # Checkpoints terminados por este objeto
+        self.error: BaseException | None = None
+        self._ultimo_paso: int | None = None
+        self._ultima_hora = time.monotonic()
+        self._pendiente: Future | None = None
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+
+    def conectar(self, sim: Simulador):
+        self._ultimo_paso = sim.pasos
+        self._ultima_hora = time.monotonic()
+        sim.ganchos_paso.append(self)
+
+    def __call__(self, sim: Simulador):
+        if self._ultimo_paso is None:
+            self._ultimo_paso = sim.pasos
+        toca = ((self.cada_pasos is not None and sim.pasos - self._ultimo_paso >= self.cada_pasos)
+                or (self.cada_segundos is not None and time.monotonic() - self._ultima_hora >= self.cada_segundos))
+        if toca and (self._pendiente is None or self._pendiente.done()):
+            self.guardar(sim)
+
+    def guardar(self, sim: Simulador) -> Future:
+        # Copia el estado ahora y lo escribe en segundo plano; devuelve el Future de la escritura
+        self._comprobar_error()
+        ids, masa, posicion, velocidad = sim._arrays_estado()
+        metadatos = {"pasos": sim.pasos}
+        niveles = getattr(sim.integrador, 'niveles', None)
+        if niveles is not None:
+            metadatos["niveles"] = np.asarray(niveles).tolist()
+        copia = (list(ids), masa.copy(), posicion.copy(), velocidad.copy(), sim.G, sim.tiempo,
+                 sim._radios().copy(), metadatos)
+        self._ultimo_paso = sim.pasos
+        self._ultima_hora = time.monotonic()
+        self._pendiente = self._escritor.submit(self._escribir, _archivo(self.directorio, self.prefijo, sim.pasos), copia)
+        return self._pendiente
+
+    def _escribir(self, archivo: str, copia: tuple):
+        # escribir_checkpoint ya escribe en un temporal sincronizado que sustituye al archivo
+        ids, masa, posicion, velocidad, G, tiempo, radio, metadatos = copia
+        try:
+            escribir_checkpoint(archivo, ids, masa, posicion, velocidad, G, tiempo, radio, metadatos=metadatos)
+            self.escritos.append(archivo)
+            self._rotar()
+        except BaseException as e:
+            self.error = e
+            raise
+
+    def _rotar(self):
+        for antiguo in checkpoints(self.directorio, self.prefijo)[:-self.conservar]:
+            os.remove(antiguo)
+
+    def _comprobar_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError(f"Error al escribir el checkpoint: {error}") from error
+
+    def vaciar(self):
+        # Espera a que termine la escritura en curso
+        if self._pendiente is not None:
+            try:
+                self._pendiente.result()
+            except BaseException:
+                pass
+        self._comprobar_error()
+
+    def cerrar(self):
+        try:
+            self.vaciar()
+        finally:
+            self._escritor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
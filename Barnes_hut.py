@@ -0,0 +1,213 @@
+import numpy as np
+
+# Bits por eje de las claves de Morton: 3 * 21 = 63 bits, que caben en un uint64
+PROFUNDIDAD_MAXIMA = 21
+
+# Cuerpos que se recorren a la vez por el árbol, para acotar la memoria de la frontera de pares
+CUERPOS_POR_BLOQUE = 4096
+
+
+def _separar_bits(v: np.ndarray) -> np.ndarray:
+    # Intercala dos ceros entre cada uno de los 21 bits inferiores de v
+    v = v & np.uint64(0x1fffff)
+    v = (v | v << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    v = (v | v << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    v = (v | v << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    v = (v | v << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    v = (v | v << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return v
+
+
+def _sumas_por_rango(valores: np.ndarray, inicio: np.ndarray, fin: np.ndarray) -> np.ndarray:
+    # Suma valores[inicio[k]:fin[k]] para cada k (rangos no vacíos y ordenados)
+    relleno = np.concatenate([valores, np.zeros((1,) + valores.shape[1:])])
+    limites = np.column_stack([inicio, fin]).ravel()
+    return np.add.reduceat(relleno, limites, axis=0)[0::2]
+
+
+class Octree:
+    # Octree lineal construido nivel a nivel sobre los cuerpos ordenados por clave de Morton.
+    # Cada nodo cubre un rango contiguo [inicio, inicio + cuenta) de self.orden y sus hijos
+    # son los nodos contiguos [hijo_inicio, hijo_inicio + hijo_num).
+    def __init__(self, masa: np.ndarray, posicion: np.ndarray):
+        num_cuerpos = len(masa)
+        minimo = posicion.min(axis=0)
+        maximo = posicion.max(axis=0)
+        centro = (minimo + maximo) / 2
+        semilado = float((maximo - minimo).max()) / 2
+        if semilado == 0:
+            semilado = 1.0
+        semilado *= 1 + 1e-9  # Margen para que ningún cuerpo quede justo en el borde
+        self.lado_raiz = 2 * semilado
+
+        celdas = 1 << PROFUNDIDAD_MAXIMA
+        q = np.floor((posicion - (centro - semilado)) / self.lado_raiz * celdas)
+        q = np.clip(q, 0, celdas - 1).astype(np.uint64)
+        claves = (_separar_bits(q[:, 0])
+                  | _separar_bits(q[:, 1]) << np.uint64(1)
+                  | _separar_bits(q[:, 2]) << np.uint64(2))
+
+        self.orden = np.argsort(claves, kind='stable')
+        claves = claves[self.orden]
+        masa_ord = masa[self.orden]
+        momento_ord = masa_ord[:, None] * posicion[self.orden]
+
+        # Rango de cada cuerpo (por índice original) dentro del orden de Morton
+        self.rango = np.empty(num_cuerpos, dtype=np.int64)
+        self.rango[self.orden] = np.arange(num_cuerpos)
+
+        inicios = [np.array([0])]
+        cuentas = [np.array([num_cuerpos])]
+        niveles = [np.array([0])]
+        hijo_inicio = []
+        hijo_num = []
+        total_nodos = 1
+        nivel_inicio = np.array([0])
+        nivel_cuenta = np.array([num_cuerpos])
+
+        for nivel in range(PROFUNDIDAD_MAXIMA):
+            internos = nivel_cuenta > 1
+            h_inicio = np.zeros(len(nivel_inicio), dtype=np.int64)
+            h_num = np.zeros(len(nivel_inicio), dtype=np.int64)
+            if not np.any(internos):
+                hijo_inicio.append(h_inicio)
+                hijo_num.append(h_num)
+                break
+
+            # Posiciones del orden de Morton que pertenecen a nodos que se subdividen
+            marca = np.zeros(num_cuerpos + 1, dtype=np.int64)
+            np.add.at(marca, nivel_inicio[internos], 1)
+            np.add.at(marca, nivel_inicio[internos] + nivel_cuenta[internos], -1)
+            dentro = np.cumsum(marca[:-1]) > 0
+
+            prefijo = claves >> np.uint64(3 * (PROFUNDIDAD_MAXIMA - nivel - 1))
+            cambia = np.ones(num_cuerpos + 1, dtype=bool)
+            cambia[1:-1] = prefijo[1:] != prefijo[:-1]
+            dentro_ext = np.concatenate([dentro, [False]])
+            es_inicio = dentro & (cambia[:-1] | ~np.concatenate([[False], dentro[:-1]]))
+            es_fin = dentro & (cambia[1:] | ~dentro_ext[1:])
+            nuevo_inicio = np.flatnonzero(es_inicio)
+            nuevo_cuenta = np.flatnonzero(es_fin) + 1 - nuevo_inicio
+
+            # Cada hijo pertenece al último nodo interno que empieza antes que él
+            padres = np.flatnonzero(internos)
+            padre_de_hijo = padres[np.searchsorted(nivel_inicio[padres], nuevo_inicio, side='right') - 1]
+            primero = np.searchsorted(padre_de_hijo, padres, side='left')
+            ultimo = np.searchsorted(padre_de_hijo, padres, side='right')
+            h_inicio[padres] = total_nodos + primero
+            h_num[padres] = ultimo - primero
+            hijo_inicio.append(h_inicio)
+            hijo_num.append(h_num)
+
+            total_nodos += len(nuevo_inicio)
+            inicios.append(nuevo_inicio)
+            cuentas.append(nuevo_cuenta)
+            niveles.append(np.full(len(nuevo_inicio), nivel + 1))
+            nivel_inicio = nuevo_inicio
+            nivel_cuenta = nuevo_cuenta
+        else:
+            # Nivel de máxima profundidad: todos sus nodos son hojas
+            hijo_inicio.append(np.zeros(len(nivel_inicio), dtype=np.int64))
+            hijo_num.append(np.zeros(len(nivel_inicio), dtype=np.int64))
+
+        self.inicio = np.concatenate(inicios)
+        self.cuenta = np.concatenate(cuentas)
+        self.hijo_inicio = np.concatenate(hijo_inicio)
+        self.hijo_num = np.concatenate(hijo_num)
+        self.lado = self.lado_raiz / 2.0 ** np.concatenate(niveles)
+
+        fin = self.inicio + self.cuenta
+        self.masa = _sumas_por_rango(masa_ord, self.inicio, fin)
+        self.centro_masa = _sumas_por_rango(momento_ord, self.inicio, fin) / self.masa[:, None]
+
+    def __len__(self) -> int:
+        return len(self.inicio)
+
+
+class MotorBarnesHut:
+    # Motor de fuerzas aproximado O(N log N): los grupos lejanos se sustituyen por su centro
+    # de masas cuando lado / distancia < theta. Con theta = 0 se recupera la suma directa.
+    def __init__(self, theta: float = 0.5):
+        if theta < 0:
+            raise ValueError("El ángulo de apertura theta no puede ser negativo.")
+        self.theta = theta
+
+    def calcular_fuerzas(self, masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+        return self._evaluar(masa, posicion, G, False)[0]
+
+    def calcular_fuerzas_y_potencial(self, masa: np.ndarray, posicion: np.ndarray,
+                                     G: float) -> tuple[np.ndarray, float, np.ndarray]:
+        # El potencial se acumula en el mismo recorrido con la misma aproximación que las fuerzas
+        fuerzas, potencial = self._evaluar(masa, posicion, G, True)
+        return fuerzas, 0.5 * float(masa @ potencial), potencial
+
+    def _evaluar(self, masa: np.ndarray, posicion: np.ndarray, G: float,
+                 con_potencial: bool) -> tuple[np.ndarray, np.ndarray | None]:
+        num_cuerpos = len(masa)
+        potencial = np.zeros(num_cuerpos) if con_potencial else None
+        if num_cuerpos < 2:
+            return np.zeros((num_cuerpos, 3)), potencial
+
+        arbol = Octree(masa, posicion)
+        aceleraciones = np.zeros((num_cuerpos, 3))
+        for inicio in range(0, num_cuerpos, CUERPOS_POR_BLOQUE):
+            cuerpos = np.arange(inicio, min(inicio + CUERPOS_POR_BLOQUE, num_cuerpos))
+            aceleraciones[cuerpos], potencial_bloque = self._recorrer(arbol, cuerpos, masa, posicion, con_potencial)
+            if con_potencial:
+                potencial[cuerpos] = G * potencial_bloque
+        return G * masa[:, None] * aceleraciones, potencial
+
+    def _recorrer(self, arbol: Octree, cuerpos: np.ndarray, masa: np.ndarray, posicion: np.ndarray,
+                  con_potencial: bool) -> tuple[np.ndarray, np.ndarray | None]:
+        # Recorrido vectorizado: la frontera es una lista de pares (cuerpo local, nodo)
+        num_local = len(cuerpos)
+        aceleraciones = np.zeros((num_local, 3))
+        potencial = np.zeros(num_local) if con_potencial else None
+        theta2 = self.theta ** 2
+        par_cuerpo = np.arange(num_local)
+        par_nodo = np.zeros(num_local, dtype=np.int64)
+
+        while par_cuerpo.size:
+            global_cuerpo = cuerpos[par_cuerpo]
+            r = arbol.centro_masa[par_nodo] - posicion[global_cuerpo]
+            distancia2 = np.einsum('ij,ij->i', r, r)
+            rango = arbol.rango[global_cuerpo]
+            contiene = (arbol.inicio[par_nodo] <= rango) & (rango < arbol.inicio[par_nodo] + arbol.cuenta[par_nodo])
+            hoja = arbol.hijo_num[par_nodo] == 0
+            lejano = ~contiene & (arbol.lado[par_nodo] ** 2 < theta2 * distancia2)
+            aceptar = lejano | hoja
+
+            masa_nodo = arbol.masa[par_nodo][aceptar]
+            r_acc = r[aceptar]
+            # En una hoja que contiene al propio cuerpo se descuenta su aportación
+            propio = contiene[aceptar]
+            if np.any(propio):
+                m_propia = masa[global_cuerpo[aceptar][propio]]
+                masa_resto = masa_nodo[propio] - m_propia
+                centro_resto = np.zeros((len(m_propia), 3))
+                validos = masa_resto > 0
+                centro_resto[validos] = ((masa_nodo[propio][validos, None] * arbol.centro_masa[par_nodo[aceptar][propio][validos]]
+                                          - m_propia[validos, None] * posicion[global_cuerpo[aceptar][propio][validos]])
+                                         / masa_resto[validos, None])
+                r_acc[propio] = np.where(validos[:, None],
+                                         centro_resto - posicion[global_cuerpo[aceptar][propio]], 0.0)
+                masa_nodo[propio] = np.maximum(masa_resto, 0.0)
+
+            d2_acc = np.einsum('ij,ij->i', r_acc, r_acc)
+            inv_d = np.sqrt(d2_acc)
+            np.divide(1.0, inv_d, out=inv_d, where=d2_acc > 0)
+            peso = masa_nodo * inv_d * inv_d * inv_d
+            destino = par_cuerpo[aceptar]
+            for eje in range(3):
+                aceleraciones[:, eje] += np.bincount(destino, weights=peso * r_acc[:, eje], minlength=num_local)
+            if con_potencial:
+                potencial -= np.bincount(destino, weights=masa_nodo * inv_d, minlength=num_local)
+
+            # Los nodos internos no aceptados se abren en sus hijos
+            abrir = ~aceptar
+            num_hijos = arbol.hijo_num[par_nodo[abrir]]
+            total = int(num_hijos.sum())
+            desplazamiento = np.arange(total) - np.repeat(np.cumsum(num_hijos) - num_hijos, num_hijos)
+            par_nodo = np.repeat(arbol.hijo_inicio[par_nodo[abrir]], num_hijos) + desplazamiento
+            par_cuerpo = np.repeat(par_cuerpo[abrir], num_hijos)
+        return aceleraciones, potencial
@@ -0,0 +1,194 @@
+from Simulador import Simulador
+from Cuerpos_celestes import CuerpoCeleste
+from Clase_vector_3D import Vector3D
+from Condiciones_iniciales import esfera_plummer
+from Barnes_hut import MotorBarnesHut
+from Particula_malla import MotorParticulaMalla
+from Fuerzas_paralelas import MotorParalelo
+from Precision_mixta import MotorPrecisionMixta
+from collections.abc import Callable
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+# Pruebas de rendimiento de los caminos críticos del simulador. Cada caso se mide sobre una
+# esfera de Plummer con semilla fija y el resultado es un JSON que se puede comparar entre versiones:
+#   python Benchmarks.py --tamanos 10 100 1000 --motores directo barnes_hut --salida resultados.json
+TAMANOS = (10, 100, 1000, 10_000, 100_000)
+MOTORES: dict[str, Callable] = {
+    'directo': lambda: None,
+    'barnes_hut': lambda: MotorBarnesHut(theta=0.5),
+    'malla': lambda: MotorParticulaMalla(celdas=64),
+    'paralelo': lambda: MotorParalelo(),
+    'mixta': lambda: MotorPrecisionMixta(),
+}
+# Los motores O(N^2) se omiten por encima de este número de pares (el bucle de objetos, por encima
+# de MAX_PARES_OBJETOS) para que la suite completa termine en un tiempo razonable. Un par es cada
+# pareja de cuerpos distintos, N(N-1)/2, como en el contador pares_evaluados de Instrumentacion.
+MAX_PARES = 1e9
+MAX_PARES_OBJETOS = 1e6
+MOTORES_CUADRATICOS = ('directo', 'paralelo', 'mixta')
+DT = 1e-4
+
+
+def _cronometrar(funcion: Callable[[], None], presupuesto: float, max_repeticiones: int = 50) -> tuple[float, int]:
+    # Tiempo medio por llamada: repite hasta agotar el presupuesto de segundos (al menos una vez)
+    repeticiones = 0
+    inicio = time.perf_counter()
+    while True:
+        funcion()
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= presupuesto or repeticiones >= max_repeticiones:
+            return transcurrido / repeticiones, repeticiones
+
+
+def _memoria_pico(funcion: Callable[[], None]) -> int:
+    # Memoria pico (bytes) reservada durante una llamada, medida aparte para no afectar a los tiempos
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def crear_simulador(n: int, almacenamiento: str = 'arrays', motor=None, semilla: int = 0) -> Simulador:
+    masa, posicion, velocidad = esfera_plummer(n, semilla=semilla)
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, motor=motor)
+    ids = [f"c{i}" for i in range(n)]
+    if sim.estado is not None:
+        sim.estado.agregar_lote(ids, masa, posicion, velocidad)
+    else:
+        for c_id, m, pos, vel in zip(ids, masa.tolist(), posicion.tolist(), velocidad.tolist()):
+            sim.cuerpos[c_id] = CuerpoCeleste(c_id, m, Vector3D(*pos), Vector3D(*vel))
+    return sim
+
+
+def _operaciones(sim: Simulador, directorio: str) -> dict[str, Callable[[], None]]:
+    def diagnosticos():
+        # Sin vaciar la caché de fuerzas, las repeticiones reutilizarían la primera evaluación
+        sim._cache_fuerzas = None
+        sim.diagnosticos()
+
+    operaciones = {
+        'calcular_fuerzas': sim.calcular_fuerzas,
+        'paso_simulacion': lambda: sim.paso_simulacion(DT),
+        'ejecutar_paso': lambda: sim.ejecutar(1, DT),
+        'calcular_fuerzas_y_potencial': sim.calcular_fuerzas_y_potencial,
+        'diagnosticos': diagnosticos,
+    }
+    for formato in ('binario', 'csv', 'json'):
+        archivo = os.path.join(directorio, f"estado.{formato}")
+        operaciones[f'guardar_{formato}'] = lambda archivo=archivo, formato=formato: sim.guardar(archivo, formato)
+        operaciones[f'cargar_{formato}'] = lambda archivo=archivo, formato=formato: sim.cargar(archivo, formato)
+    return operaciones
+
+
+def medir_caso(nombre_motor: str, n: int, almacenamiento: str = 'arrays', presupuesto: float = 0.5,
+               semilla: int = 0) -> list[dict]:
+    motor = MOTORES[nombre_motor]()
+    sim = crear_simulador(n, almacenamiento, motor, semilla)
+    pares = n * (n - 1) // 2
+    resultados = []
+    try:
+        with tempfile.TemporaryDirectory() as directorio, contextlib.redirect_stdout(io.StringIO()):
+            for operacion, funcion in _operaciones(sim, directorio).items():
+                # Cada cargar lee lo que escribió el guardar anterior, que ya se ha medido
+                segundos, repeticiones = _cronometrar(funcion, presupuesto)
+                resultado = {
+                    "motor": nombre_motor,
+                    "almacenamiento": almacenamiento,
+                    "n": n,
+                    "operacion": operacion,
+                    "segundos": segundos,
+                    "repeticiones": repeticiones,
+                    "memoria_pico_bytes": _memoria_pico(funcion),
+                }
+                if operacion in ('paso_simulacion', 'ejecutar_paso'):
+                    resultado["pasos_por_segundo"] = 1.0 / segundos
+                # Con motores aproximados cuenta los pares de la suma directa equivalente
+                if operacion in ('calcular_fuerzas', 'calcular_fuerzas_y_potencial', 'ejecutar_paso'):
+                    resultado["pares_por_segundo"] = pares / segundos
+                resultados.append(resultado)
+    finally:
+        if hasattr(motor, 'cerrar'):
+            motor.cerrar()
+    return resultados
+
+
+def _omitir(nombre_motor: str, n: int, almacenamiento: str) -> bool:
+    pares = n * (n - 1) // 2
+    if almacenamiento == 'objetos' and pares > MAX_PARES_OBJETOS:
+        return True
+    return nombre_motor in MOTORES_CUADRATICOS and pares > MAX_PARES
+
+
+def ejecutar_benchmarks(tamanos=TAMANOS, motores=tuple(MOTORES), almacenamientos=('arrays',),
+                        presupuesto: float = 0.5, semilla: int = 0, informe: Callable[[dict], None] | None = None) -> dict:
+    resultados, omitidos = [], []
+    for almacenamiento in almacenamientos:
+        for nombre_motor in motores:
+            for n in tamanos:
+                if _omitir(nombre_motor, n, almacenamiento):
+                    omitidos.append({"motor": nombre_motor, "almacenamiento": almacenamiento, "n": n})
+                    continue
+                for resultado in medir_caso(nombre_motor, n, almacenamiento, presupuesto, semilla):
+                    resultados.append(resultado)
+                    if informe is not None:
+                        informe(resultado)
+    return {
+        "entorno": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "procesadores": os.cpu_count(),
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "semilla": semilla,
+        },
+        "resultados": resultados,
+        "omitidos": omitidos,
+    }
+
+
+def _mostrar(resultado: dict):
+    ritmo = ""
+    if "pasos_por_segundo" in resultado:
+        ritmo += f"  {resultado['pasos_por_segundo']:.3g} pasos/s"
+    if "pares_por_segundo" in resultado:
+        ritmo += f"  {resultado['pares_por_segundo']:.3g} pares/s"
+    print(f"{resultado['motor']:>10} {resultado['almacenamiento']:>7} N={resultado['n']:<7} "
+          f"{resultado['operacion']:<28} {resultado['segundos']:.3e} s  "
+          f"{resultado['memoria_pico_bytes'] / 1e6:.1f} MB{ritmo}", file=sys.stderr)
+
+
+def main(argumentos: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento del simulador de N cuerpos.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--motores", nargs="+", choices=list(MOTORES), default=list(MOTORES))
+    parser.add_argument("--almacenamientos", nargs="+", choices=['objetos', 'arrays'], default=['arrays'])
+    parser.add_argument("--presupuesto", type=float, default=0.5, help="Segundos de medida por operación.")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, salida estándar).")
+    args = parser.parse_args(argumentos)
+
+    informe = ejecutar_benchmarks(args.tamanos, args.motores, args.almacenamientos, args.presupuesto,
+                                  args.semilla, informe=_mostrar)
+    texto = json.dumps(informe, indent=2)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
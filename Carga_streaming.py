@@ -0,0 +1,132 @@
+from collections.abc import Iterator
+from itertools import islice, chain
+import csv
+import numpy as np
+
+# Columnas del CSV que escribe Simulador.guardar, seguidas del radio (opcional al leer: los
+# archivos sin él dan radio 0)
+COLUMNAS_CSV = ['id', 'masa', 'pos_x', 'pos_y', 'pos_z', 'vel_x', 'vel_y', 'vel_z']
+COLUMNA_RADIO = 'radio'
+FILAS_POR_BLOQUE = 50_000
+
+# Motivos por los que se descarta una fila
+COLUMNAS_INCORRECTAS = "número de columnas incorrecto"
+VALOR_NO_NUMERICO = "valor no numérico"
+MASA_NO_POSITIVA = "masa no positiva"
+RADIO_NEGATIVO = "radio negativo"
+ID_DUPLICADO = "ID duplicado"
+
+
+class ResumenCarga:
+    # Recuento agregado de las filas descartadas durante una carga, con algunos ejemplos
+    MAX_EJEMPLOS = 5
+
+    def __init__(self):
+        self.cargados = 0
+        self.errores: dict[str, int] = {}
+        self.ejemplos: list[tuple[int, str, list[str]]] = []
+
+    def registrar(self, motivo: str, filas: list[int], contenido: list[list[str]]):
+        if not filas:
+            return
+        self.errores[motivo] = self.errores.get(motivo, 0) + len(filas)
+        for fila, datos in zip(filas, contenido):
+            if len(self.ejemplos) >= self.MAX_EJEMPLOS:
+                break
+            self.ejemplos.append((fila, motivo, datos))
+
+    @property
+    def total_errores(self) -> int:
+        return sum(self.errores.values())
+
+    def __str__(self) -> str:
+        if not self.errores:
+            return f"Se cargaron {self.cargados} cuerpos sin errores."
+        detalle = ", ".join(f"{cuenta} por {motivo}" for motivo, cuenta in self.errores.items())
+        lineas = [f"Se omitieron {self.total_errores} filas ({detalle}). Ejemplos:"]
+        lineas += [f"  fila {fila} ({motivo}): {datos}" for fila, motivo, datos in self.ejemplos]
+        return "\n".join(lineas)
+
+
+def _convertir(texto: list[list[str]], num_columnas: int) -> tuple[np.ndarray, np.ndarray]:
+    # Convierte las columnas numéricas de todo el bloque a la vez; solo si alguna falla
+    # se repite fila a fila para localizar las erróneas. Devuelve (valores, filas válidas).
+    try:
+        valores = np.fromiter(map(float, chain.from_iterable(texto)), dtype=np.float64,
+                              count=num_columnas * len(texto))
+        return valores.reshape(-1, num_columnas), np.ones(len(texto), dtype=bool)
+    except ValueError:
+        valores = np.zeros((len(texto), num_columnas))
+        validas = np.ones(len(texto), dtype=bool)
+        for i, fila in enumerate(texto):
+            try:
+                valores[i] = [float(x) for x in fila]
+            except ValueError:
+                validas[i] = False
+        return valores, validas
+
+
+def leer_csv_por_bloques(archivo: str, resumen: ResumenCarga | None = None, filas_por_bloque: int = FILAS_POR_BLOQUE,
+                         ids_existentes=()) -> Iterator[tuple[list[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    # Lee un CSV de cuerpos (separado por ';' y con encabezado) en bloques de filas_por_bloque,
+    # y devuelve (ids, masa, posicion, velocidad, radio) por bloque con las filas válidas. La
+    # memoria usada no depende del tamaño del archivo, salvo el conjunto de IDs ya leídos. Si el
+    # encabezado empieza por COLUMNAS_CSV y tiene más columnas (el radio y los elementos
+    # orbitales que añade guardar), las filas deben tenerlas todas; se lee el radio si la
+    # columna siguiente a COLUMNAS_CSV es COLUMNA_RADIO y las demás se ignoran.
+    resumen = resumen if resumen is not None else ResumenCarga()
+    vistos = set(ids_existentes)
+    with open(archivo, 'r', newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        encabezado = next(reader, None)
+        num_columnas = len(COLUMNAS_CSV)
+        con_radio = False
+        if encabezado is not None and encabezado[:num_columnas] == COLUMNAS_CSV:
+            con_radio = encabezado[num_columnas:num_columnas + 1] == [COLUMNA_RADIO]
+            num_columnas = len(encabezado)
+        fin_numericas = len(COLUMNAS_CSV) + con_radio
+        primera = 1
+        while True:
+            filas = list(islice(reader, filas_por_bloque))
+            if not filas:
+                break
+            numeros = range(primera, primera + len(filas))
+            primera += len(filas)
+
+            completas = [len(fila) == num_columnas for fila in filas]
+            resumen.registrar(COLUMNAS_INCORRECTAS, [n for n, ok in zip(numeros, completas) if not ok],
+                              [fila for fila, ok in zip(filas, completas) if not ok])
+            filas = [fila for fila, ok in zip(filas, completas) if ok]
+            numeros = [n for n, ok in zip(numeros, completas) if ok]
+            if not filas:
+                continue
+
+            valores, validas = _convertir([fila[1:fin_numericas] for fila in filas], fin_numericas - 1)
+            resumen.registrar(VALOR_NO_NUMERICO, [n for n, ok in zip(numeros, validas) if not ok],
+                              [fila for fila, ok in zip(filas, validas) if not ok])
+            masa_positiva = valores[:, 0] > 0
+            descartadas = validas & ~masa_positiva
+            resumen.registrar(MASA_NO_POSITIVA, [n for n, d in zip(numeros, descartadas) if d],
+                              [fila for fila, d in zip(filas, descartadas) if d])
+            validas &= masa_positiva
+            if con_radio:
+                radio_negativo = validas & (valores[:, 7] < 0)
+                resumen.registrar(RADIO_NEGATIVO, [n for n, d in zip(numeros, radio_negativo) if d],
+                                  [fila for fila, d in zip(filas, radio_negativo) if d])
+                validas &= ~radio_negativo
+
+            # IDs repetidos en el archivo o ya presentes: se conserva la primera aparición
+            for i in np.flatnonzero(validas):
+                c_id = filas[i][0]
+                if c_id in vistos:
+                    validas[i] = False
+                    resumen.registrar(ID_DUPLICADO, [numeros[i]], [filas[i]])
+                else:
+                    vistos.add(c_id)
+
+            ids = [fila[0] for fila, ok in zip(filas, validas) if ok]
+            valores = valores[validas]
+            resumen.cargados += len(ids)
+            if ids:
+                radio = valores[:, 7] if con_radio else np.zeros(len(ids))
+                yield ids, valores[:, 0], valores[:, 1:4], valores[:, 4:7], radio
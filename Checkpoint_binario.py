@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import numpy as np
+
+# Formato del checkpoint binario:
+#   MAGIA (8 bytes) | longitud de la cabecera (uint64, little endian) | cabecera JSON |
+#   relleno hasta múltiplo de ALINEACION | columnas contiguas en el orden de COLUMNAS
+# La cabecera guarda G, el tiempo, el número de cuerpos y el dtype y desplazamiento de cada
+# columna, de modo que cada una se abre con numpy.memmap sin leer el resto del archivo, y un
+# diccionario opcional de metadatos JSON (p. ej. el número de pasos, para reanudar). La columna
+# elementos (N, 6), con los elementos orbitales de Elementos_orbitales.py, es opcional.
+MAGIA = b"NCUERPO1"
+ALINEACION = 64
+COLUMNAS = ("masa", "posicion", "velocidad", "radio", "ids", "elementos")
+
+
+def _alinear(desplazamiento: int) -> int:
+    return -(-desplazamiento // ALINEACION) * ALINEACION
+
+
+def escribir_checkpoint(archivo: str, ids: list[str], masa: np.ndarray, posicion: np.ndarray,
+                        velocidad: np.ndarray, G: float, tiempo: float, radio: np.ndarray | None = None,
+                        metadatos: dict | None = None, elementos: np.ndarray | None = None):
+    num_cuerpos = len(ids)
+    # Los ids se guardan como bytes UTF-8 de ancho fijo (el del id más largo)
+    ids_bytes = np.array([c_id.encode("utf-8") for c_id in ids], dtype=bytes)
+    if num_cuerpos == 0:
+        ids_bytes = np.zeros(0, dtype="S1")
+    datos = {
+        "masa": np.ascontiguousarray(masa, dtype="<f8").reshape(num_cuerpos),
+        "posicion": np.ascontiguousarray(posicion, dtype="<f8").reshape(num_cuerpos, 3),
+        "velocidad": np.ascontiguousarray(velocidad, dtype="<f8").reshape(num_cuerpos, 3),
+        "radio": np.zeros(num_cuerpos, dtype="<f8") if radio is None else np.ascontiguousarray(radio, dtype="<f8"),
+        "ids": ids_bytes,
+    }
+    if elementos is not None:
+        datos["elementos"] = np.ascontiguousarray(elementos, dtype="<f8").reshape(num_cuerpos, 6)
+
+    # La cabecera depende de los desplazamientos y estos de la longitud de la cabecera:
+    # se reserva sitio para ella y se recalcula hasta que cabe
+    reserva = 512
+    while True:
+        desplazamiento = _alinear(len(MAGIA) + 8 + reserva)
+        columnas = {}
+        for nombre in datos:
+            columnas[nombre] = {"dtype": datos[nombre].dtype.str, "forma": list(datos[nombre].shape),
+                                "desplazamiento": desplazamiento}
+            desplazamiento = _alinear(desplazamiento + datos[nombre].nbytes)
+        cabecera = json.dumps({"G": G, "tiempo": tiempo, "num_cuerpos": num_cuerpos,
+                               "columnas": columnas, "metadatos": metadatos or {}}).encode("utf-8")
+        if len(cabecera) <= reserva:
+            break
+        reserva = 2 * len(cabecera)
+
+    # Se escribe en un temporal del mismo directorio que luego sustituye al archivo de una vez:
+    # nunca se trunca un archivo que otro (p. ej. un estado cargado de forma perezosa) tenga
+    # mapeado en memoria, y un fallo a mitad deja intacto el checkpoint anterior. El temporal se
+    # sincroniza con el disco antes de sustituir, y el directorio después, para que tras un corte
+    # de corriente el nombre apunte al checkpoint completo, nuevo o anterior.
+    temporal = f"{archivo}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporal, "wb") as f:
+            f.write(MAGIA)
+            f.write(np.uint64(reserva).astype("<u8").tobytes())
+            f.write(cabecera.ljust(reserva))
+            for nombre in datos:
+                f.seek(columnas[nombre]["desplazamiento"])
+                datos[nombre].tofile(f)
+            f.truncate(desplazamiento)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, archivo)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    _sincronizar_directorio(os.path.dirname(os.path.abspath(archivo)))
+
+
+def _sincronizar_directorio(directorio: str):
+    # Lleva a disco la entrada del directorio tras os.replace; donde no se pueden abrir
+    # directorios (Windows) el sistema no lo permite ni lo necesita
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def leer_cabecera(archivo: str) -> dict:
+    with open(archivo, "rb") as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"El archivo '{archivo}' no es un checkpoint binario válido.")
+        longitud = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        return json.loads(f.read(longitud).decode("utf-8"))
+
+
+def leer_checkpoint(archivo: str, modo: str = "c") -> dict:
+    # Devuelve G, tiempo, metadatos, ids y las columnas masa, posicion, velocidad, radio (y
+    # elementos, si se guardaron) como numpy.memmap.
+    # Con modo 'c' (copia en escritura) el estado se puede modificar en memoria sin tocar el
+    # archivo; las páginas solo se leen del disco cuando se usan.
+    cabecera = leer_cabecera(archivo)
+    resultado = {"G": cabecera["G"], "tiempo": cabecera["tiempo"], "metadatos": cabecera.get("metadatos", {})}
+    if "radio" not in cabecera["columnas"]:
+        # Checkpoints anteriores a los radios: masas puntuales
+        resultado["radio"] = np.zeros(cabecera["num_cuerpos"])
+    for nombre in COLUMNAS:
+        if nombre not in cabecera["columnas"]:
+            continue
+        columna = cabecera["columnas"][nombre]
+        forma = tuple(columna["forma"])
+        if 0 in forma:
+            resultado[nombre] = np.zeros(forma, dtype=columna["dtype"])
+        else:
+            resultado[nombre] = np.memmap(archivo, dtype=columna["dtype"], mode=modo,
+                                          offset=columna["desplazamiento"], shape=forma)
+    resultado["ids"] = [c_id.decode("utf-8") for c_id in resultado["ids"].tolist()]
+    return resultado
@@ -1,6 +1,9 @@
 import math
 
 class Vector3D:
+    # Sin __dict__ por instancia: cada vector ocupa solo sus tres referencias
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x: float, y: float, z: float):
         self.x = x
         self.y = y
@@ -18,6 +21,38 @@ class Vector3D:
     def __rmul__(self, scalar: float) -> 'Vector3D':
         return self.__mul__(scalar)
 
+    # Operadores en el propio vector, sin crear objetos nuevos
+    def __iadd__(self, other: 'Vector3D') -> 'Vector3D':
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __isub__(self, other: 'Vector3D') -> 'Vector3D':
+        self.x -= other.x
+        self.y -= other.y
+        self.z -= other.z
+        return self
+
+    def __imul__(self, scalar: float) -> 'Vector3D':
+        self.x *= scalar
+        self.y *= scalar
+        self.z *= scalar
+        return self
+
+    def add_scaled(self, other: 'Vector3D', scalar: float) -> 'Vector3D':
+        # self += other * scalar (axpy) sin vector intermedio
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+        self.z += other.z * scalar
+        return self
+
+    def copy(self) -> 'Vector3D':
+        return Vector3D(self.x, self.y, self.z)
+
+    def magnitude_squared(self) -> float:
+        return self.x * self.x + self.y * self.y + self.z * self.z
+
     def magnitude(self) -> float:
         return math.sqrt(self.x**2 + self.y**2 + self.z**2)
 
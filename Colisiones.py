@@ -0,0 +1,93 @@
+import numpy as np
+
+# Bits por eje de la clave de celda (3 x 21 = 63 bits, como las claves Morton de Barnes_hut)
+BITS_POR_EJE = 21
+
+# Desplazamientos a las celdas vecinas que se examinan desde cada celda: la propia y la mitad
+# de las 26 vecinas, de modo que cada pareja de celdas se visita una sola vez
+_VECINAS = np.array([(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                     if (dx, dy, dz) >= (0, 0, 0)], dtype=np.int64)
+
+
+def _claves(celdas: np.ndarray) -> np.ndarray:
+    return (celdas[:, 0] << (2 * BITS_POR_EJE)) | (celdas[:, 1] << BITS_POR_EJE) | celdas[:, 2]
+
+
+def pares_en_contacto(posicion: np.ndarray, radio: np.ndarray) -> np.ndarray:
+    # Pares (i, j), i < j, de cuerpos que se solapan: ||r_i - r_j|| < radio_i + radio_j.
+    # Malla uniforme con celdas de lado 2 * radio máximo: dos cuerpos en contacto están en la
+    # misma celda o en celdas vecinas. Los cuerpos se ordenan por clave de celda y cada celda
+    # busca a sus vecinas con searchsorted, así que el coste es O(N log N + candidatos) en lugar
+    # de los O(N^2) de comparar todos los pares. Los cuerpos de radio 0 no chocan.
+    num_cuerpos = len(posicion)
+    radio_maximo = float(radio.max()) if num_cuerpos else 0.0
+    if num_cuerpos < 2 or radio_maximo <= 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    minimo = posicion.min(axis=0)
+    extension = float((posicion.max(axis=0) - minimo).max())
+    # Celdas más grandes si hiciera falta para que las coordenadas (con el margen de las
+    # vecinas a cada lado) quepan en BITS_POR_EJE
+    lado = max(2.0 * radio_maximo, extension / ((1 << BITS_POR_EJE) - 3))
+    celdas = np.floor((posicion - minimo) / lado).astype(np.int64) + 1  # +1: las vecinas -1 siguen >= 0
+
+    claves = _claves(celdas)
+    orden = np.argsort(claves, kind='stable')
+    claves_ordenadas = claves[orden]
+
+    candidatos_i, candidatos_j = [], []
+    for desplazamiento in _VECINAS:
+        vecinas = _claves(celdas + desplazamiento)
+        inicio = np.searchsorted(claves_ordenadas, vecinas, side='left')
+        cuenta = np.searchsorted(claves_ordenadas, vecinas, side='right') - inicio
+        # Expande cada cuerpo i con todos los cuerpos de la celda vecina
+        i = np.repeat(np.arange(num_cuerpos), cuenta)
+        desplazados = np.arange(len(i)) - np.repeat(np.cumsum(cuenta) - cuenta, cuenta)
+        j = orden[np.repeat(inicio, cuenta) + desplazados]
+        if not desplazamiento.any():
+            misma_celda = i < j  # Dentro de la misma celda, cada par una vez y sin el propio cuerpo
+            i, j = i[misma_celda], j[misma_celda]
+        candidatos_i.append(i)
+        candidatos_j.append(j)
+
+    i = np.concatenate(candidatos_i)
+    j = np.concatenate(candidatos_j)
+    r = posicion[j] - posicion[i]
+    suma_radios = radio[i] + radio[j]
+    contacto = np.einsum('ij,ij->i', r, r) < suma_radios * suma_radios
+    pares = np.column_stack([np.minimum(i, j), np.maximum(i, j)])[contacto]
+    return pares[np.lexsort((pares[:, 1], pares[:, 0]))]
+
+
+def grupos_de_colision(num_cuerpos: int, pares: np.ndarray) -> list[np.ndarray]:
+    # Componentes conexas de los pares en contacto (A-B y B-C forman un solo grupo), con
+    # unión-búsqueda sobre los índices implicados
+    padre = list(range(num_cuerpos))
+
+    def raiz(k: int) -> int:
+        while padre[k] != k:
+            padre[k] = padre[padre[k]]
+            k = padre[k]
+        return k
+
+    for i, j in pares.tolist():
+        ri, rj = raiz(i), raiz(j)
+        if ri != rj:
+            padre[max(ri, rj)] = min(ri, rj)
+
+    grupos: dict[int, list[int]] = {}
+    for k in np.unique(pares).tolist():
+        grupos.setdefault(raiz(k), []).append(k)
+    return [np.array(miembros) for miembros in grupos.values()]
+
+
+def fusionar(masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray,
+             radio: np.ndarray, grupo: np.ndarray) -> tuple[float, np.ndarray, np.ndarray, float]:
+    # Cuerpo resultante de una fusión inelástica: conserva la masa, el momento lineal (y por
+    # tanto la velocidad del centro de masas) y el volumen. Devuelve (masa, posicion, velocidad, radio).
+    m = masa[grupo]
+    masa_total = float(m.sum())
+    centro_masas = m @ posicion[grupo] / masa_total
+    velocidad_centro = m @ velocidad[grupo] / masa_total
+    radio_total = float(np.cbrt(np.sum(radio[grupo] ** 3)))
+    return masa_total, centro_masas, velocidad_centro, radio_total
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def _direcciones_aleatorias(rng: np.random.Generator, n: int) -> np.ndarray:
+    # Vectores unitarios distribuidos uniformemente sobre la esfera
+    cos_theta = rng.uniform(-1.0, 1.0, n)
+    phi = rng.uniform(0.0, 2 * np.pi, n)
+    sen_theta = np.sqrt(1.0 - cos_theta**2)
+    return np.column_stack([sen_theta * np.cos(phi), sen_theta * np.sin(phi), cos_theta])
+
+
+def esfera_plummer(n: int, masa_total: float = 1.0, radio: float = 1.0, G: float = 1.0,
+                   semilla: int = 0, radio_maximo: float = 10.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Muestreo de una esfera de Plummer en equilibrio (Aarseth, Hénon y Wielen, 1974).
+    # Devuelve (masa[n], posicion[n, 3], velocidad[n, 3]) de forma reproducible con la semilla.
+    rng = np.random.default_rng(semilla)
+    masa = np.full(n, masa_total / n)
+
+    # Radios por inversión de la masa acumulada, truncados en radio_maximo * radio
+    r = np.empty(n)
+    pendientes = np.arange(n)
+    while pendientes.size:
+        x = rng.uniform(0.0, 1.0, pendientes.size)
+        with np.errstate(divide='ignore'):
+            candidatos = 1.0 / np.sqrt(x ** (-2.0 / 3.0) - 1.0)
+        validos = candidatos <= radio_maximo
+        r[pendientes[validos]] = candidatos[validos]
+        pendientes = pendientes[~validos]
+    posicion = radio * r[:, None] * _direcciones_aleatorias(rng, n)
+
+    # Módulo de la velocidad por rechazo sobre g(q) = q^2 (1 - q^2)^(7/2)
+    q = np.empty(n)
+    pendientes = np.arange(n)
+    while pendientes.size:
+        x = rng.uniform(0.0, 1.0, pendientes.size)
+        y = rng.uniform(0.0, 0.1, pendientes.size)
+        aceptados = y < x**2 * (1.0 - x**2) ** 3.5
+        q[pendientes[aceptados]] = x[aceptados]
+        pendientes = pendientes[~aceptados]
+    velocidad_escape = np.sqrt(2.0 * G * masa_total / radio) * (1.0 + r**2) ** -0.25
+    velocidad = (q * velocidad_escape)[:, None] * _direcciones_aleatorias(rng, n)
+
+    # Sistema de referencia del centro de masas
+    posicion -= masa @ posicion / masa_total
+    velocidad -= masa @ velocidad / masa_total
+    return masa, posicion, velocidad
@@ -2,27 +2,32 @@ from Clase_vector_3D import Vector3D
 import math
 
 class CuerpoCeleste:
-    def __init__(self, id: str, masa: float, posicion: Vector3D, velocidad: Vector3D):
+    def __init__(self, id: str, masa: float, posicion: Vector3D, velocidad: Vector3D, radio: float = 0.0):
         if masa <= 0:
             raise ValueError("La masa de un cuerpo celeste debe ser mayor que cero.")
+        if radio < 0:
+            raise ValueError("El radio de un cuerpo celeste no puede ser negativo.")
         self.id = id
         self.masa = masa
-        self.posicion = posicion
-        self.velocidad = velocidad
+        self.radio = radio  # Radio físico para las colisiones; 0 para una masa puntual
+        # Copias propias, para que modificar en el sitio los vectores de un cuerpo no afecte a otro.
+        # aplicar_fuerza y mover asignan vectores nuevos: como con almacenamiento en arrays, un
+        # vector obtenido antes de avanzar conserva el estado de ese momento
+        self.posicion = posicion.copy()
+        self.velocidad = velocidad.copy()
 
     def aplicar_fuerza(self, fuerza: Vector3D, dt: float):
         # a = F/m
-        aceleracion = fuerza * (1.0 / self.masa)
         # v(t+dt) = v(t) + a * dt
-        self.velocidad = self.velocidad + aceleracion * dt
+        self.velocidad = self.velocidad.copy().add_scaled(fuerza, dt / self.masa)
 
     def mover(self, dt: float):
         # r(t+dt) = r(t) + v(t) * dt
-        self.posicion = self.posicion + self.velocidad * dt
+        self.posicion = self.posicion.copy().add_scaled(self.velocidad, dt)
 
     def energia_cinetica(self) -> float:
         # K = 0.5 * m * ||v||^2
-        return 0.5 * self.masa * (self.velocidad.magnitude()**2)
+        return 0.5 * self.masa * self.velocidad.magnitude_squared()
 
     def energia_potencial_con(self, otro: 'CuerpoCeleste', G: float) -> float:
         # U = -G * (m1 * m2) / ||r1 - r2||
@@ -37,11 +42,12 @@ class CuerpoCeleste:
             "id": self.id,
             "masa": self.masa,
             "posicion": self.posicion.to_list(),
-            "velocidad": self.velocidad.to_list()
+            "velocidad": self.velocidad.to_list(),
+            "radio": self.radio
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> 'CuerpoCeleste':
         posicion = Vector3D.from_list(data["posicion"])
         velocidad = Vector3D.from_list(data["velocidad"])
-        return cls(data["id"], data["masa"], posicion, velocidad)
\ No newline at end of file
+        return cls(data["id"], data["masa"], posicion, velocidad, data.get("radio", 0.0))
\ No newline at end of file
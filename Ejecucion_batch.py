@@ -0,0 +1,242 @@
+from Simulador import Simulador
+from Cuerpos_celestes import CuerpoCeleste
+from Clase_vector_3D import Vector3D
+from Condiciones_iniciales import esfera_plummer
+from Integradores import INTEGRADORES
+from Barnes_hut import MotorBarnesHut
+from Particula_malla import MotorParticulaMalla
+from Fuerzas_paralelas import MotorParalelo
+from Precision_mixta import MotorPrecisionMixta
+from Trayectorias import GrabadorTrayectoria
+import argparse
+import json
+import os
+import sys
+import time
+
+# Ejecución desatendida a partir de un archivo de escenario JSON, por ejemplo:
+# {
+#     "G": 1.0, "almacenamiento": "arrays",
+#     "condiciones_iniciales": {"plummer": {"n": 1000, "semilla": 0}},
+#     "integrador": "leapfrog", "motor": {"nombre": "barnes_hut", "theta": 0.5},
+#     "pasos": 1000, "dt": 0.001, "diagnosticos_cada": 100,
+#     "checkpoint_cada": 500, "checkpoint": "salida/estado_{paso}.bin",
+#     "trayectoria": {"archivo": "salida/orbitas.tray", "cada": 10}
+# }
+# Las condiciones iniciales pueden ser también {"archivo": "estado.bin", "formato": "binario"}
+# o {"cuerpos": [{"id": ..., "masa": ..., "posicion": [...], "velocidad": [...]}, ...]}.
+# Las rutas relativas se toman respecto al directorio del escenario. Los argumentos de la
+# línea de órdenes tienen prioridad sobre el escenario. Sin "G", se usa la del checkpoint si
+# las condiciones iniciales vienen de uno, y si no, el valor en unidades del SI.
+G_POR_DEFECTO = 6.67430e-11
+
+MOTORES = {
+    'directo': None,
+    'barnes_hut': MotorBarnesHut,
+    'malla': MotorParticulaMalla,
+    'paralelo': MotorParalelo,
+    'mixta': MotorPrecisionMixta,
+}
+
+ESCENARIO_POR_DEFECTO = {
+    "almacenamiento": "arrays",
+    "integrador": "euler",
+    "motor": "directo",
+    "colisiones": False,
+    "pasos": 0,
+    "dt": None,
+    "diagnosticos_cada": 0,
+    "checkpoint_cada": 0,
+    "checkpoint": "checkpoint_{paso}.bin",
+}
+
+
+def _nombre_y_parametros(especificacion) -> tuple[str, dict]:
+    # "nombre" o {"nombre": ..., parámetros...}
+    if isinstance(especificacion, str):
+        return especificacion, {}
+    parametros = dict(especificacion)
+    return parametros.pop("nombre"), parametros
+
+
+def crear_motor(especificacion):
+    if especificacion is None:
+        return None
+    nombre, parametros = _nombre_y_parametros(especificacion)
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor '{nombre}' no soportado. Use uno de: {', '.join(MOTORES)}.")
+    return MOTORES[nombre](**parametros) if MOTORES[nombre] is not None else None
+
+
+def crear_integrador_escenario(especificacion):
+    nombre, parametros = _nombre_y_parametros(especificacion)
+    if nombre not in INTEGRADORES:
+        raise ValueError(f"Integrador '{nombre}' no soportado. Use uno de: {', '.join(INTEGRADORES)}.")
+    return INTEGRADORES[nombre](**parametros)
+
+
+def _ruta(ruta: str, directorio: str) -> str:
+    return ruta if os.path.isabs(ruta) else os.path.join(directorio, ruta)
+
+
+def _cargar_condiciones(sim: Simulador, condiciones: dict, directorio: str, G: float | None = None):
+    # G es la del escenario, si la indica: tiene prioridad sobre la del checkpoint
+    if "archivo" in condiciones:
+        archivo = _ruta(condiciones["archivo"], directorio)
+        if not os.path.exists(archivo):
+            raise ValueError(f"El archivo '{archivo}' no se encontró.")
+        sim.cargar(archivo, condiciones.get("formato", "binario"))
+        if G is not None:
+            sim.G = G
+    elif "plummer" in condiciones:
+        masa, posicion, velocidad = esfera_plummer(G=sim.G, **condiciones["plummer"])
+        ids = [f"c{i}" for i in range(len(masa))]
+        if sim.estado is not None:
+            sim.estado.agregar_lote(ids, masa, posicion, velocidad)
+        else:
+            for c_id, m, pos, vel in zip(ids, masa.tolist(), posicion.tolist(), velocidad.tolist()):
+                sim.cuerpos[c_id] = CuerpoCeleste(c_id, m, Vector3D(*pos), Vector3D(*vel))
+    elif "cuerpos" in condiciones:
+        for datos in condiciones["cuerpos"]:
+            sim.cuerpos[datos["id"]] = CuerpoCeleste.from_dict(datos)
+    else:
+        raise ValueError("Las condiciones iniciales deben indicar 'archivo', 'plummer' o 'cuerpos'.")
+    if not sim.cuerpos:
+        raise ValueError("El escenario no tiene cuerpos.")
+
+
+def _serializable(diagnosticos: dict) -> dict:
+    return {clave: valor.to_list() if isinstance(valor, Vector3D) else valor for clave, valor in diagnosticos.items()}
+
+
+def ejecutar_escenario(escenario: dict, directorio: str = ".") -> dict:
+    # Ejecuta un escenario completo y devuelve el resumen de la ejecución
+    config = {**ESCENARIO_POR_DEFECTO, **escenario}
+    if config["dt"] is None:
+        raise ValueError("El escenario debe indicar el paso de tiempo 'dt'.")
+    if "condiciones_iniciales" not in config:
+        raise ValueError("El escenario debe indicar las 'condiciones_iniciales'.")
+
+    motor = crear_motor(config["motor"])
+    sim = Simulador(G=config.get("G", G_POR_DEFECTO), almacenamiento=config["almacenamiento"], motor=motor,
+                    integrador=crear_integrador_escenario(config["integrador"]), colisiones=config["colisiones"])
+    grabador = None
+    salida_diagnosticos = None
+    checkpoints: list[str] = []
+    try:
+        _cargar_condiciones(sim, config["condiciones_iniciales"], directorio, config.get("G"))
+        cuerpos_iniciales = len(sim.cuerpos)
+        diagnosticos_iniciales = sim.diagnosticos()
+        sim.instrumentacion.activar()
+
+        if config["checkpoint_cada"]:
+            plantilla = _ruta(config["checkpoint"], directorio)
+
+            def guardar_checkpoint(simulador: Simulador):
+                if simulador.pasos % config["checkpoint_cada"] == 0:
+                    archivo = plantilla.format(paso=simulador.pasos)
+                    os.makedirs(os.path.dirname(archivo) or ".", exist_ok=True)
+                    simulador.guardar(archivo, 'binario')
+                    checkpoints.append(archivo)
+
+            sim.ganchos_paso.append(guardar_checkpoint)
+
+        if "trayectoria" in config:
+            archivo = _ruta(config["trayectoria"]["archivo"], directorio)
+            os.makedirs(os.path.dirname(archivo) or ".", exist_ok=True)
+            grabador = GrabadorTrayectoria(archivo, cada=config["trayectoria"].get("cada", 1))
+            grabador.conectar(sim)
+
+        if "salida_diagnosticos" in config:
+            salida_diagnosticos = open(_ruta(config["salida_diagnosticos"], directorio), 'w')
+
+        def registrar(diagnosticos: dict):
+            diagnosticos["paso"] = sim.pasos
+            linea = json.dumps(_serializable(diagnosticos))
+            if salida_diagnosticos is not None:
+                salida_diagnosticos.write(linea + "\n")
+            else:
+                print(linea)
+
+        inicio = time.perf_counter()
+        sim.ejecutar(config["pasos"], config["dt"], config["diagnosticos_cada"], callback=registrar)
+        segundos = time.perf_counter() - inicio
+        diagnosticos_finales = sim.diagnosticos()
+    finally:
+        if grabador is not None:
+            grabador.cerrar()
+        if salida_diagnosticos is not None:
+            salida_diagnosticos.close()
+        if hasattr(motor, 'cerrar'):
+            motor.cerrar()
+
+    energia_inicial = diagnosticos_iniciales["energia_total"]
+    return {
+        "pasos": config["pasos"],
+        "dt": config["dt"],
+        "tiempo_simulado": sim.tiempo,
+        "segundos": segundos,
+        "pasos_por_segundo": config["pasos"] / segundos if segundos > 0 else None,
+        "cuerpos_iniciales": cuerpos_iniciales,
+        "cuerpos_finales": len(sim.cuerpos),
+        "energia_inicial": energia_inicial,
+        "energia_final": diagnosticos_finales["energia_total"],
+        "error_relativo_energia": (abs(diagnosticos_finales["energia_total"] / energia_inicial - 1)
+                                   if energia_inicial else None),
+        "momento_lineal_final": diagnosticos_finales["momento_lineal"].to_list(),
+        "checkpoints": checkpoints,
+        "instrumentacion": sim.instrumentacion.a_dict(),
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ejecución desatendida del simulador de N cuerpos.")
+    parser.add_argument("--escenario", help="Archivo JSON con el escenario.")
+    parser.add_argument("--condiciones", help="Archivo de condiciones iniciales (sustituye al del escenario).")
+    parser.add_argument("--formato", default=None, choices=['json', 'csv', 'binario'],
+                        help="Formato del archivo de condiciones iniciales.")
+    parser.add_argument("--pasos", type=int)
+    parser.add_argument("--dt", type=float)
+    parser.add_argument("--G", type=float)
+    parser.add_argument("--almacenamiento", choices=['objetos', 'arrays'])
+    parser.add_argument("--integrador", choices=list(INTEGRADORES))
+    parser.add_argument("--motor", choices=list(MOTORES))
+    parser.add_argument("--colisiones", action="store_true", default=None)
+    parser.add_argument("--diagnosticos-cada", type=int, dest="diagnosticos_cada")
+    parser.add_argument("--salida-diagnosticos", dest="salida_diagnosticos",
+                        help="Archivo JSON Lines para los diagnósticos (por defecto, salida estándar).")
+    parser.add_argument("--checkpoint-cada", type=int, dest="checkpoint_cada")
+    parser.add_argument("--checkpoint", help="Plantilla de los checkpoints, p. ej. 'salida/estado_{paso}.bin'.")
+    parser.add_argument("--resumen", help="Archivo JSON donde escribir el resumen final.")
+    return parser
+
+
+def ejecutar_batch(argumentos: list[str]) -> int:
+    # Punto de entrada de main.py con argumentos. Devuelve el código de salida del proceso.
+    args = _parser().parse_args(argumentos)
+    escenario, directorio = {}, "."
+    try:
+        if args.escenario:
+            with open(args.escenario) as f:
+                escenario = json.load(f)
+            directorio = os.path.dirname(os.path.abspath(args.escenario))
+        for clave in ("pasos", "dt", "G", "almacenamiento", "integrador", "motor", "colisiones",
+                      "diagnosticos_cada", "salida_diagnosticos", "checkpoint_cada", "checkpoint"):
+            valor = getattr(args, clave)
+            if valor is not None:
+                # Las rutas de la línea de órdenes son relativas al directorio actual
+                escenario[clave] = os.path.abspath(valor) if clave in ("salida_diagnosticos", "checkpoint") else valor
+        if args.condiciones:
+            escenario["condiciones_iniciales"] = {"archivo": os.path.abspath(args.condiciones),
+                                                  "formato": args.formato or "binario"}
+        resumen = ejecutar_escenario(escenario, directorio)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"Error en la ejecución: {e}", file=sys.stderr)
+        return 1
+
+    texto = json.dumps(resumen, indent=2)
+    if args.resumen:
+        with open(args.resumen, 'w') as f:
+            f.write(texto)
+    print(texto)
+    return 0
@@ -0,0 +1,183 @@
+import numpy as np
+
+# Conversión vectorizada entre estado cartesiano (posición y velocidad relativas a un centro) y
+# elementos orbitales osculadores. Los elementos van en la última dimensión, en este orden:
+ELEMENTOS = ('semieje_mayor', 'excentricidad', 'inclinacion', 'longitud_nodo', 'argumento_periapsis',
+             'anomalia_media')
+# Ángulos en radianes. El semieje mayor es negativo en órbitas hiperbólicas (infinito en las
+# parabólicas), y su anomalía media es la hiperbólica (e sinh F - F), sin reducir a [0, 2 pi).
+# En órbitas ecuatoriales (sin línea de nodos) la longitud del nodo es 0, y en las circulares
+# (sin periapsis) el argumento del periapsis es 0 y la anomalía se mide desde el nodo.
+#
+# Todas las funciones aceptan cualquier número de dimensiones delante de la última (un estado
+# (N, 3), una trayectoria (marcos, N, 3)...), sin bucles de Python por cuerpo.
+
+# Por debajo de esta excentricidad la órbita se trata como circular, y por debajo de esta
+# fracción de |h| el vector nodal se trata como nulo (órbita ecuatorial)
+TOLERANCIA = 1e-11
+ITERACIONES_KEPLER = 50
+# Marcos de trayectoria que se convierten a la vez, para acotar la memoria temporal
+MARCOS_POR_BLOQUE = 1024
+
+
+def _punto(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.einsum('...k,...k->...', x, y)
+
+
+def _anomalia_media(nu: np.ndarray, e: np.ndarray) -> np.ndarray:
+    # De la anomalía verdadera a la media, según el tipo de órbita
+    media = np.empty_like(nu)
+    eliptica = e < 1
+    hiperbolica = e > 1
+    n, ee = nu[eliptica], e[eliptica]
+    E = 2 * np.arctan2(np.sqrt(1 - ee) * np.sin(n / 2), np.sqrt(1 + ee) * np.cos(n / 2))
+    media[eliptica] = np.mod(E - ee * np.sin(E), 2 * np.pi)
+    if hiperbolica.any():
+        n, ee = nu[hiperbolica], e[hiperbolica]
+        F = 2 * np.arctanh(np.sqrt((ee - 1) / (ee + 1)) * np.tan(n / 2))
+        media[hiperbolica] = ee * np.sinh(F) - F
+    parabolica = ~(eliptica | hiperbolica)
+    if parabolica.any():
+        D = np.tan(nu[parabolica] / 2)  # Ecuación de Barker
+        media[parabolica] = D + D ** 3 / 3
+    return media
+
+
+def _newton(x: np.ndarray, paso) -> np.ndarray:
+    # Newton en el sitio sobre un array plano; paso(x, filas) da la corrección de esas filas.
+    # Cada iteración trabaja solo con las filas que aún no han convergido (las órbitas casi
+    # parabólicas tardan más que el resto).
+    filas = np.arange(len(x))
+    for _ in range(ITERACIONES_KEPLER):
+        delta = paso(x[filas], filas)
+        x[filas] -= delta
+        filas = filas[np.abs(delta) > 1e-15 * np.maximum(1.0, np.abs(x[filas]))]
+        if len(filas) == 0:
+            break
+    return x
+
+
+def _anomalia_verdadera(media: np.ndarray, e: np.ndarray) -> np.ndarray:
+    # Resuelve la ecuación de Kepler (elíptica o hiperbólica) y devuelve la anomalía verdadera.
+    # Las órbitas parabólicas no tienen semieje mayor finito y dan NaN.
+    nu = np.full_like(media, np.nan)
+    eliptica = e < 1
+    M, ee = np.mod(media[eliptica], 2 * np.pi), e[eliptica]
+    E = _newton(M + 0.85 * ee * np.sign(np.sin(M)),  # Estimación inicial de Danby
+                lambda E, k: (E - ee[k] * np.sin(E) - M[k]) / (1 - ee[k] * np.cos(E)))
+    nu[eliptica] = 2 * np.arctan2(np.sqrt(1 + ee) * np.sin(E / 2), np.sqrt(1 - ee) * np.cos(E / 2))
+
+    hiperbolica = e > 1
+    if hiperbolica.any():
+        M, ee = media[hiperbolica], e[hiperbolica]
+        F = _newton(np.sign(M) * np.log(2 * np.abs(M) / ee + 1.8),
+                    lambda F, k: (ee[k] * np.sinh(F) - F - M[k]) / (ee[k] * np.cosh(F) - 1))
+        nu[hiperbolica] = 2 * np.arctan(np.sqrt((ee + 1) / (ee - 1)) * np.tanh(F / 2))
+    return nu
+
+
+def cartesianas_a_elementos(posicion: np.ndarray, velocidad: np.ndarray, mu) -> np.ndarray:
+    # posicion y velocidad (..., 3) relativas al centro, mu = G * masa del centro (o de las dos
+    # masas) con la forma de las dimensiones delanteras o un escalar. Devuelve (..., 6).
+    posicion = np.asarray(posicion, dtype=float)
+    velocidad = np.asarray(velocidad, dtype=float)
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), posicion.shape[:-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.sqrt(_punto(posicion, posicion))
+        v2 = _punto(velocidad, velocidad)
+        h = np.cross(posicion, velocidad)
+        norma_h = np.sqrt(_punto(h, h))
+        h_unitario = h / norma_h[..., None]
+        # Vector nodal z x h; sin él (órbita ecuatorial) el eje x hace de línea de nodos
+        nodo = np.stack((-h[..., 1], h[..., 0], np.zeros_like(r)), axis=-1)
+        norma_nodo = np.sqrt(_punto(nodo, nodo))
+        ecuatorial = norma_nodo <= TOLERANCIA * norma_h
+        nodo = np.where(ecuatorial[..., None], [1.0, 0.0, 0.0], nodo / norma_nodo[..., None])
+        # Vector de excentricidad; sin él (órbita circular) el nodo hace de periapsis
+        vector_e = ((v2 - mu / r)[..., None] * posicion - _punto(posicion, velocidad)[..., None] * velocidad) / mu[..., None]
+        e = np.sqrt(_punto(vector_e, vector_e))
+        circular = e <= TOLERANCIA
+        periapsis = np.where(circular[..., None], nodo, vector_e / e[..., None])
+
+        elementos = np.empty(posicion.shape[:-1] + (6,))
+        elementos[..., 0] = -mu / (2 * (v2 / 2 - mu / r))
+        elementos[..., 1] = e
+        elementos[..., 2] = np.arccos(np.clip(h_unitario[..., 2], -1.0, 1.0))
+        elementos[..., 3] = np.where(ecuatorial, 0.0, np.mod(np.arctan2(h[..., 0], -h[..., 1]), 2 * np.pi))
+        elementos[..., 4] = np.mod(np.arctan2(_punto(periapsis, np.cross(h_unitario, nodo)), _punto(periapsis, nodo)),
+                                   2 * np.pi)
+        nu = np.arctan2(_punto(posicion, np.cross(h_unitario, periapsis)), _punto(posicion, periapsis))
+        elementos[..., 5] = _anomalia_media(nu, e)
+    return elementos
+
+
+def elementos_a_cartesianas(elementos: np.ndarray, mu) -> tuple[np.ndarray, np.ndarray]:
+    # Inversa de cartesianas_a_elementos: devuelve posición y velocidad (..., 3) relativas al centro
+    elementos = np.asarray(elementos, dtype=float)
+    a, e, i, nodo, periapsis, media = np.moveaxis(elementos, -1, 0)
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), a.shape)
+    nu = _anomalia_verdadera(media, e)
+    p = a * (1 - e * e)  # Semilado recto, positivo en órbitas elípticas e hiperbólicas
+    r = p / (1 + e * np.cos(nu))
+    raiz = np.sqrt(mu / p)
+
+    cos_nodo, sin_nodo = np.cos(nodo), np.sin(nodo)
+    cos_peri, sin_peri = np.cos(periapsis), np.sin(periapsis)
+    cos_i, sin_i = np.cos(i), np.sin(i)
+    # Ejes P (hacia el periapsis) y Q del plano orbital
+    P = np.stack((cos_nodo * cos_peri - sin_nodo * sin_peri * cos_i,
+                  sin_nodo * cos_peri + cos_nodo * sin_peri * cos_i,
+                  sin_peri * sin_i), axis=-1)
+    Q = np.stack((-cos_nodo * sin_peri - sin_nodo * cos_peri * cos_i,
+                  -sin_nodo * sin_peri + cos_nodo * cos_peri * cos_i,
+                  cos_peri * sin_i), axis=-1)
+    cos_nu, sin_nu = np.cos(nu)[..., None], np.sin(nu)[..., None]
+    posicion = r[..., None] * (cos_nu * P + sin_nu * Q)
+    velocidad = raiz[..., None] * (-sin_nu * P + (e[..., None] + cos_nu) * Q)
+    return posicion, velocidad
+
+
+def _relativas(masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray, G: float,
+               centro: int | None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Posiciones y velocidades (..., N, 3) relativas al centro y mu de cada cuerpo: respecto al
+    # baricentro, G * masa total; respecto a un cuerpo, G * (m_centro + m_i), el problema de
+    # dos cuerpos de cada uno con el centro
+    if centro is None:
+        masa_total = masa.sum()
+        baricentro = np.einsum('n,...nk->...k', masa, posicion)[..., None, :] / masa_total
+        velocidad_baricentro = np.einsum('n,...nk->...k', masa, velocidad)[..., None, :] / masa_total
+        return posicion - baricentro, velocidad - velocidad_baricentro, np.full(masa.shape, G * masa_total)
+    return (posicion - posicion[..., centro:centro + 1, :], velocidad - velocidad[..., centro:centro + 1, :],
+            G * (masa + masa[centro]))
+
+
+def elementos_estado(masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray, G: float,
+                     centro: int | None = None) -> np.ndarray:
+    # Elementos (..., N, 6) de cada cuerpo respecto al baricentro (centro None) o al cuerpo de la
+    # fila centro, cuya propia fila queda en NaN. Las partículas de prueba van con masa 0.
+    masa = np.asarray(masa, dtype=float)
+    relativa, velocidad_relativa, mu = _relativas(masa, np.asarray(posicion, dtype=float),
+                                                  np.asarray(velocidad, dtype=float), G, centro)
+    elementos = cartesianas_a_elementos(relativa, velocidad_relativa, mu)
+    if centro is not None:
+        elementos[..., centro, :] = np.nan
+    return elementos
+
+
+def elementos_trayectoria(lector, masa: np.ndarray, G: float, centro: str | None = None,
+                          marcos_por_bloque: int = MARCOS_POR_BLOQUE) -> np.ndarray:
+    # Elementos (marcos, N, 6) de una trayectoria grabada (LectorTrayectoria), con las masas en
+    # el orden de lector.ids (la trayectoria no las guarda). Se procesa por bloques de marcos,
+    # leyendo del memmap solo los de cada bloque.
+    masa = np.asarray(masa, dtype=float)
+    if masa.shape != (len(lector.ids),):
+        raise ValueError("Debe haber una masa por cuerpo de la trayectoria.")
+    if centro is not None and centro not in lector.ids:
+        raise ValueError(f"No existe un cuerpo con el ID '{centro}'.")
+    fila_centro = None if centro is None else lector.ids.index(centro)
+    elementos = np.empty((len(lector), len(lector.ids), 6))
+    for inicio in range(0, len(lector), marcos_por_bloque):
+        fin = min(inicio + marcos_por_bloque, len(lector))
+        elementos[inicio:fin] = elementos_estado(masa, lector.posiciones[inicio:fin], lector.velocidades[inicio:fin],
+                                                 G, fila_centro)
+    return elementos
@@ -0,0 +1,180 @@
+from Simulador import Simulador
+from Estado_arrays import ELEMENTOS_POR_BLOQUE, _nucleo_directo
+from Integradores import crear_integrador
+from Pasos_jerarquicos import PasosJerarquicos
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Conjuntos (ensambles) de E copias independientes del mismo sistema de N cuerpos, con masas
+# (E, N) y posiciones y velocidades (E, N, 3). Todos los miembros avanzan a la vez con los
+# integradores de Integradores.py, que operan elemento a elemento y aceptan la dimensión extra,
+# y las fuerzas salen de una suma directa vectorizada sobre miembros y pares. Con procesos > 1
+# los miembros se reparten en bloques entre procesos, que avanzan todos los pasos de una llamada
+# a ejecutar() por su cuenta: los miembros no interactúan, así que solo se comunican al principio
+# y al final.
+
+
+def _miembros_por_bloque(num_cuerpos: int) -> int:
+    return max(1, ELEMENTOS_POR_BLOQUE // max(1, num_cuerpos * num_cuerpos))
+
+
+def _nucleo_ensamble(posicion: np.ndarray, gm: np.ndarray,
+                     con_potencial: bool) -> tuple[np.ndarray, np.ndarray | None, np.ndarray]:
+    # Como Estado_arrays._nucleo_directo para cada miembro: aceleraciones (E, N, 3), potencial
+    # (E, N) si se pide y pares a distancia cero (incluido el propio cuerpo) por miembro (E,)
+    num_miembros, num_cuerpos = gm.shape
+    aceleraciones = np.empty((num_miembros, num_cuerpos, 3))
+    potencial = np.empty((num_miembros, num_cuerpos)) if con_potencial else None
+    pares_cero = np.zeros(num_miembros, dtype=np.int64)
+    bloque = _miembros_por_bloque(num_cuerpos)
+
+    if bloque == 1:
+        # Sistemas grandes: un miembro cada vez, con el núcleo por bloques de filas
+        for k in range(num_miembros):
+            aceleraciones[k], potencial_k, pares_cero[k] = _nucleo_directo(posicion[k], posicion[k], gm[k], con_potencial)
+            if con_potencial:
+                potencial[k] = potencial_k
+        return aceleraciones, potencial, pares_cero
+
+    for inicio in range(0, num_miembros, bloque):
+        fin = min(inicio + bloque, num_miembros)
+        r = posicion[inicio:fin, None, :, :] - posicion[inicio:fin, :, None, :]
+        distancia2 = np.einsum('eijk,eijk->eij', r, r)
+        inv_d = np.sqrt(distancia2)
+        np.divide(1.0, inv_d, out=inv_d, where=distancia2 > 0)
+        aceleraciones[inicio:fin] = np.einsum('eij,eijk->eik', inv_d * inv_d * inv_d * gm[inicio:fin, None, :], r)
+        if con_potencial:
+            potencial[inicio:fin] = -np.einsum('eij,ej->ei', inv_d, gm[inicio:fin])
+            pares_cero[inicio:fin] = np.count_nonzero(distancia2 == 0, axis=(1, 2))
+    return aceleraciones, potencial, pares_cero
+
+
+def aceleraciones_ensamble(masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+    # a[e, i] = sum_j G * m[e, j] * (r[e, j] - r[e, i]) / ||r[e, j] - r[e, i]||^3
+    return _nucleo_ensamble(posicion, G * masa, False)[0]
+
+
+def _avanzar_miembros(masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray, G: float,
+                      integrador, n_pasos: int, dt: float) -> tuple[np.ndarray, np.ndarray]:
+    # Avanza un bloque de miembros n_pasos; se ejecuta en el propio proceso o en los del conjunto
+    gm = G * masa
+
+    def aceleracion(pos: np.ndarray) -> np.ndarray:
+        return _nucleo_ensamble(pos, gm, False)[0]
+
+    for _ in range(n_pasos):
+        integrador.paso(posicion, velocidad, dt, aceleracion)
+    return posicion, velocidad
+
+
+class Ensamble:
+    def __init__(self, masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray, G: float = 6.67430e-11,
+                 integrador='leapfrog', ids: list[str] | None = None, procesos: int = 1):
+        posicion = np.array(posicion, dtype=float)
+        if posicion.ndim != 3 or posicion.shape[2] != 3:
+            raise ValueError("Las posiciones del ensamble deben tener forma (E, N, 3).")
+        num_miembros, num_cuerpos = posicion.shape[:2]
+        # Masas comunes (N,) o por miembro (E, N)
+        masa = np.array(np.broadcast_to(np.asarray(masa, dtype=float), (num_miembros, num_cuerpos)))
+        velocidad = np.array(velocidad, dtype=float)
+        if velocidad.shape != posicion.shape:
+            raise ValueError("Las velocidades del ensamble deben tener la misma forma que las posiciones.")
+        if np.any(masa <= 0):
+            raise ValueError("La masa de un cuerpo celeste debe ser positiva.")
+        if procesos < 1:
+            raise ValueError("El número de procesos debe ser al menos 1.")
+        self.integrador = crear_integrador(integrador)
+        if isinstance(self.integrador, PasosJerarquicos) or getattr(self.integrador, 'necesita_masas', False):
+            raise ValueError(f"El integrador '{self.integrador.nombre}' no admite ensambles; use un integrador de paso común.")
+
+        self.G = G
+        self.masa = masa
+        self.posicion = posicion
+        self.velocidad = velocidad
+        self.ids = list(ids) if ids is not None else [f"c{i}" for i in range(num_cuerpos)]
+        if len(self.ids) != num_cuerpos:
+            raise ValueError("Debe haber un ID por cuerpo.")
+        self.tiempo = 0.0
+        self.pasos = 0
+        self.procesos = procesos
+        self._ejecutor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def desde_simulador(cls, sim: Simulador, miembros: int, dispersion_posicion: float = 0.0,
+                        dispersion_velocidad: float = 0.0, dispersion_masa: float = 0.0,
+                        semilla: int = 0, **opciones) -> 'Ensamble':
+        # E copias del estado de sim con perturbaciones gaussianas reproducibles: absolutas en
+        # posición y velocidad, relativas en masa (m * (1 + dispersion_masa * n)).
+        # Las opciones (integrador, procesos) se pasan al constructor; el integrador por
+        # defecto es el del simulador.
+        ids, masa, posicion, velocidad = sim._arrays_estado()
+        rng = np.random.default_rng(semilla)
+        forma = (miembros,) + posicion.shape
+        posiciones = posicion + dispersion_posicion * rng.standard_normal(forma)
+        velocidades = velocidad + dispersion_velocidad * rng.standard_normal(forma)
+        masas = masa * (1.0 + dispersion_masa * rng.standard_normal((miembros, len(masa))))
+        opciones.setdefault("integrador", sim.integrador)
+        ensamble = cls(masas, posiciones, velocidades, sim.G, ids=ids, **opciones)
+        ensamble.tiempo = sim.tiempo
+        return ensamble
+
+    def __len__(self) -> int:
+        return len(self.masa)
+
+    def _bloques(self) -> list[slice]:
+        limites = np.linspace(0, len(self), min(self.procesos, len(self)) + 1).astype(int)
+        return [slice(inicio, fin) for inicio, fin in zip(limites[:-1], limites[1:])]
+
+    def ejecutar(self, n_pasos: int, dt: float):
+        if n_pasos < 0:
+            raise ValueError("El número de pasos no puede ser negativo.")
+        if dt <= 0:
+            raise ValueError("El paso de tiempo debe ser positivo.")
+
+        if self.procesos == 1 or len(self) == 1:
+            _avanzar_miembros(self.masa, self.posicion, self.velocidad, self.G, self.integrador, n_pasos, dt)
+        else:
+            if self._ejecutor is None:
+                self._ejecutor = ProcessPoolExecutor(max_workers=self.procesos)
+            bloques = self._bloques()
+            futuros = [self._ejecutor.submit(_avanzar_miembros, self.masa[b], self.posicion[b], self.velocidad[b],
+                                             self.G, self.integrador, n_pasos, dt) for b in bloques]
+            for b, futuro in zip(bloques, futuros):
+                self.posicion[b], self.velocidad[b] = futuro.result()
+        self.tiempo += n_pasos * dt
+        self.pasos += n_pasos
+
+    def diagnosticos(self) -> dict:
+        # Como Simulador.diagnosticos, con un valor por miembro: energías (E,) y momento lineal (E, 3)
+        potencial, pares_cero = _nucleo_ensamble(self.posicion, self.G * self.masa, True)[1:]
+        energia_potencial = 0.5 * np.einsum('en,en->e', self.masa, potencial)
+        # Cuerpos en la misma posición (más pares a distancia cero que los propios): potencial infinito
+        energia_potencial[pares_cero > self.masa.shape[1]] = -np.inf
+        energia_cinetica = 0.5 * np.einsum('en,enk,enk->e', self.masa, self.velocidad, self.velocidad)
+        return {
+            "tiempo": self.tiempo,
+            "energia_cinetica": energia_cinetica,
+            "energia_potencial": energia_potencial,
+            "energia_total": energia_cinetica + energia_potencial,
+            "momento_lineal": np.einsum('en,enk->ek', self.masa, self.velocidad),
+        }
+
+    def miembro(self, k: int) -> Simulador:
+        # Copia del miembro k como Simulador con almacenamiento en arrays, para analizarlo o
+        # continuarlo por separado (guardar, colisiones, trayectorias...)
+        sim = Simulador(G=self.G, almacenamiento='arrays', integrador=type(self.integrador)())
+        sim.estado.agregar_lote(self.ids, self.masa[k], self.posicion[k], self.velocidad[k])
+        sim.tiempo = self.tiempo
+        return sim
+
+    def cerrar(self):
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown()
+            self._ejecutor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
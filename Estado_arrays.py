@@ -0,0 +1,361 @@
+from Cuerpos_celestes import CuerpoCeleste
+from Clase_vector_3D import Vector3D
+from collections.abc import MutableMapping, Iterator
+import numpy as np
+
+# Número máximo de elementos (objetivos x fuentes) que se procesan a la vez en los
+# núcleos vectorizados, para acotar la memoria temporal de las matrices de pares
+ELEMENTOS_POR_BLOQUE = 1 << 20
+
+
+def _filas_por_bloque(num_fuentes: int) -> int:
+    return max(1, ELEMENTOS_POR_BLOQUE // max(1, num_fuentes))
+
+
+def _nucleo_directo(pos_objetivos: np.ndarray, pos_fuentes: np.ndarray, gm_fuentes: np.ndarray,
+                    con_potencial: bool) -> tuple[np.ndarray, np.ndarray | None, int]:
+    # a_i = sum_j G * m_j * (r_j - r_i) / ||r_j - r_i||^3
+    # phi_i = -sum_j G * m_j / ||r_j - r_i||, acumulado en la misma pasada si se pide
+    # Los pares a distancia cero (incluido el propio cuerpo) no aportan y se cuentan aparte
+    num_objetivos = len(pos_objetivos)
+    aceleraciones = np.zeros((num_objetivos, 3))
+    potencial = np.zeros(num_objetivos) if con_potencial else None
+    pares_cero = 0
+    bloque = _filas_por_bloque(len(pos_fuentes))
+
+    for inicio in range(0, num_objetivos, bloque):
+        fin = min(inicio + bloque, num_objetivos)
+        r = pos_fuentes[None, :, :] - pos_objetivos[inicio:fin, None, :]
+        distancia2 = np.einsum('ijk,ijk->ij', r, r)
+        inv_d = np.sqrt(distancia2)
+        np.divide(1.0, inv_d, out=inv_d, where=distancia2 > 0)
+        aceleraciones[inicio:fin] = np.einsum('ij,ijk->ik', inv_d * inv_d * inv_d * gm_fuentes, r)
+        if con_potencial:
+            potencial[inicio:fin] = -(inv_d @ gm_fuentes)
+        pares_cero += int(np.count_nonzero(distancia2 == 0))
+    return aceleraciones, potencial, pares_cero
+
+
+def aceleraciones_directas(pos_objetivos: np.ndarray, pos_fuentes: np.ndarray,
+                           gm_fuentes: np.ndarray) -> np.ndarray:
+    return _nucleo_directo(pos_objetivos, pos_fuentes, gm_fuentes, False)[0]
+
+
+def fuerzas_directas(masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+    # F_i = m_i * a_i, con la suma directa O(N^2) sobre todos los pares
+    return masa[:, None] * aceleraciones_directas(posicion, posicion, G * masa)
+
+
+def fuerzas_y_potencial_directos(masa: np.ndarray, posicion: np.ndarray,
+                                 G: float) -> tuple[np.ndarray, float, np.ndarray]:
+    # Fuerzas, energía potencial total U = 1/2 sum_i m_i phi_i y potencial phi_i de cada cuerpo,
+    # todo en una sola pasada sobre los pares
+    return _fuerzas_y_potencial(masa, posicion, G)[:3]
+
+
+def _fuerzas_y_potencial(masa: np.ndarray, posicion: np.ndarray,
+                         G: float) -> tuple[np.ndarray, float, np.ndarray, int]:
+    # Como fuerzas_y_potencial_directos, y además el número de pares distintos a distancia cero
+    aceleraciones, potencial, pares_cero = _nucleo_directo(posicion, posicion, G * masa, True)
+    pares_coincidentes = (pares_cero - len(masa)) // 2
+    if pares_coincidentes > 0:
+        energia = float('-inf')  # Cuerpos en la misma posición, potencial infinito
+    else:
+        energia = 0.5 * float(masa @ potencial)
+    return masa[:, None] * aceleraciones, energia, potencial, pares_coincidentes
+
+
+def energia_potencial_directa(masa: np.ndarray, posicion: np.ndarray, G: float) -> float:
+    # U = -sum_{i<j} G * m_i * m_j / ||r_i - r_j||
+    num_cuerpos = len(masa)
+    energia = 0.0
+    bloque = _filas_por_bloque(num_cuerpos)
+    columnas = np.arange(num_cuerpos)
+
+    for inicio in range(0, num_cuerpos, bloque):
+        fin = min(inicio + bloque, num_cuerpos)
+        r = posicion[None, :, :] - posicion[inicio:fin, None, :]
+        distancia = np.sqrt(np.einsum('ijk,ijk->ij', r, r))
+        # Solo los pares j > i, para contar cada par una vez
+        superior = columnas[None, :] > np.arange(inicio, fin)[:, None]
+        if np.any(distancia[superior] == 0):
+            return float('-inf')  # Cuerpos en la misma posición, potencial infinito
+        inv_d = np.zeros_like(distancia)
+        np.divide(1.0, distancia, out=inv_d, where=superior)
+        energia -= G * float(masa[inicio:fin] @ inv_d @ masa)
+    return energia
+
+
+class MotorDirecto:
+    # Motor de fuerzas exacto: suma directa O(N^2) sobre todos los pares
+    def __init__(self):
+        self.pares_cero = 0  # Pares distintos a distancia cero omitidos en la última pasada
+
+    def calcular_fuerzas(self, masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+        aceleraciones, _, pares_cero = _nucleo_directo(posicion, posicion, G * masa, False)
+        self.pares_cero = (pares_cero - len(masa)) // 2
+        return masa[:, None] * aceleraciones
+
+    def calcular_fuerzas_y_potencial(self, masa: np.ndarray, posicion: np.ndarray,
+                                     G: float) -> tuple[np.ndarray, float, np.ndarray]:
+        fuerzas, energia, potencial, self.pares_cero = _fuerzas_y_potencial(masa, posicion, G)
+        return fuerzas, energia, potencial
+
+
+class EstadoArrays:
+    # Almacenamiento en estructura de arrays: una fila por cuerpo en cada array. Los arrays
+    # reservan capacidad de sobra, que se duplica al llenarse, así que añadir un cuerpo cuesta
+    # O(1) amortizado; masa, posicion, velocidad y radio son vistas de las filas ocupadas.
+    # Eliminar mueve el último cuerpo a la fila libre (O(1)): la fila de cada cuerpo no cambia
+    # salvo la del que se mueve, y self.indice siempre da la fila actual de cada id.
+    # version aumenta cada vez que cambia el conjunto de cuerpos o alguna masa, para que las
+    # cachés que dependen de ellos (filas, ids, G·m) sepan cuándo invalidarse. Las masas se
+    # cambian con el setter de masa (de EstadoArrays o de CuerpoVista), no escribiendo en el array.
+    def __init__(self, capacidad_inicial: int = 16):
+        self.ids: list[str] = []
+        self.indice: dict[str, int] = {}
+        self.version = 0
+        self._reservar(capacidad_inicial)
+
+    def _reservar(self, capacidad: int):
+        self._masa = np.zeros(capacidad)
+        self._posicion = np.zeros((capacidad, 3))
+        self._velocidad = np.zeros((capacidad, 3))
+        self._radio = np.zeros(capacidad)
+
+    @property
+    def capacidad(self) -> int:
+        return len(self._masa)
+
+    # Los setters escriben en las filas ocupadas (p. ej. estado.posicion += ... en el sitio)
+    @property
+    def masa(self) -> np.ndarray:
+        return self._masa[:len(self.ids)]
+
+    @masa.setter
+    def masa(self, valor: np.ndarray):
+        self._masa[:len(self.ids)] = valor
+        self.version += 1
+
+    @property
+    def posicion(self) -> np.ndarray:
+        return self._posicion[:len(self.ids)]
+
+    @posicion.setter
+    def posicion(self, valor: np.ndarray):
+        self._posicion[:len(self.ids)] = valor
+
+    @property
+    def velocidad(self) -> np.ndarray:
+        return self._velocidad[:len(self.ids)]
+
+    @velocidad.setter
+    def velocidad(self, valor: np.ndarray):
+        self._velocidad[:len(self.ids)] = valor
+
+    @property
+    def radio(self) -> np.ndarray:
+        return self._radio[:len(self.ids)]
+
+    @radio.setter
+    def radio(self, valor: np.ndarray):
+        self._radio[:len(self.ids)] = valor
+
+    def _asegurar_capacidad(self, num_cuerpos: int):
+        if num_cuerpos <= self.capacidad:
+            return
+        capacidad = max(1, self.capacidad)
+        while capacidad < num_cuerpos:
+            capacidad *= 2
+        n = len(self.ids)
+        masa, posicion, velocidad, radio = self.masa, self.posicion, self.velocidad, self.radio
+        self._reservar(capacidad)
+        self._masa[:n] = masa
+        self._posicion[:n] = posicion
+        self._velocidad[:n] = velocidad
+        self._radio[:n] = radio
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.indice
+
+    def agregar(self, id: str, masa: float, posicion: list[float], velocidad: list[float], radio: float = 0.0):
+        if id in self.indice:
+            raise ValueError(f"Ya existe un cuerpo con el ID '{id}'.")
+        fila = len(self.ids)
+        self._asegurar_capacidad(fila + 1)
+        self._masa[fila] = masa
+        self._posicion[fila] = posicion
+        self._velocidad[fila] = velocidad
+        self._radio[fila] = radio
+        self.indice[id] = fila
+        self.ids.append(id)
+        self.version += 1
+
+    def agregar_lote(self, ids: list[str], masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray,
+                     radio: np.ndarray | None = None):
+        # Añade muchos cuerpos con una sola copia por array
+        inicio = len(self.ids)
+        nuevos: dict[str, int] = {}
+        for i, c_id in enumerate(ids, start=inicio):
+            if c_id in self.indice or c_id in nuevos:
+                raise ValueError(f"Ya existe un cuerpo con el ID '{c_id}'.")
+            nuevos[c_id] = i
+        fin = inicio + len(nuevos)
+        self._asegurar_capacidad(fin)
+        self._masa[inicio:fin] = masa
+        self._posicion[inicio:fin] = np.asarray(posicion, dtype=float).reshape(-1, 3)
+        self._velocidad[inicio:fin] = np.asarray(velocidad, dtype=float).reshape(-1, 3)
+        self._radio[inicio:fin] = 0.0 if radio is None else radio
+        self.ids.extend(ids)
+        self.indice.update(nuevos)
+        self.version += 1
+
+    def eliminar(self, id: str):
+        # Intercambio con el último: el último cuerpo pasa a la fila del eliminado
+        fila = self.indice.pop(id)
+        ultima = len(self.ids) - 1
+        if fila != ultima:
+            ultimo_id = self.ids[ultima]
+            self.ids[fila] = ultimo_id
+            self.indice[ultimo_id] = fila
+            self._masa[fila] = self._masa[ultima]
+            self._posicion[fila] = self._posicion[ultima]
+            self._velocidad[fila] = self._velocidad[ultima]
+            self._radio[fila] = self._radio[ultima]
+        self.ids.pop()
+        self.version += 1
+
+    def reemplazar(self, ids: list[str], masa: np.ndarray, posicion: np.ndarray, velocidad: np.ndarray,
+                   radio: np.ndarray | None = None):
+        # Sustituye todo el estado por estos arrays sin copiarlos (p. ej. memmaps de un checkpoint);
+        # la capacidad es la justa y se copian al crecer
+        if len(set(ids)) != len(ids):
+            raise ValueError("Los IDs de los cuerpos deben ser únicos.")
+        self.ids = list(ids)
+        self.indice = {c_id: i for i, c_id in enumerate(self.ids)}
+        self._masa = masa
+        self._posicion = posicion
+        self._velocidad = velocidad
+        self._radio = np.zeros(len(self.ids)) if radio is None else radio
+        self.version += 1
+
+    def limpiar(self, capacidad_inicial: int = 16):
+        self.ids.clear()
+        self.indice.clear()
+        self._reservar(capacidad_inicial)
+        self.version += 1
+
+    def calcular_fuerzas(self, G: float) -> np.ndarray:
+        return fuerzas_directas(self.masa, self.posicion, G)
+
+    def kick(self, fuerzas: np.ndarray, dt: float):
+        # v(t+dt) = v(t) + F/m * dt
+        self.velocidad += fuerzas / self.masa[:, None] * dt
+
+    def drift(self, dt: float):
+        # r(t+dt) = r(t) + v * dt
+        self.posicion += self.velocidad * dt
+
+    def energia_cinetica(self) -> float:
+        return 0.5 * float(self.masa @ np.einsum('ij,ij->i', self.velocidad, self.velocidad))
+
+    def energia_potencial(self, G: float) -> float:
+        return energia_potencial_directa(self.masa, self.posicion, G)
+
+    def momento_lineal(self) -> np.ndarray:
+        return self.masa @ self.velocidad
+
+
+class CuerpoVista(CuerpoCeleste):
+    # Cuerpo celeste cuyos datos se leen y escriben directamente en un EstadoArrays
+    def __init__(self, estado: EstadoArrays, id: str):
+        self._estado = estado
+        self.id = id
+
+    @property
+    def _fila(self) -> int:
+        return self._estado.indice[self.id]
+
+    @property
+    def masa(self) -> float:
+        return float(self._estado.masa[self._fila])
+
+    @masa.setter
+    def masa(self, valor: float):
+        self._estado._masa[self._fila] = valor
+        self._estado.version += 1
+
+    @property
+    def radio(self) -> float:
+        return float(self._estado.radio[self._fila])
+
+    @radio.setter
+    def radio(self, valor: float):
+        self._estado.radio[self._fila] = valor
+
+    @property
+    def posicion(self) -> Vector3D:
+        return Vector3D(*self._estado.posicion[self._fila].tolist())
+
+    @posicion.setter
+    def posicion(self, valor: Vector3D):
+        self._estado.posicion[self._fila] = valor.to_list()
+
+    @property
+    def velocidad(self) -> Vector3D:
+        return Vector3D(*self._estado.velocidad[self._fila].tolist())
+
+    @velocidad.setter
+    def velocidad(self, valor: Vector3D):
+        self._estado.velocidad[self._fila] = valor.to_list()
+
+    # Las propiedades devuelven copias, así que las actualizaciones escriben en la fila del array
+    def aplicar_fuerza(self, fuerza: Vector3D, dt: float):
+        fila = self._fila
+        self._estado.velocidad[fila] += np.array(fuerza.to_list()) * (dt / self._estado.masa[fila])
+
+    def mover(self, dt: float):
+        fila = self._fila
+        self._estado.posicion[fila] += self._estado.velocidad[fila] * dt
+
+
+class VistaCuerpos(MutableMapping):
+    # Fachada tipo diccionario id -> CuerpoCeleste sobre un EstadoArrays
+    def __init__(self, estado: EstadoArrays):
+        self._estado = estado
+
+    def __getitem__(self, id: str) -> CuerpoVista:
+        if id not in self._estado:
+            raise KeyError(id)
+        return CuerpoVista(self._estado, id)
+
+    def __setitem__(self, id: str, cuerpo: CuerpoCeleste):
+        if id in self._estado:
+            fila = self._estado.indice[id]
+            self._estado.masa[fila] = cuerpo.masa
+            self._estado.version += 1
+            self._estado.posicion[fila] = cuerpo.posicion.to_list()
+            self._estado.velocidad[fila] = cuerpo.velocidad.to_list()
+            self._estado.radio[fila] = cuerpo.radio
+        else:
+            self._estado.agregar(id, cuerpo.masa, cuerpo.posicion.to_list(), cuerpo.velocidad.to_list(), cuerpo.radio)
+
+    def __delitem__(self, id: str):
+        if id not in self._estado:
+            raise KeyError(id)
+        self._estado.eliminar(id)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self._estado
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._estado.ids))
+
+    def __len__(self) -> int:
+        return len(self._estado)
+
+    def clear(self):
+        self._estado.limpiar()
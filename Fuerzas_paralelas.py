@@ -0,0 +1,132 @@
+from Estado_arrays import _nucleo_directo
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import numpy as np
+
+# Bloques de memoria compartida que usa cada evaluación, en este orden
+_CAMPOS = ("masa", "posicion", "aceleracion", "potencial")
+
+# Memoria compartida ya abierta en cada proceso trabajador (nombres -> arrays)
+_adjuntos: dict = {}
+
+
+def _abrir(nombres: tuple[str, ...], capacidad: int) -> dict[str, np.ndarray]:
+    # En el trabajador: abre los bloques por nombre una sola vez y los reutiliza en cada tarea
+    global _adjuntos
+    if _adjuntos.get("nombres") != nombres:
+        for bloque in _adjuntos.get("bloques", []):
+            bloque.close()
+        bloques = []
+        for nombre in nombres:
+            # Los trabajadores comparten el resource_tracker del proceso principal, que es quien
+            # crea y borra (unlink) los bloques; aquí solo se abren
+            bloques.append(shared_memory.SharedMemory(name=nombre))
+        _adjuntos = {"nombres": nombres, "bloques": bloques, "arrays": _vistas(bloques, capacidad)}
+    return _adjuntos["arrays"]
+
+
+def _vistas(bloques: list, capacidad: int) -> dict[str, np.ndarray]:
+    formas = {"masa": (capacidad,), "posicion": (capacidad, 3), "aceleracion": (capacidad, 3), "potencial": (capacidad,)}
+    return {campo: np.ndarray(formas[campo], dtype=np.float64, buffer=bloque.buf)
+            for campo, bloque in zip(_CAMPOS, bloques)}
+
+
+def _evaluar_tesela(nombres: tuple[str, ...], capacidad: int, num_cuerpos: int, inicio: int, fin: int,
+                    G: float, con_potencial: bool) -> int:
+    # Aceleraciones (y potencial) de las filas [inicio, fin) debidas a todos los cuerpos;
+    # cada tesela escribe sus propias filas del resultado compartido
+    arrays = _abrir(nombres, capacidad)
+    masa = arrays["masa"][:num_cuerpos]
+    posicion = arrays["posicion"][:num_cuerpos]
+    aceleraciones, potencial, pares_cero = _nucleo_directo(posicion[inicio:fin], posicion, G * masa, con_potencial)
+    arrays["aceleracion"][inicio:fin] = aceleraciones
+    if con_potencial:
+        arrays["potencial"][inicio:fin] = potencial
+    return pares_cero
+
+
+class MotorParalelo:
+    # Suma directa repartida en teselas de filas entre un grupo de procesos. Masas y posiciones
+    # se publican en memoria compartida (multiprocessing.shared_memory), así que en cada paso
+    # solo viajan por el pool los límites de cada tesela. Los resultados coinciden con la suma
+    # directa en serie salvo por el orden de las sumas.
+    def __init__(self, procesos: int | None = None, teselas_por_proceso: int = 4):
+        self.procesos = procesos or os.cpu_count() or 1
+        if self.procesos < 1:
+            raise ValueError("El número de procesos debe ser al menos 1.")
+        self.teselas_por_proceso = teselas_por_proceso
+        self._pool: ProcessPoolExecutor | None = None
+        self._bloques: list[shared_memory.SharedMemory] = []
+        self._arrays: dict[str, np.ndarray] = {}
+        self._capacidad = 0
+
+    def _preparar(self, num_cuerpos: int):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+        if num_cuerpos > self._capacidad:
+            # Se duplica la capacidad para no recrear la memoria compartida en cada cambio de N
+            self._liberar_memoria()
+            self._capacidad = max(num_cuerpos, 2 * self._capacidad)
+            tamanos = {"masa": 1, "posicion": 3, "aceleracion": 3, "potencial": 1}
+            self._bloques = [shared_memory.SharedMemory(create=True, size=8 * tamanos[campo] * self._capacidad)
+                             for campo in _CAMPOS]
+            self._arrays = _vistas(self._bloques, self._capacidad)
+
+    def calcular_fuerzas(self, masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+        return self._evaluar(masa, posicion, G, False)[0]
+
+    def calcular_fuerzas_y_potencial(self, masa: np.ndarray, posicion: np.ndarray,
+                                     G: float) -> tuple[np.ndarray, float, np.ndarray]:
+        fuerzas, potencial, pares_cero = self._evaluar(masa, posicion, G, True)
+        if pares_cero > len(masa):
+            return fuerzas, float('-inf'), potencial  # Cuerpos en la misma posición
+        return fuerzas, 0.5 * float(masa @ potencial), potencial
+
+    def _evaluar(self, masa: np.ndarray, posicion: np.ndarray, G: float,
+                 con_potencial: bool) -> tuple[np.ndarray, np.ndarray | None, int]:
+        num_cuerpos = len(masa)
+        if num_cuerpos == 0:
+            return np.zeros((0, 3)), np.zeros(0) if con_potencial else None, 0
+        self._preparar(num_cuerpos)
+        self._arrays["masa"][:num_cuerpos] = masa
+        self._arrays["posicion"][:num_cuerpos] = posicion
+
+        nombres = tuple(bloque.name for bloque in self._bloques)
+        num_teselas = min(num_cuerpos, self.procesos * self.teselas_por_proceso)
+        limites = np.linspace(0, num_cuerpos, num_teselas + 1).astype(int)
+        tareas = [self._pool.submit(_evaluar_tesela, nombres, self._capacidad, num_cuerpos,
+                                    int(inicio), int(fin), G, con_potencial)
+                  for inicio, fin in zip(limites[:-1], limites[1:]) if fin > inicio]
+        pares_cero = sum(tarea.result() for tarea in tareas)
+
+        fuerzas = masa[:, None] * self._arrays["aceleracion"][:num_cuerpos]
+        potencial = self._arrays["potencial"][:num_cuerpos].copy() if con_potencial else None
+        return fuerzas, potencial, pares_cero
+
+    def _liberar_memoria(self):
+        self._arrays = {}
+        for bloque in self._bloques:
+            bloque.close()
+            bloque.unlink()
+        self._bloques = []
+        self._capacidad = 0
+
+    def cerrar(self):
+        # Detiene los procesos y libera la memoria compartida
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._liberar_memoria()
+
+    def __enter__(self) -> 'MotorParalelo':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __del__(self):
+        try:
+            self.cerrar()
+        except Exception:
+            pass
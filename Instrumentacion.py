@@ -0,0 +1,74 @@
+from contextlib import nullcontext
+import json
+import time
+
+# Contexto vacío compartido: con la instrumentación desactivada, fase() no crea ni mide nada
+_FASE_NULA = nullcontext()
+
+
+class _Fase:
+    # Cronómetro de una fase. El tiempo de las fases anidadas se descuenta de la que las
+    # contiene, así que la suma de todas las fases es el tiempo total medido.
+    __slots__ = ("_instrumentacion", "_nombre", "_inicio", "_hijos")
+
+    def __init__(self, instrumentacion: 'Instrumentacion', nombre: str):
+        self._instrumentacion = instrumentacion
+        self._nombre = nombre
+        self._hijos = 0.0
+
+    def __enter__(self):
+        self._instrumentacion._pila.append(self)
+        self._inicio = time.perf_counter()
+
+    def __exit__(self, *excepcion):
+        transcurrido = time.perf_counter() - self._inicio
+        instrumentacion = self._instrumentacion
+        instrumentacion._pila.pop()
+        if instrumentacion._pila:
+            instrumentacion._pila[-1]._hijos += transcurrido
+        instrumentacion.tiempos[self._nombre] = instrumentacion.tiempos.get(self._nombre, 0.0) + transcurrido - self._hijos
+        instrumentacion.llamadas[self._nombre] = instrumentacion.llamadas.get(self._nombre, 0) + 1
+        return False
+
+
+class Instrumentacion:
+    # Cronómetros por fase y contadores del simulador. Desactivada por defecto; entonces
+    # fase() devuelve un contexto vacío y contar() no hace nada.
+    def __init__(self, activa: bool = False):
+        self.activa = activa
+        self.tiempos: dict[str, float] = {}
+        self.llamadas: dict[str, int] = {}
+        self.contadores: dict[str, int] = {}
+        self._pila: list[_Fase] = []
+
+    def activar(self):
+        self.activa = True
+
+    def desactivar(self):
+        self.activa = False
+
+    def reiniciar(self):
+        self.tiempos.clear()
+        self.llamadas.clear()
+        self.contadores.clear()
+
+    def fase(self, nombre: str):
+        if not self.activa:
+            return _FASE_NULA
+        return _Fase(self, nombre)
+
+    def contar(self, nombre: str, cantidad: int = 1):
+        if self.activa:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def a_dict(self) -> dict:
+        return {
+            "activa": self.activa,
+            "tiempo_total": sum(self.tiempos.values()),
+            "fases": {nombre: {"segundos": segundos, "llamadas": self.llamadas[nombre]}
+                      for nombre, segundos in self.tiempos.items()},
+            "contadores": dict(self.contadores),
+        }
+
+    def a_json(self, **opciones) -> str:
+        return json.dumps(self.a_dict(), **opciones)
@@ -0,0 +1,73 @@
+from Pasos_jerarquicos import PasosJerarquicos
+from Wisdom_holman import WisdomHolman
+from collections.abc import Callable
+import numpy as np
+
+# Los integradores actualizan posicion y velocidad (arrays (N, 3)) en el propio array.
+# aceleracion(posicion) devuelve las aceleraciones en esas posiciones; Simulador reutiliza la
+# última evaluación si las posiciones no han cambiado, así que la última aceleración de un paso
+# no se recalcula al empezar el siguiente. aceleracion(posicion, activos) devuelve solo las
+# de los cuerpos con esos índices (lo usan los pasos jerárquicos). Los integradores con el
+# atributo necesita_masas = True reciben además masa y G como argumentos con nombre.
+FuncionAceleracion = Callable[..., np.ndarray]
+
+
+class EulerSemiImplicito:
+    # Euler semi-implícito (simpléctico de primer orden): kick con las fuerzas actuales y
+    # después drift con la velocidad ya actualizada. Es el esquema original de paso_simulacion.
+    nombre = 'euler'
+
+    def paso(self, posicion: np.ndarray, velocidad: np.ndarray, dt: float, aceleracion: FuncionAceleracion):
+        velocidad += aceleracion(posicion) * dt
+        posicion += velocidad * dt
+
+
+class Leapfrog:
+    # Leapfrog kick-drift-kick (segundo orden, simpléctico): una evaluación de fuerzas por paso
+    nombre = 'leapfrog'
+
+    def paso(self, posicion: np.ndarray, velocidad: np.ndarray, dt: float, aceleracion: FuncionAceleracion):
+        velocidad += aceleracion(posicion) * (dt / 2)
+        posicion += velocidad * dt
+        velocidad += aceleracion(posicion) * (dt / 2)
+
+
+class VerletVelocidad:
+    # Verlet en velocidades (segundo orden, simpléctico):
+    # r(t+dt) = r + v dt + a dt^2 / 2,  v(t+dt) = v + (a(t) + a(t+dt)) dt / 2
+    nombre = 'verlet'
+
+    def paso(self, posicion: np.ndarray, velocidad: np.ndarray, dt: float, aceleracion: FuncionAceleracion):
+        aceleracion_inicial = aceleracion(posicion)
+        posicion += velocidad * dt + aceleracion_inicial * (dt * dt / 2)
+        velocidad += (aceleracion_inicial + aceleracion(posicion)) * (dt / 2)
+
+
+class Yoshida4:
+    # Integrador de Yoshida de cuarto orden: composición de tres pasos leapfrog con pesos
+    # w1, w0, w1. En forma kick-drift-kick necesita tres evaluaciones nuevas de fuerza por paso.
+    nombre = 'yoshida4'
+
+    W1 = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+    W0 = -(2.0 ** (1.0 / 3.0)) * W1
+    KICKS = (W1 / 2, (W0 + W1) / 2, (W0 + W1) / 2, W1 / 2)
+    DRIFTS = (W1, W0, W1)
+
+    def paso(self, posicion: np.ndarray, velocidad: np.ndarray, dt: float, aceleracion: FuncionAceleracion):
+        for kick, drift in zip(self.KICKS, self.DRIFTS):
+            velocidad += aceleracion(posicion) * (kick * dt)
+            posicion += velocidad * (drift * dt)
+        velocidad += aceleracion(posicion) * (self.KICKS[-1] * dt)
+
+
+INTEGRADORES = {clase.nombre: clase for clase in (EulerSemiImplicito, Leapfrog, VerletVelocidad, Yoshida4,
+                                                   PasosJerarquicos, WisdomHolman)}
+
+
+def crear_integrador(integrador):
+    # Acepta un nombre registrado en INTEGRADORES o una instancia con método paso(...)
+    if isinstance(integrador, str):
+        if integrador not in INTEGRADORES:
+            raise ValueError(f"Integrador '{integrador}' no soportado. Use uno de: {', '.join(INTEGRADORES)}.")
+        return INTEGRADORES[integrador]()
+    return integrador
@@ -14,6 +14,7 @@ class Lanzador:
         print("4. Guardar simulación")
         print("5. Cargar simulación")
         print("6. Salir")
+        print("7. Ejecutar varios pasos de simulación")
         print("-------------------------------------------------")
 
     def ejecutar_opcion(self, opcion: str):
@@ -30,6 +31,8 @@ class Lanzador:
         elif opcion == '6':
             print("Saliendo del simulador. ¡Hasta luego!")
             sys.exit()
+        elif opcion == '7':
+            self._ejecutar_varios_pasos_interactivo()
         else:
             print("Opción no válida. Por favor, intente de nuevo.")
 
@@ -64,12 +67,37 @@ class Lanzador:
         except ValueError:
             print("Entrada inválida. Ingrese un número para el paso de tiempo.")
 
+    def _ejecutar_varios_pasos_interactivo(self):
+        try:
+            n_pasos = int(input("Número de pasos: "))
+            dt = float(input("Ingrese el paso de tiempo (dt en segundos): "))
+            diagnosticos_cada = int(input("Mostrar diagnósticos cada cuántos pasos (0 para ninguno): "))
+            if n_pasos <= 0 or dt <= 0:
+                print("El número de pasos y el paso de tiempo deben ser positivos.")
+                return
+            if diagnosticos_cada < 0:
+                print("La frecuencia de diagnósticos debe ser 0 o mayor.")
+                return
+            self.simulador.ejecutar(n_pasos, dt, diagnosticos_cada)
+            print(f"Se ejecutaron {n_pasos} pasos. Tiempo de simulación: {self.simulador.tiempo:.4e} s")
+        except ValueError:
+            print("Entrada inválida. Ingrese números enteros para los pasos y un número para dt.")
+
     def _guardar_simulacion_interactivo(self):
-        nombre_archivo = input("Nombre del archivo para guardar (ej. 'simulacion.json' o 'datos.csv'): ")
-        formato = 'json' if nombre_archivo.lower().endswith('.json') else 'csv'
+        nombre_archivo = input("Nombre del archivo para guardar (ej. 'simulacion.json', 'datos.csv' o 'estado.bin'): ")
+        formato = self._formato_por_extension(nombre_archivo)
         self.simulador.guardar(nombre_archivo, formato)
 
     def _cargar_simulacion_interactivo(self):
-        nombre_archivo = input("Nombre del archivo para cargar (ej. 'simulacion.json' o 'datos.csv'): ")
-        formato = 'json' if nombre_archivo.lower().endswith('.json') else 'csv'
-        self.simulador.cargar(nombre_archivo, formato)
\ No newline at end of file
+        nombre_archivo = input("Nombre del archivo para cargar (ej. 'simulacion.json', 'datos.csv' o 'estado.bin'): ")
+        formato = self._formato_por_extension(nombre_archivo)
+        self.simulador.cargar(nombre_archivo, formato)
+
+    @staticmethod
+    def _formato_por_extension(nombre_archivo: str) -> str:
+        nombre = nombre_archivo.lower()
+        if nombre.endswith('.json'):
+            return 'json'
+        if nombre.endswith('.bin'):
+            return 'binario'
+        return 'csv'
@@ -0,0 +1,121 @@
+import numpy as np
+
+# Nodos libres a cada lado de la distribución, para que el gradiente centrado y los pesos
+# CIC de todos los cuerpos queden dentro de la malla
+NODOS_MARGEN = 2
+
+
+def _pesos_cic(posicion: np.ndarray, origen: np.ndarray, h: float, celdas: int) -> tuple[np.ndarray, np.ndarray]:
+    # Índices planos y pesos de las 8 celdas vecinas de cada cuerpo (cloud-in-cell)
+    u = (posicion - origen) / h
+    i0 = np.clip(np.floor(u).astype(np.int64), 0, celdas - 2)
+    frac = u - i0
+    indices = np.empty((len(posicion), 8), dtype=np.int64)
+    pesos = np.empty((len(posicion), 8))
+    esquina = 0
+    for dx in (0, 1):
+        wx = frac[:, 0] if dx else 1.0 - frac[:, 0]
+        for dy in (0, 1):
+            wy = frac[:, 1] if dy else 1.0 - frac[:, 1]
+            for dz in (0, 1):
+                wz = frac[:, 2] if dz else 1.0 - frac[:, 2]
+                indices[:, esquina] = ((i0[:, 0] + dx) * celdas + (i0[:, 1] + dy)) * celdas + (i0[:, 2] + dz)
+                pesos[:, esquina] = wx * wy * wz
+                esquina += 1
+    return indices, pesos
+
+
+def _green_esquinas() -> np.ndarray:
+    # Función de Green unitaria entre las 8 esquinas de una celda (misma convención que la malla)
+    esquinas = np.array([(dx, dy, dz) for dx in (0, 1) for dy in (0, 1) for dz in (0, 1)], dtype=float)
+    r = np.linalg.norm(esquinas[:, None, :] - esquinas[None, :, :], axis=2)
+    r[r == 0] = 1.0
+    return -1.0 / r
+
+
+class MotorParticulaMalla:
+    # Motor de fuerzas partícula-malla: deposita la masa en una malla 3D con CIC, resuelve
+    # la ecuación de Poisson con condiciones de contorno aisladas (convolución con la función
+    # de Green -G/r sobre una malla duplicada, mediante FFT) e interpola las aceleraciones de
+    # vuelta a los cuerpos con los mismos pesos. Coste O(N + M log M) con M = celdas^3; la
+    # fuerza se suaviza por debajo del tamaño de celda, por lo que está pensado para
+    # distribuciones grandes y suaves, no para encuentros cercanos.
+    def __init__(self, celdas: int = 64):
+        if celdas < 2 * NODOS_MARGEN + 2:
+            raise ValueError(f"La malla debe tener al menos {2 * NODOS_MARGEN + 2} celdas por eje.")
+        self.celdas = celdas
+        self._green_unitario: np.ndarray | None = None
+
+    def _transformada_green(self) -> np.ndarray:
+        # Transformada de -1/r en unidades de celda (G = 1, h = 1); se escala en cada llamada
+        if self._green_unitario is None:
+            n2 = 2 * self.celdas
+            d = np.arange(n2)
+            d = np.minimum(d, n2 - d).astype(float)
+            r = np.sqrt(d[:, None, None]**2 + d[None, :, None]**2 + d[None, None, :]**2)
+            r[0, 0, 0] = 1.0  # Autointeracción suavizada; no aporta fuerza neta por simetría
+            self._green_unitario = np.fft.rfftn(-1.0 / r)
+        return self._green_unitario
+
+    def calcular_fuerzas(self, masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+        return self._evaluar(masa, posicion, G, False)[0]
+
+    def calcular_fuerzas_y_potencial(self, masa: np.ndarray, posicion: np.ndarray,
+                                     G: float) -> tuple[np.ndarray, float, np.ndarray]:
+        # El potencial de la malla se interpola en la misma pasada que las fuerzas
+        fuerzas, potencial = self._evaluar(masa, posicion, G, True)
+        return fuerzas, 0.5 * float(masa @ potencial), potencial
+
+    def _evaluar(self, masa: np.ndarray, posicion: np.ndarray, G: float,
+                 con_potencial: bool) -> tuple[np.ndarray, np.ndarray | None]:
+        num_cuerpos = len(masa)
+        if num_cuerpos < 2:
+            return np.zeros((num_cuerpos, 3)), np.zeros(num_cuerpos) if con_potencial else None
+        n = self.celdas
+
+        minimo = posicion.min(axis=0)
+        maximo = posicion.max(axis=0)
+        lado = float((maximo - minimo).max())
+        if lado == 0:
+            lado = 1.0
+        h = lado / (n - 1 - 2 * NODOS_MARGEN) * (1 + 1e-9)
+        origen = (minimo + maximo) / 2 - h * (n - 1) / 2
+
+        indices, pesos = _pesos_cic(posicion, origen, h, n)
+        malla_masa = np.bincount(indices.ravel(), weights=(pesos * masa[:, None]).ravel(),
+                                 minlength=n**3).reshape(n, n, n)
+
+        # Potencial phi = (-G/r) * rho por convolución, con relleno de ceros para contorno aislado
+        transformada = np.fft.rfftn(malla_masa, s=(2 * n, 2 * n, 2 * n), axes=(0, 1, 2))
+        potencial = np.fft.irfftn(transformada * self._transformada_green(), s=(2 * n, 2 * n, 2 * n), axes=(0, 1, 2))
+        potencial = potencial[:n, :n, :n] * (G / h)
+
+        # a = -grad(phi) en la malla, interpolada con CIC a cada cuerpo
+        aceleraciones = np.empty((num_cuerpos, 3))
+        for eje, gradiente in enumerate(np.gradient(potencial, h)):
+            aceleraciones[:, eje] = -np.einsum('ij,ij->i', gradiente.ravel()[indices], pesos)
+
+        potencial_cuerpos = None
+        if con_potencial:
+            # Se descuenta la autointeracción de la nube CIC de cada cuerpo consigo misma
+            potencial_cuerpos = np.einsum('ij,ij->i', potencial.ravel()[indices], pesos)
+            potencial_cuerpos -= (G / h) * masa * np.einsum('ia,ab,ib->i', pesos, _green_esquinas(), pesos)
+        return masa[:, None] * aceleraciones, potencial_cuerpos
+
+
+if __name__ == "__main__":
+    # Comparación rápida con la suma directa sobre el conjunto de prueba compartido
+    from Condiciones_iniciales import esfera_plummer
+    from Estado_arrays import fuerzas_directas
+    import time
+
+    for n in (1000, 4000, 16000):
+        masa, posicion, _ = esfera_plummer(n, semilla=42)
+        inicio = time.perf_counter()
+        exactas = fuerzas_directas(masa, posicion, 1.0)
+        t_directo = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        aproximadas = MotorParticulaMalla(celdas=64).calcular_fuerzas(masa, posicion, 1.0)
+        t_malla = time.perf_counter() - inicio
+        error = np.linalg.norm(aproximadas - exactas, axis=1) / np.linalg.norm(exactas, axis=1)
+        print(f"N={n}: directo {t_directo:.3f} s, malla {t_malla:.3f} s, error mediano {np.median(error):.2e}")
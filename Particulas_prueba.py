@@ -0,0 +1,110 @@
+from Estado_arrays import aceleraciones_directas
+import numpy as np
+
+# Partículas de prueba: cuerpos sin masa (asteroides, escombros) que sienten la gravedad de los
+# cuerpos masivos pero no la ejercen. No son CuerpoCeleste (que exige masa positiva): viven en
+# sus propios arrays, fuera de self.cuerpos, y no entran en las fuerzas entre cuerpos masivos,
+# en los diagnósticos de energía y momento, en las colisiones ni en guardar/cargar. Sus
+# aceleraciones se suman directamente sobre los N cuerpos masivos, así que un paso cuesta
+# O(N x (N + K)) con K partículas en lugar de O((N + K)^2).
+
+
+def aceleraciones_particulas(pos_particulas: np.ndarray, pos_masivos: np.ndarray, gm: np.ndarray) -> np.ndarray:
+    # a[k] = sum_j G * m_j * (r_j - r_k) / ||r_j - r_k||^3 sobre los cuerpos masivos j
+    if len(gm) == 0:
+        return np.zeros_like(pos_particulas)
+    return aceleraciones_directas(pos_particulas, pos_masivos, gm)
+
+
+class ParticulasPrueba:
+    # Como EstadoArrays, sin masa ni radio: capacidad que se duplica al llenarse, posicion y
+    # velocidad como vistas de las filas ocupadas, y eliminación por intercambio con la última
+    # fila, así que añadir y quitar cuestan O(1) amortizado.
+    def __init__(self, capacidad_inicial: int = 16):
+        self.ids: list[str] = []
+        self.indice: dict[str, int] = {}
+        self._reservar(capacidad_inicial)
+
+    def _reservar(self, capacidad: int):
+        self._posicion = np.zeros((capacidad, 3))
+        self._velocidad = np.zeros((capacidad, 3))
+
+    @property
+    def capacidad(self) -> int:
+        return len(self._posicion)
+
+    @property
+    def posicion(self) -> np.ndarray:
+        return self._posicion[:len(self.ids)]
+
+    @posicion.setter
+    def posicion(self, valor: np.ndarray):
+        self._posicion[:len(self.ids)] = valor
+
+    @property
+    def velocidad(self) -> np.ndarray:
+        return self._velocidad[:len(self.ids)]
+
+    @velocidad.setter
+    def velocidad(self, valor: np.ndarray):
+        self._velocidad[:len(self.ids)] = valor
+
+    def _asegurar_capacidad(self, num_particulas: int):
+        if num_particulas <= self.capacidad:
+            return
+        capacidad = max(1, self.capacidad)
+        while capacidad < num_particulas:
+            capacidad *= 2
+        n = len(self.ids)
+        posicion, velocidad = self.posicion, self.velocidad
+        self._reservar(capacidad)
+        self._posicion[:n] = posicion
+        self._velocidad[:n] = velocidad
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.indice
+
+    def agregar(self, id: str, posicion: list[float], velocidad: list[float]):
+        if id in self.indice:
+            raise ValueError(f"Ya existe una partícula con el ID '{id}'.")
+        fila = len(self.ids)
+        self._asegurar_capacidad(fila + 1)
+        self._posicion[fila] = posicion
+        self._velocidad[fila] = velocidad
+        self.indice[id] = fila
+        self.ids.append(id)
+
+    def agregar_lote(self, ids: list[str], posicion: np.ndarray, velocidad: np.ndarray):
+        # Añade muchas partículas con una sola copia por array
+        inicio = len(self.ids)
+        nuevos: dict[str, int] = {}
+        for i, p_id in enumerate(ids, start=inicio):
+            if p_id in self.indice or p_id in nuevos:
+                raise ValueError(f"Ya existe una partícula con el ID '{p_id}'.")
+            nuevos[p_id] = i
+        fin = inicio + len(nuevos)
+        self._asegurar_capacidad(fin)
+        self._posicion[inicio:fin] = np.asarray(posicion, dtype=float).reshape(-1, 3)
+        self._velocidad[inicio:fin] = np.asarray(velocidad, dtype=float).reshape(-1, 3)
+        self.ids.extend(ids)
+        self.indice.update(nuevos)
+
+    def eliminar(self, id: str):
+        # Intercambio con la última: la última partícula pasa a la fila de la eliminada
+        fila = self.indice.pop(id)
+        ultima = len(self.ids) - 1
+        if fila != ultima:
+            ultimo_id = self.ids[ultima]
+            self.ids[fila] = ultimo_id
+            self.indice[ultimo_id] = fila
+            self._posicion[fila] = self._posicion[ultima]
+            self._velocidad[fila] = self._velocidad[ultima]
+        self.ids.pop()
+
+    def limpiar(self, capacidad_inicial: int = 16):
+        self.ids.clear()
+        self.indice.clear()
+        self._reservar(capacidad_inicial)
@@ -0,0 +1,102 @@
+from Estado_arrays import ELEMENTOS_POR_BLOQUE
+import numpy as np
+
+# Motor de suma directa en precisión mixta. Las posiciones absolutas, las velocidades y el
+# resultado siguen en float64; dentro del núcleo las posiciones se guardan en float32 relativas
+# al centro de la caja que contiene los cuerpos (así no se pierde precisión si el sistema está
+# lejos del origen), y las matrices de pares se calculan en float32, lo que reduce a la mitad
+# la memoria temporal y el tráfico de memoria del núcleo. Antes de pasar a float32, las
+# posiciones se dividen por la semiarista L de la caja y los G·m por el mayor de ellos, así que
+# el núcleo trabaja con valores de orden 1 en cualquier sistema de unidades (en el SI, d^-3
+# desbordaría o se anularía en float32); la escala se aplica en float64 al final.
+#
+# Para que el error no crezca con N, cada suma sobre fuentes se hace por pares (np.sum sobre el
+# eje contiguo) dentro de cada bloque de fuentes, y los resultados de los bloques se acumulan con
+# suma compensada de Kahan. En una esfera de Plummer de 1000 a 5000 cuerpos, el error relativo
+# de las fuerzas frente a float64 es de ~1e-7 en la mediana y ~1e-5 como máximo (cuerpos cuya
+# fuerza neta casi se anula), y el de la energía potencial, de ~1e-8. Dos cuerpos a menos de
+# ~1e-7 veces el tamaño del sistema pueden caer en la misma posición float32 y se tratan como
+# coincidentes (no se atraen). Pruebas_precision_mixta.py compara el resultado con float64.
+FUENTES_POR_BLOQUE = 4096
+
+
+def _sumar_compensado(suma: np.ndarray, compensacion: np.ndarray, valor: np.ndarray):
+    # Suma de Kahan en el sitio: compensacion guarda lo que se perdió al redondear las sumas anteriores
+    corregido = valor - compensacion
+    total = suma + corregido
+    compensacion[...] = (total - suma) - corregido
+    suma[...] = total
+
+
+def _nucleo_mixto(masa: np.ndarray, posicion: np.ndarray, G: float, con_potencial: bool,
+                  fuentes_por_bloque: int) -> tuple[np.ndarray, np.ndarray | None, int]:
+    # Aceleraciones (N, 3) y potencial (N,) en float64 a partir de los cálculos en float32, y
+    # número de pares a distancia cero (incluido cada cuerpo consigo mismo)
+    num_cuerpos = len(masa)
+    if num_cuerpos == 0:
+        return np.zeros((0, 3)), (np.zeros(0) if con_potencial else None), 0
+    minimo, maximo = posicion.min(axis=0), posicion.max(axis=0)
+    centro = 0.5 * (minimo + maximo)
+    L = 0.5 * float(np.max(maximo - minimo)) or 1.0
+    gm = G * masa
+    gm_maxima = float(np.max(np.abs(gm))) or 1.0
+    # (3, N): cada eje contiguo, en unidades de L
+    relativa = np.ascontiguousarray(((posicion - centro) / L).T, dtype=np.float32)
+    gm_relativa = (gm / gm_maxima).astype(np.float32)
+
+    aceleraciones = np.zeros((3, num_cuerpos), dtype=np.float32)
+    compensacion = np.zeros((3, num_cuerpos), dtype=np.float32)
+    if con_potencial:
+        potencial = np.zeros(num_cuerpos, dtype=np.float32)
+        compensacion_potencial = np.zeros(num_cuerpos, dtype=np.float32)
+    pares_cero = 0
+    fuentes = min(num_cuerpos, fuentes_por_bloque)
+    filas = max(1, ELEMENTOS_POR_BLOQUE // fuentes)
+
+    for inicio in range(0, num_cuerpos, filas):
+        fin = min(inicio + filas, num_cuerpos)
+        objetivos = relativa[:, inicio:fin, None]
+        for inicio_f in range(0, num_cuerpos, fuentes):
+            fin_f = min(inicio_f + fuentes, num_cuerpos)
+            r = relativa[:, None, inicio_f:fin_f] - objetivos  # (3, filas, fuentes) en float32
+            distancia2 = r[0] * r[0] + r[1] * r[1] + r[2] * r[2]
+            inv_d = np.sqrt(distancia2)
+            np.divide(np.float32(1.0), inv_d, out=inv_d, where=distancia2 > 0)
+            gm_bloque = gm_relativa[inicio_f:fin_f]
+            peso = inv_d * inv_d * inv_d * gm_bloque
+            for eje in range(3):
+                _sumar_compensado(aceleraciones[eje, inicio:fin], compensacion[eje, inicio:fin],
+                                  np.sum(peso * r[eje], axis=1))
+            if con_potencial:
+                _sumar_compensado(potencial[inicio:fin], compensacion_potencial[inicio:fin],
+                                  -np.sum(inv_d * gm_bloque, axis=1))
+                pares_cero += int(np.count_nonzero(distancia2 == 0))
+
+    # a = G·m r / |r|^3 escala con G·m_max / L^2 y el potencial -G·m / |r|, con G·m_max / L
+    escala = gm_maxima / (L * L)
+    aceleraciones = aceleraciones.T.astype(np.float64) * escala
+    return aceleraciones, (potencial.astype(np.float64) * (escala * L) if con_potencial else None), pares_cero
+
+
+class MotorPrecisionMixta:
+    # Motor de fuerzas exacto (suma directa) con el núcleo en float32 y acumulación compensada.
+    # Se selecciona con Simulador(motor=MotorPrecisionMixta()).
+    def __init__(self, fuentes_por_bloque: int = FUENTES_POR_BLOQUE):
+        if fuentes_por_bloque < 1:
+            raise ValueError("El número de fuentes por bloque debe ser al menos 1.")
+        self.fuentes_por_bloque = fuentes_por_bloque
+        self.pares_cero = 0  # Pares a distancia cero omitidos en la última pasada con potencial
+
+    def calcular_fuerzas(self, masa: np.ndarray, posicion: np.ndarray, G: float) -> np.ndarray:
+        aceleraciones = _nucleo_mixto(masa, posicion, G, False, self.fuentes_por_bloque)[0]
+        return masa[:, None] * aceleraciones
+
+    def calcular_fuerzas_y_potencial(self, masa: np.ndarray, posicion: np.ndarray,
+                                     G: float) -> tuple[np.ndarray, float, np.ndarray]:
+        aceleraciones, potencial, self.pares_cero = _nucleo_mixto(masa, posicion, G, True, self.fuentes_por_bloque)
+        if self.pares_cero > len(masa):
+            energia = float('-inf')  # Cuerpos en la misma posición, potencial infinito
+        else:
+            # U = 1/2 sum_i m_i phi_i, sumado en float64 por pares
+            energia = 0.5 * float(np.sum(masa * potencial))
+        return masa[:, None] * aceleraciones, energia, potencial
@@ -0,0 +1,120 @@
+import pytest
+from Simulador import Simulador
+from Auto_checkpoint import AutoCheckpoint, checkpoints, ultimo_valido, reanudar, es_valido
+from Condiciones_iniciales import esfera_plummer
+from Clase_vector_3D import Vector3D
+from Cuerpos_celestes import CuerpoCeleste
+import os
+import numpy as np
+
+def crear_simulador(almacenamiento='arrays', integrador='leapfrog', n=25):
+    masa, posicion, velocidad = esfera_plummer(n, semilla=6)
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, integrador=integrador)
+    for i, (m, pos, vel) in enumerate(zip(masa.tolist(), posicion.tolist(), velocidad.tolist())):
+        sim.cuerpos[f"c{i}"] = CuerpoCeleste(f"c{i}", m, Vector3D(*pos), Vector3D(*vel))
+    return sim
+
+def estado(sim):
+    ids, masa, posicion, velocidad = sim._arrays_estado()
+    return list(ids), posicion.copy(), velocidad.copy()
+
+def test_checkpoints_periodicos_y_rotacion(tmp_path):
+    sim = crear_simulador()
+    with AutoCheckpoint(str(tmp_path), cada_pasos=4, conservar=2) as auto:
+        auto.conectar(sim)
+        for _ in range(17):
+            sim.ejecutar(1, 1e-3)
+            auto.vaciar()  # Escrituras terminadas, para que la cuenta sea determinista
+    assert [os.path.basename(a) for a in auto.escritos] == [f"checkpoint_{p:012d}.bin" for p in (4, 8, 12, 16)]
+    assert [os.path.basename(a) for a in checkpoints(str(tmp_path))] == ["checkpoint_000000000012.bin",
+                                                                        "checkpoint_000000000016.bin"]
+    assert not [a for a in os.listdir(tmp_path) if a.endswith(".tmp")]
+
+@pytest.mark.parametrize("almacenamiento,integrador", [('arrays', 'leapfrog'), ('objetos', 'euler'),
+                                                       ('arrays', 'yoshida4'), ('arrays', 'bloques')])
+def test_reanudar_bit_a_bit(tmp_path, capsys, almacenamiento, integrador):
+    original = crear_simulador(almacenamiento, integrador)
+    with AutoCheckpoint(str(tmp_path), cada_pasos=10) as auto:
+        auto.conectar(original)
+        original.ejecutar(10, 1e-3)
+        auto.vaciar()
+        original.ejecutar(15, 1e-3)
+
+    reanudado = Simulador(G=5.0, almacenamiento=almacenamiento, integrador=integrador)
+    assert reanudar(reanudado, str(tmp_path)).endswith("checkpoint_000000000020.bin")
+    assert reanudado.pasos == 20 and reanudado.G == 1.0
+    reanudado.ejecutar(5, 1e-3)
+    assert reanudado.tiempo == original.tiempo and reanudado.pasos == original.pasos
+    ids, posicion, velocidad = estado(original)
+    ids_r, posicion_r, velocidad_r = estado(reanudado)
+    assert ids_r == ids
+    assert np.array_equal(posicion_r, posicion) and np.array_equal(velocidad_r, velocidad)
+
+def test_ignora_checkpoints_incompletos(tmp_path, capsys):
+    sim = crear_simulador()
+    with AutoCheckpoint(str(tmp_path), cada_pasos=5, conservar=5) as auto:
+        auto.conectar(sim)
+        for _ in range(10):
+            sim.ejecutar(1, 1e-3)
+            auto.vaciar()
+    ultimo = checkpoints(str(tmp_path))[-1]
+    with open(ultimo, "r+b") as f:
+        f.truncate(os.path.getsize(ultimo) // 2)
+    assert not es_valido(ultimo)
+    assert ultimo_valido(str(tmp_path)).endswith("checkpoint_000000000005.bin")
+    nuevo = Simulador(G=1.0, almacenamiento='arrays')
+    reanudar(nuevo, str(tmp_path))
+    assert nuevo.pasos == 5
+    assert reanudar(Simulador(), str(tmp_path / "vacio")) is None
+
+def test_intervalo_en_segundos(tmp_path, monkeypatch):
+    import Auto_checkpoint
+    reloj = [0.0]
+    monkeypatch.setattr(Auto_checkpoint.time, "monotonic", lambda: reloj[0])
+    sim = crear_simulador()
+    with AutoCheckpoint(str(tmp_path), cada_segundos=10.0) as auto:
+        auto.conectar(sim)
+        for segundo in range(1, 26):
+            reloj[0] = float(segundo)
+            sim.ejecutar(1, 1e-3)
+            auto.vaciar()
+    assert [os.path.basename(a) for a in auto.escritos] == ["checkpoint_000000000010.bin",
+                                                           "checkpoint_000000000020.bin"]
+
+def test_un_solo_reemplazo_sincronizado(tmp_path, monkeypatch):
+    # Cada checkpoint es un temporal sincronizado y un único os.replace, seguido del fsync del directorio
+    operaciones = []
+    reemplazar, sincronizar = os.replace, os.fsync
+    monkeypatch.setattr(os, "replace", lambda *a: (operaciones.append("replace"), reemplazar(*a))[1])
+    monkeypatch.setattr(os, "fsync", lambda fd: (operaciones.append("fsync"), sincronizar(fd))[1])
+    sim = crear_simulador()
+    with AutoCheckpoint(str(tmp_path), cada_pasos=2) as auto:
+        auto.conectar(sim)
+        sim.ejecutar(2, 1e-3)
+        auto.vaciar()
+    assert operaciones == ["fsync", "replace", "fsync"]
+    assert es_valido(auto.escritos[0])
+
+def test_no_espera_a_la_escritura_en_curso(tmp_path):
+    sim = crear_simulador()
+    auto = AutoCheckpoint(str(tmp_path), cada_pasos=1)
+    auto.conectar(sim)
+    futuro = auto.guardar(sim)
+    llamadas = []
+    auto.guardar = lambda s: llamadas.append(s.pasos)
+    if not futuro.done():
+        auto(sim)  # Escritura en curso: se pospone, no se bloquea ni se encola
+        assert llamadas == []
+    futuro.result()
+    sim.pasos += 1
+    auto(sim)
+    assert llamadas == [sim.pasos]
+    auto.cerrar()
+
+def test_parametros_invalidos(tmp_path):
+    with pytest.raises(ValueError):
+        AutoCheckpoint(str(tmp_path))
+    with pytest.raises(ValueError):
+        AutoCheckpoint(str(tmp_path), cada_pasos=0)
+    with pytest.raises(ValueError):
+        AutoCheckpoint(str(tmp_path), cada_segundos=1.0, conservar=0)
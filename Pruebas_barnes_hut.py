@@ -0,0 +1,77 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Barnes_hut import MotorBarnesHut, Octree
+from Estado_arrays import fuerzas_directas
+import numpy as np
+
+# Constante de gravitación universal para pruebas
+G_TEST = 6.674e-11
+
+def _cuerpos_aleatorios(n, semilla=1):
+    rng = np.random.default_rng(semilla)
+    masa = rng.uniform(1e20, 1e22, n)
+    posicion = rng.normal(0.0, 1e9, (n, 3))
+    return masa, posicion
+
+def test_theta_negativo():
+    with pytest.raises(ValueError, match="theta no puede ser negativo"):
+        MotorBarnesHut(theta=-0.1)
+
+def test_octree_raiz_y_hojas():
+    masa, posicion = _cuerpos_aleatorios(200)
+    arbol = Octree(masa, posicion)
+    assert arbol.cuenta[0] == 200
+    assert arbol.masa[0] == pytest.approx(masa.sum())
+    assert np.allclose(arbol.centro_masa[0], masa @ posicion / masa.sum())
+    hojas = arbol.hijo_num == 0
+    assert arbol.cuenta[hojas].sum() == 200
+    # Los hijos de cada nodo interno cubren exactamente su rango
+    internos = np.flatnonzero(~hojas)
+    for nodo in internos[:20]:
+        hijos = slice(arbol.hijo_inicio[nodo], arbol.hijo_inicio[nodo] + arbol.hijo_num[nodo])
+        assert arbol.cuenta[hijos].sum() == arbol.cuenta[nodo]
+        assert arbol.inicio[hijos][0] == arbol.inicio[nodo]
+
+def test_theta_cero_es_exacto():
+    masa, posicion = _cuerpos_aleatorios(300)
+    exactas = fuerzas_directas(masa, posicion, G_TEST)
+    aproximadas = MotorBarnesHut(theta=0.0).calcular_fuerzas(masa, posicion, G_TEST)
+    assert np.allclose(aproximadas, exactas, rtol=1e-9, atol=0)
+
+def test_error_acotado_con_theta():
+    masa, posicion = _cuerpos_aleatorios(1000)
+    exactas = fuerzas_directas(masa, posicion, G_TEST)
+    aproximadas = MotorBarnesHut(theta=0.5).calcular_fuerzas(masa, posicion, G_TEST)
+    error = np.linalg.norm(aproximadas - exactas, axis=1) / np.linalg.norm(exactas, axis=1)
+    assert np.median(error) < 1e-2
+    # La fuerza total (tercera ley de Newton) se conserva aproximadamente
+    assert np.linalg.norm(aproximadas.sum(axis=0)) < 1e-2 * np.abs(exactas).sum(axis=0).max()
+
+def test_cuerpos_coincidentes():
+    masa = np.array([1.0, 1.0, 2.0])
+    posicion = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    fuerzas = MotorBarnesHut(theta=0.5).calcular_fuerzas(masa, posicion, 1.0)
+    assert np.allclose(fuerzas, fuerzas_directas(masa, posicion, 1.0))
+
+def test_simulador_con_barnes_hut(capsys):
+    for almacenamiento in ('objetos', 'arrays'):
+        sim = Simulador(G=G_TEST, almacenamiento=almacenamiento, motor=MotorBarnesHut(theta=0.0))
+        sim.agregar_cuerpo("C1", 100.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+        sim.agregar_cuerpo("C2", 50.0, Vector3D(3, 0, 0), Vector3D(0, 0, 0))
+        fuerzas = sim.calcular_fuerzas()
+        esperada = G_TEST * 100.0 * 50.0 / 3.0**2
+        assert fuerzas["C1"].x == pytest.approx(esperada)
+        assert fuerzas["C2"].x == pytest.approx(-esperada)
+        sim.paso_simulacion(1.0)
+        assert sim.cuerpos["C1"].velocidad.x == pytest.approx(esperada / 100.0)
+
+def test_potencial_en_la_misma_pasada():
+    from Estado_arrays import fuerzas_y_potencial_directos
+    masa, posicion = _cuerpos_aleatorios(500)
+    _, energia, potenciales = fuerzas_y_potencial_directos(masa, posicion, G_TEST)
+    _, energia_exacta, potenciales_exactos = MotorBarnesHut(theta=0.0).calcular_fuerzas_y_potencial(masa, posicion, G_TEST)
+    assert energia_exacta == pytest.approx(energia, rel=1e-10)
+    assert np.allclose(potenciales_exactos, potenciales, rtol=1e-10)
+    _, energia_aprox, _ = MotorBarnesHut(theta=0.5).calcular_fuerzas_y_potencial(masa, posicion, G_TEST)
+    assert energia_aprox == pytest.approx(energia, rel=1e-3)
@@ -0,0 +1,50 @@
+import pytest
+from Benchmarks import ejecutar_benchmarks, crear_simulador, main, _operaciones
+import numpy as np
+import json
+
+def test_condiciones_reproducibles():
+    a = crear_simulador(50, semilla=7)
+    b = crear_simulador(50, semilla=7)
+    assert np.array_equal(a.estado.posicion, b.estado.posicion)
+    objetos = crear_simulador(50, almacenamiento='objetos', semilla=7)
+    assert objetos.cuerpos["c3"].posicion.to_list() == a.estado.posicion[3].tolist()
+
+def test_resultados(capsys):
+    informe = ejecutar_benchmarks(tamanos=(10, 30), motores=('directo', 'barnes_hut'), presupuesto=0.0)
+    resultados = informe["resultados"]
+    assert {r["operacion"] for r in resultados} >= {"calcular_fuerzas", "paso_simulacion", "diagnosticos",
+                                                   "guardar_binario", "cargar_csv", "cargar_json"}
+    assert {(r["motor"], r["n"]) for r in resultados} == {("directo", 10), ("directo", 30),
+                                                          ("barnes_hut", 10), ("barnes_hut", 30)}
+    for r in resultados:
+        assert r["segundos"] > 0 and r["repeticiones"] == 1 and r["memoria_pico_bytes"] >= 0
+    fuerzas = next(r for r in resultados if r["operacion"] == "calcular_fuerzas" and r["n"] == 30)
+    # Pares distintos, como pares_evaluados en Instrumentacion
+    assert fuerzas["pares_por_segundo"] == pytest.approx(30 * 29 / 2 / fuerzas["segundos"])
+    paso = next(r for r in resultados if r["operacion"] == "paso_simulacion")
+    assert paso["pasos_por_segundo"] == pytest.approx(1 / paso["segundos"])
+    # El simulador no imprime nada durante las medidas
+    assert capsys.readouterr().out == ""
+
+@pytest.mark.parametrize("almacenamiento", ['arrays', 'objetos'])
+def test_diagnosticos_sin_cache(tmp_path, almacenamiento):
+    # Cada repetición medida vuelve a evaluar las fuerzas en lugar de servirlas de la caché
+    sim = crear_simulador(20, almacenamiento)
+    diagnosticos = _operaciones(sim, str(tmp_path))['diagnosticos']
+    sim.instrumentacion.activar()
+    for _ in range(3):
+        diagnosticos()
+    assert sim.instrumentacion.a_dict()["contadores"]["evaluaciones_fuerza"] == 3
+
+def test_omitidos():
+    informe = ejecutar_benchmarks(tamanos=(2000,), motores=('directo',), almacenamientos=('objetos',))
+    assert informe["resultados"] == []
+    assert informe["omitidos"] == [{"motor": "directo", "almacenamiento": "objetos", "n": 2000}]
+
+def test_main_json(tmp_path):
+    salida = tmp_path / "resultados.json"
+    main(["--tamanos", "10", "--motores", "malla", "--presupuesto", "0", "--salida", str(salida)])
+    informe = json.loads(salida.read_text())
+    assert informe["entorno"]["semilla"] == 0
+    assert all(r["motor"] == "malla" for r in informe["resultados"])
@@ -0,0 +1,95 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Carga_streaming import leer_csv_por_bloques, ResumenCarga, ID_DUPLICADO, MASA_NO_POSITIVA, RADIO_NEGATIVO
+from Estado_arrays import EstadoArrays
+import numpy as np
+
+ENCABEZADO = "id;masa;pos_x;pos_y;pos_z;vel_x;vel_y;vel_z\n"
+
+def _escribir(ruta, filas):
+    ruta.write_text(ENCABEZADO + "".join(";".join(map(str, fila)) + "\n" for fila in filas))
+    return str(ruta)
+
+def test_bloques_y_resumen(tmp_path):
+    filas = [[f"c{i}", 1.0 + i, i, 2 * i, 3 * i, 0.5, 0.25, 0.125] for i in range(10)]
+    filas[2] = ["c2", "abc", 0, 0, 0, 0, 0, 0]
+    filas[5] = ["c5", 1.0, 0, 0]
+    filas[7] = ["c7", -3.0, 0, 0, 0, 0, 0, 0]
+    filas[9] = ["c0", 1.0, 0, 0, 0, 0, 0, 0]
+    archivo = _escribir(tmp_path / "catalogo.csv", filas)
+
+    resumen = ResumenCarga()
+    bloques = list(leer_csv_por_bloques(archivo, resumen, filas_por_bloque=3))
+    assert len(bloques) == 3
+    ids = [c_id for bloque in bloques for c_id in bloque[0]]
+    assert ids == ["c0", "c1", "c3", "c4", "c6", "c8"]
+    masa = np.concatenate([bloque[1] for bloque in bloques])
+    assert masa.tolist() == [1.0, 2.0, 4.0, 5.0, 7.0, 9.0]
+    assert bloques[-1][2].tolist() == [[6.0, 12.0, 18.0], [8.0, 16.0, 24.0]]
+
+    assert resumen.cargados == 6
+    assert resumen.total_errores == 4
+    assert resumen.errores[MASA_NO_POSITIVA] == 1
+    assert resumen.errores[ID_DUPLICADO] == 1
+    assert [fila for fila, _, _ in resumen.ejemplos] == [3, 6, 8, 10]
+    assert "Se omitieron 4 filas" in str(resumen)
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_cargar_csv_con_errores(almacenamiento, tmp_path, capsys):
+    filas = [["A", 1.0, 1, 2, 3, 4, 5, 6], ["B", "x", 0, 0, 0, 0, 0, 0], ["C", 2.0, 0.1, 0.2, 0.3, 0, 0, 0]]
+    sim = Simulador(almacenamiento=almacenamiento)
+    sim.cargar(_escribir(tmp_path / "catalogo.csv", filas), 'csv')
+    salida = capsys.readouterr().out
+    # Un solo resumen en lugar de un mensaje por fila
+    assert salida.count("Se omitieron 1 filas (1 por valor no numérico)") == 1
+    assert "Se cargaron 2 cuerpos" in salida
+    assert list(sim.cuerpos) == ["A", "C"]
+    assert sim.cuerpos["A"].velocidad.to_list() == [4.0, 5.0, 6.0]
+
+def test_cargar_csv_grande_por_bloques(tmp_path, capsys):
+    rng = np.random.default_rng(0)
+    n = 2500
+    sim = Simulador(almacenamiento='arrays')
+    for i, (m, p, v) in enumerate(zip(rng.uniform(1, 2, n), rng.normal(size=(n, 3)), rng.normal(size=(n, 3)))):
+        sim.estado.agregar(f"e{i}", m, p, v)
+    archivo = str(tmp_path / "grande.csv")
+    sim.guardar(archivo, 'csv')
+    nuevo = Simulador(almacenamiento='arrays')
+    nuevo._cargar_csv(archivo, filas_por_bloque=1000)
+    assert nuevo.estado.ids == sim.estado.ids
+    assert np.array_equal(nuevo.estado.masa, sim.estado.masa)
+    assert np.array_equal(nuevo.estado.posicion, sim.estado.posicion)
+    assert np.array_equal(nuevo.estado.velocidad, sim.estado.velocidad)
+
+def test_agregar_lote_duplicado():
+    estado = EstadoArrays()
+    estado.agregar_lote(["A", "B"], np.ones(2), np.zeros((2, 3)), np.zeros((2, 3)))
+    assert estado.indice == {"A": 0, "B": 1}
+    with pytest.raises(ValueError, match="Ya existe un cuerpo con el ID 'B'."):
+        estado.agregar_lote(["C", "B"], np.ones(2), np.zeros((2, 3)), np.zeros((2, 3)))
+    with pytest.raises(ValueError, match="Ya existe un cuerpo con el ID 'D'."):
+        estado.agregar_lote(["D", "D"], np.ones(2), np.zeros((2, 3)), np.zeros((2, 3)))
+    assert len(estado) == 2
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_radio_ida_y_vuelta(almacenamiento, tmp_path, capsys):
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento)
+    sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0), radio=0.25)
+    sim.agregar_cuerpo("B", 2.0, Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    archivo = str(tmp_path / "radios.csv")
+    sim.guardar(archivo, 'csv')
+    nuevo = Simulador(G=1.0, almacenamiento=almacenamiento)
+    nuevo.cargar(archivo, 'csv')
+    assert [nuevo.cuerpos[c].radio for c in ("A", "B")] == [0.25, 0.0]
+
+def test_radio_opcional_y_negativo(tmp_path):
+    # Sin columna radio (archivos anteriores) el radio es 0; con ella, los negativos se descartan
+    sin_radio = list(leer_csv_por_bloques(_escribir(tmp_path / "sin.csv", [["A", 1.0, 0, 0, 0, 0, 0, 0]])))
+    assert sin_radio[0][4].tolist() == [0.0]
+    archivo = tmp_path / "con.csv"
+    archivo.write_text(ENCABEZADO.replace("\n", ";radio\n") + "A;1;0;0;0;0;0;0;0.5\nB;1;1;0;0;0;0;0;-1\n")
+    resumen = ResumenCarga()
+    bloques = list(leer_csv_por_bloques(str(archivo), resumen))
+    assert bloques[0][0] == ["A"] and bloques[0][4].tolist() == [0.5]
+    assert resumen.errores == {RADIO_NEGATIVO: 1}
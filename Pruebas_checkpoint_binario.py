@@ -0,0 +1,100 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Checkpoint_binario import escribir_checkpoint, leer_checkpoint, leer_cabecera, ALINEACION
+from Condiciones_iniciales import esfera_plummer
+import os
+import numpy as np
+
+def _poblar(sim):
+    sim.agregar_cuerpo("Sol", 1.989e30, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("Tierra", 5.972e24, Vector3D(1.5e11, 0, 0), Vector3D(0, 29780.123456789, 0))
+    sim.agregar_cuerpo("Señal ☄", 7.342e22, Vector3D(1.5e11 + 3.84e8, 1 / 3, -2 / 7), Vector3D(0, 3e4 + 1e3, 0.1))
+    return sim
+
+def test_ida_y_vuelta_sin_perdida(tmp_path):
+    masa, posicion, velocidad = esfera_plummer(1000, semilla=3)
+    ids = [f"c{i}" for i in range(1000)]
+    archivo = str(tmp_path / "estado.bin")
+    escribir_checkpoint(archivo, ids, masa, posicion, velocidad, 1.0, 12.5)
+    datos = leer_checkpoint(archivo)
+    assert isinstance(datos["posicion"], np.memmap)
+    assert datos["ids"] == ids
+    assert datos["G"] == 1.0 and datos["tiempo"] == 12.5
+    assert np.array_equal(datos["masa"], masa)
+    assert np.array_equal(datos["posicion"], posicion)
+    assert np.array_equal(datos["velocidad"], velocidad)
+    for columna in leer_cabecera(archivo)["columnas"].values():
+        assert columna["desplazamiento"] % ALINEACION == 0
+
+def test_copia_en_escritura_no_modifica_archivo(tmp_path):
+    archivo = str(tmp_path / "estado.bin")
+    escribir_checkpoint(archivo, ["A", "B"], np.ones(2), np.zeros((2, 3)), np.zeros((2, 3)), 1.0, 0.0)
+    datos = leer_checkpoint(archivo)
+    datos["posicion"][0] += 5.0
+    assert np.all(leer_checkpoint(archivo)["posicion"] == 0)
+
+def test_archivo_no_valido(tmp_path):
+    archivo = tmp_path / "estado.bin"
+    archivo.write_bytes(b"esto no es un checkpoint")
+    with pytest.raises(ValueError, match="no es un checkpoint binario válido"):
+        leer_checkpoint(str(archivo))
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_guardar_cargar_binario(almacenamiento, tmp_path, capsys):
+    sim = _poblar(Simulador(G=6.674e-11, almacenamiento=almacenamiento))
+    sim.ejecutar(5, 100.0)
+    archivo = str(tmp_path / "estado.bin")
+    sim.guardar(archivo, 'binario')
+
+    nuevo = Simulador(almacenamiento=almacenamiento)
+    nuevo.agregar_cuerpo("Temp", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    nuevo.cargar(archivo, 'binario')
+    # Por defecto, con arrays el estado se abre como memmap sin copiarlo a memoria
+    assert isinstance(getattr(nuevo.estado, "posicion", None), np.memmap) == (almacenamiento == 'arrays')
+    assert nuevo.G == sim.G
+    assert nuevo.tiempo == sim.tiempo == 500.0
+    assert list(nuevo.cuerpos) == list(sim.cuerpos)
+    for c_id, cuerpo in sim.cuerpos.items():
+        cargado = nuevo.cuerpos[c_id]
+        assert cargado.masa == cuerpo.masa
+        assert cargado.posicion.to_list() == cuerpo.posicion.to_list()
+        assert cargado.velocidad.to_list() == cuerpo.velocidad.to_list()
+    assert "Se cargaron 3 cuerpos" in capsys.readouterr().out
+
+    # La simulación cargada continúa igual que la original
+    sim.ejecutar(3, 100.0)
+    nuevo.ejecutar(3, 100.0)
+    for c_id, cuerpo in sim.cuerpos.items():
+        assert nuevo.cuerpos[c_id].posicion.to_list() == cuerpo.posicion.to_list()
+
+def test_cargar_binario_errores(tmp_path, capsys):
+    sim = Simulador()
+    sim.cargar(str(tmp_path / "no_existe.bin"), 'binario')
+    assert "no se encontró" in capsys.readouterr().out
+    archivo = tmp_path / "malo.bin"
+    archivo.write_bytes(b"xx")
+    sim.cargar(str(archivo), 'binario')
+    assert "no es un checkpoint binario válido" in capsys.readouterr().out
+
+@pytest.mark.parametrize("perezoso", [False, True])
+def test_guardar_sobre_el_archivo_cargado(perezoso, tmp_path):
+    # Cargar estado.bin y guardar en estado.bin: el archivo se sustituye por uno nuevo en lugar
+    # de truncarse, así que ni el estado cargado (aunque sea perezoso) ni el archivo se corrompen
+    archivo = str(tmp_path / "estado.bin")
+    original = _poblar(Simulador(G=1.0, almacenamiento='arrays'))
+    original.guardar(archivo, 'binario')
+    sim = Simulador(almacenamiento='arrays')
+    sim.cargar(archivo, 'binario', perezoso=perezoso)
+    assert isinstance(sim.estado.posicion, np.memmap) == perezoso
+    sim.ejecutar(3, 0.1)
+    esperado = sim.estado.posicion.copy()
+    sim.guardar(archivo, 'binario')
+    assert np.array_equal(sim.estado.posicion, esperado)
+
+    otro = Simulador(almacenamiento='arrays')
+    otro.cargar(archivo, 'binario')
+    assert list(otro.cuerpos) == list(sim.cuerpos)
+    assert np.array_equal(otro.estado.posicion, esperado)
+    assert otro.pasos == 3
+    assert [nombre for nombre in os.listdir(tmp_path)] == ["estado.bin"]
@@ -0,0 +1,82 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Cuerpos_celestes import CuerpoCeleste
+from Colisiones import pares_en_contacto, grupos_de_colision
+import numpy as np
+
+def _pares_fuerza_bruta(posicion, radio):
+    i, j = np.triu_indices(len(posicion), k=1)
+    distancia = np.linalg.norm(posicion[i] - posicion[j], axis=1)
+    contacto = distancia < radio[i] + radio[j]
+    return np.column_stack([i[contacto], j[contacto]])
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_malla_igual_que_fuerza_bruta(semilla):
+    rng = np.random.default_rng(semilla)
+    posicion = rng.uniform(-1, 1, size=(1500, 3))
+    radio = rng.uniform(0.0, 0.03, 1500)
+    radio[:5] = 0.2  # Algunos cuerpos grandes fuerzan celdas grandes
+    pares = pares_en_contacto(posicion, radio)
+    assert len(pares) > 0
+    assert np.array_equal(pares, _pares_fuerza_bruta(posicion, radio))
+
+def test_extension_enorme():
+    # Con radios diminutos frente a la extensión, las celdas se agrandan para que quepan las claves
+    posicion = np.array([[0.0, 0, 0], [1e-3, 0, 0], [1e15, 0, 0], [1e15, 1e-3, 0]])
+    radio = np.full(4, 1e-3)
+    assert pares_en_contacto(posicion, radio).tolist() == [[0, 1], [2, 3]]
+
+def test_radio_cero_no_choca():
+    posicion = np.zeros((3, 3))
+    assert len(pares_en_contacto(posicion, np.zeros(3))) == 0
+
+def test_grupos_en_cadena():
+    grupos = grupos_de_colision(6, np.array([[0, 1], [4, 5], [1, 2]]))
+    assert sorted(sorted(g.tolist()) for g in grupos) == [[0, 1, 2], [4, 5]]
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_fusion_conserva_masa_y_momento(almacenamiento, capsys):
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, colisiones=True)
+    sim.agregar_cuerpo("Grande", 3.0, Vector3D(0, 0, 0), Vector3D(1, 0, 0), radio=0.1)
+    sim.agregar_cuerpo("Chico", 1.0, Vector3D(0.5, 0, 0), Vector3D(-1, 0.5, 0), radio=0.05)
+    sim.agregar_cuerpo("Lejano", 1e-3, Vector3D(50, 0, 0), Vector3D(0, 0.1, 0), radio=0.05)
+    momento_inicial = sim.diagnosticos()["momento_lineal"].to_list()
+
+    for _ in range(100):
+        sim.ejecutar(1, 0.01)
+        if len(sim.cuerpos) == 2:
+            break
+    assert list(sim.cuerpos) == ["Grande", "Lejano"]
+    grande = sim.cuerpos["Grande"]
+    assert grande.masa == 4.0
+    assert grande.radio == pytest.approx((0.1**3 + 0.05**3) ** (1 / 3))
+    momento_final = sim.diagnosticos()["momento_lineal"].to_list()
+    assert momento_final == pytest.approx(momento_inicial, abs=1e-12)
+
+def test_resolver_colisiones_devuelve_fusiones(capsys):
+    sim = Simulador(G=1.0, almacenamiento='arrays')
+    for i, x in enumerate([0.0, 0.15, 0.3, 5.0]):
+        sim.agregar_cuerpo(f"c{i}", 1.0 + i, Vector3D(x, 0, 0), Vector3D(0, 0, 0), radio=0.1)
+    sim.instrumentacion.activar()
+    fusiones = sim.resolver_colisiones()
+    assert fusiones == [("c2", ["c0", "c1"])]
+    assert sorted(sim.estado.ids) == ["c2", "c3"]
+    assert sim.cuerpos["c2"].posicion.x == pytest.approx((0.15 * 2 + 0.3 * 3) / 6)
+    assert sim.instrumentacion.contadores["fusiones"] == 2
+
+def test_radio_en_cuerpo_y_persistencia(tmp_path, capsys):
+    with pytest.raises(ValueError, match="El radio de un cuerpo celeste no puede ser negativo."):
+        CuerpoCeleste("X", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0), radio=-1)
+    cuerpo = CuerpoCeleste("X", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0), radio=2.5)
+    assert CuerpoCeleste.from_dict(cuerpo.to_dict()).radio == 2.5
+
+    for almacenamiento in ('objetos', 'arrays'):
+        sim = Simulador(almacenamiento=almacenamiento)
+        sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0), radio=0.7)
+        for formato in ('json', 'binario'):
+            archivo = str(tmp_path / f"estado.{formato}")
+            sim.guardar(archivo, formato)
+            nuevo = Simulador(almacenamiento=almacenamiento)
+            nuevo.cargar(archivo, formato)
+            assert nuevo.cuerpos["A"].radio == 0.7
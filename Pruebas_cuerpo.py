@@ -105,4 +105,18 @@ def test_cuerpo_to_from_dict():
     assert loaded_cuerpo.posicion.z == 3.0
     assert loaded_cuerpo.velocidad.x == 0.1
     assert loaded_cuerpo.velocidad.y == 0.2
-    assert loaded_cuerpo.velocidad.z == 0.3
\ No newline at end of file
+    assert loaded_cuerpo.velocidad.z == 0.3
+
+def test_cuerpo_no_comparte_vectores():
+    # Ni los vectores de entrada ni los obtenidos antes de avanzar cambian con aplicar_fuerza y mover
+    pos = Vector3D(0, 0, 0)
+    vel = Vector3D(1, 0, 0)
+    cuerpo = CuerpoCeleste("Test", 1.0, pos, vel)
+    posicion_antes, velocidad_antes = cuerpo.posicion, cuerpo.velocidad
+    cuerpo.aplicar_fuerza(Vector3D(1, 0, 0), 1.0)
+    cuerpo.mover(1.0)
+    assert pos.to_list() == [0, 0, 0]
+    assert vel.to_list() == [1, 0, 0]
+    assert posicion_antes.to_list() == [0, 0, 0]
+    assert velocidad_antes.to_list() == [1, 0, 0]
+    assert cuerpo.posicion.to_list() == [2.0, 0.0, 0.0]
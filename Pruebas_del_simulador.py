@@ -35,12 +35,42 @@ def test_agregar_cuerpo_duplicado(simulador_vacio):
     with pytest.raises(ValueError, match="Ya existe un cuerpo con el ID 'Mercurio'."):
         simulador_vacio.agregar_cuerpo("Mercurio", 3.301e23, Vector3D(1, 1, 1), Vector3D(1, 1, 1))
 
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_eliminar_cuerpo(almacenamiento):
+    sim = Simulador(G=G_TEST, almacenamiento=almacenamiento)
+    sim.agregar_cuerpo("Sol", 1.989e30, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("Tierra", 5.972e24, Vector3D(1.5e11, 0, 0), Vector3D(0, 3e4, 0))
+    sim.agregar_cuerpo("Marte", 6.39e23, Vector3D(2.28e11, 0, 0), Vector3D(0, 2.4e4, 0))
+    fuerzas_antes = sim.calcular_fuerzas()
+    eliminado = sim.eliminar_cuerpo("Sol")
+    assert eliminado.masa == 1.989e30 and eliminado.posicion.to_list() == [0, 0, 0]
+    assert sorted(sim.cuerpos) == ["Marte", "Tierra"]
+    assert sim.obtener_cuerpo("Marte").posicion.x == 2.28e11
+    # Las fuerzas se recalculan con el nuevo conjunto de cuerpos
+    assert sim.calcular_fuerzas()["Tierra"].x > 0 > fuerzas_antes["Tierra"].x
+    with pytest.raises(ValueError, match="No existe un cuerpo con el ID 'Sol'."):
+        sim.eliminar_cuerpo("Sol")
+
 def test_obtener_cuerpo(simulador_con_cuerpos):
     tierra = simulador_con_cuerpos.obtener_cuerpo("Tierra")
     assert tierra is not None
     assert tierra.id == "Tierra"
     assert simulador_con_cuerpos.obtener_cuerpo("NoExiste") is None
 
+@pytest.mark.parametrize("integrador", ['euler', 'leapfrog'])
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_vectores_obtenidos_no_cambian_al_avanzar(almacenamiento, integrador):
+    # En los dos almacenamientos, un vector obtenido antes de avanzar guarda el estado de ese momento
+    sim = Simulador(G=G_TEST, almacenamiento=almacenamiento, integrador=integrador)
+    sim.agregar_cuerpo("Sol", 1.989e30, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("Tierra", 5.972e24, Vector3D(1.5e11, 0, 0), Vector3D(0, 3e4, 0))
+    p0 = sim.obtener_cuerpo("Tierra").posicion
+    v0 = sim.obtener_cuerpo("Tierra").velocidad
+    sim.ejecutar(10, 3600)
+    p1 = sim.obtener_cuerpo("Tierra").posicion
+    assert p0.to_list() == [1.5e11, 0, 0] and v0.to_list() == [0, 3e4, 0]
+    assert (p1 - p0).magnitude() == pytest.approx(3e4 * 36000, rel=1e-3)
+
 def test_listar_cuerpos(simulador_vacio, capsys):
     simulador_vacio.listar_cuerpos()
     captured = capsys.readouterr()
@@ -210,7 +240,7 @@ def test_guardar_cargar_csv(simulador_con_cuerpos, tmp_path):
         reader = csv.reader(f, delimiter=';')
         header = next(reader)
         rows = list(reader)
-    assert len(header) == 8 # id, masa, pos_x, pos_y, pos_z, vel_x, vel_y, vel_z
+    assert len(header) == 9 # id, masa, pos_x, pos_y, pos_z, vel_x, vel_y, vel_z, radio
     assert len(rows) == 3 # Sol, Tierra, Luna
     assert rows[0][0] == "Sol"
     assert float(rows[1][1]) == 5.972e24 # Masa de Tierra
@@ -248,4 +278,126 @@ def test_cargar_vacia_coleccion_existente(simulador_vacio):
     simulador_vacio.cargar(empty_json_path)
     assert len(simulador_vacio.cuerpos) == 0 # La colección debe estar vacía después de cargar
 
-    os.remove(empty_json_path) # Limpiar archivo de prueba
\ No newline at end of file
+    os.remove(empty_json_path) # Limpiar archivo de prueba
+
+# --- Pruebas de ejecución por lotes ---
+
+def test_ejecutar_sin_salida(simulador_con_cuerpos, capsys):
+    capsys.readouterr()
+    simulador_con_cuerpos.ejecutar(50, 100.0)
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert simulador_con_cuerpos.tiempo == pytest.approx(5000.0)
+
+def test_ejecutar_equivale_a_pasos_sueltos(simulador_con_cuerpos, capsys):
+    referencia = Simulador(G=G_TEST)
+    for cuerpo in simulador_con_cuerpos.cuerpos.values():
+        referencia.agregar_cuerpo(cuerpo.id, cuerpo.masa, cuerpo.posicion, cuerpo.velocidad)
+    for _ in range(10):
+        referencia.paso_simulacion(100.0)
+    simulador_con_cuerpos.ejecutar(10, 100.0)
+    for c_id, cuerpo in referencia.cuerpos.items():
+        assert simulador_con_cuerpos.cuerpos[c_id].posicion.to_list() == cuerpo.posicion.to_list()
+
+def test_ejecutar_callback_con_cadencia(simulador_con_cuerpos, capsys):
+    recibidos = []
+    simulador_con_cuerpos.ejecutar(10, 100.0, diagnosticos_cada=3, callback=recibidos.append)
+    assert [d["paso"] for d in recibidos] == [3, 6, 9]
+    assert recibidos[-1]["tiempo"] == pytest.approx(900.0)
+    for d in recibidos:
+        assert d["energia_total"] == pytest.approx(d["energia_cinetica"] + d["energia_potencial"])
+    assert "Energía Cinética Total" not in capsys.readouterr().out
+
+def test_ejecutar_diagnosticos_por_consola(simulador_con_cuerpos, capsys):
+    capsys.readouterr()
+    simulador_con_cuerpos.ejecutar(4, 100.0, diagnosticos_cada=2)
+    assert capsys.readouterr().out.count("Energía Cinética Total") == 2
+
+def test_ejecutar_parametros_invalidos(simulador_con_cuerpos):
+    with pytest.raises(ValueError, match="El paso de tiempo debe ser positivo."):
+        simulador_con_cuerpos.ejecutar(10, 0.0)
+    with pytest.raises(ValueError, match="El número de pasos no puede ser negativo."):
+        simulador_con_cuerpos.ejecutar(-1, 1.0)
+    with pytest.raises(ValueError, match="La frecuencia de diagnósticos debe ser 0 o mayor."):
+        simulador_con_cuerpos.ejecutar(10, 1.0, diagnosticos_cada=-1)
+    assert simulador_con_cuerpos.pasos == 0
+
+
+# --- Pruebas de la pasada fusionada de fuerzas y potencial ---
+
+def test_calcular_fuerzas_y_potencial(simulador_con_cuerpos):
+    fuerzas, energia, potenciales = simulador_con_cuerpos.calcular_fuerzas_y_potencial()
+    cuerpos_list = list(simulador_con_cuerpos.cuerpos.values())
+    esperada = 0.0
+    for i in range(len(cuerpos_list)):
+        for j in range(i + 1, len(cuerpos_list)):
+            esperada += cuerpos_list[i].energia_potencial_con(cuerpos_list[j], G_TEST)
+    assert energia == pytest.approx(esperada, rel=1e-12)
+
+    sol = simulador_con_cuerpos.cuerpos["Sol"]
+    tierra = simulador_con_cuerpos.cuerpos["Tierra"]
+    luna = simulador_con_cuerpos.cuerpos["Luna"]
+    esperado_sol = (-G_TEST * tierra.masa / (tierra.posicion - sol.posicion).magnitude()
+                    - G_TEST * luna.masa / (luna.posicion - sol.posicion).magnitude())
+    assert potenciales["Sol"] == pytest.approx(esperado_sol, rel=1e-12)
+
+    referencia = simulador_con_cuerpos.calcular_fuerzas()
+    for c_id, fuerza in referencia.items():
+        assert fuerzas[c_id].to_list() == fuerza.to_list()
+
+def test_potencial_misma_posicion(simulador_vacio):
+    simulador_vacio.cuerpos["C1"] = CuerpoCeleste("C1", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    simulador_vacio.cuerpos["C2"] = CuerpoCeleste("C2", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    assert simulador_vacio.calcular_fuerzas_y_potencial()[1] == float('-inf')
+
+class _MotorContador:
+    def __init__(self):
+        self.llamadas = 0
+
+    def calcular_fuerzas(self, masa, posicion, G):
+        self.llamadas += 1
+        from Estado_arrays import fuerzas_directas
+        return fuerzas_directas(masa, posicion, G)
+
+def test_diagnosticos_reutilizan_fuerzas(capsys):
+    motor = _MotorContador()
+    sim = Simulador(G=G_TEST, almacenamiento='arrays', motor=motor)
+    sim.agregar_cuerpo("C1", 1e10, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("C2", 1e10, Vector3D(100, 0, 0), Vector3D(0, 0, 0))
+    sim.ejecutar(10, 1.0, diagnosticos_cada=1, callback=lambda d: None)
+    # Una evaluación por paso: la de los diagnósticos sirve para el paso siguiente
+    assert motor.llamadas == 11
+
+    # Si el estado cambia entre pasos, las fuerzas guardadas no se reutilizan
+    sim.cuerpos["C2"].posicion = Vector3D(50, 0, 0)
+    sim.paso_simulacion(1.0)
+    assert motor.llamadas == 13
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_acoplamientos_se_invalidan_al_cambiar_masas(almacenamiento):
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento)
+    sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("B", 2.0, Vector3D(1, 0, 0), Vector3D(0, 0, 0))
+    assert sim.calcular_fuerzas()["A"].x == pytest.approx(2.0)
+    sim.cuerpos["B"].masa = 4.0
+    assert sim.calcular_fuerzas()["A"].x == pytest.approx(4.0)
+    sim.G = 0.5
+    assert sim.calcular_fuerzas()["A"].x == pytest.approx(2.0)
+    sim.cuerpos["B"] = CuerpoCeleste("B", 8.0, Vector3D(1, 0, 0), Vector3D(0, 0, 0))
+    assert sim.calcular_fuerzas()["A"].x == pytest.approx(4.0)
+    sim.agregar_cuerpo("C", 2.0, Vector3D(-1, 0, 0), Vector3D(0, 0, 0))
+    assert sim.calcular_fuerzas()["A"].x == pytest.approx(3.0)
+    sim.eliminar_cuerpo("B")
+    assert sim.calcular_fuerzas()["A"].x == pytest.approx(-1.0)
+    # Los diagnósticos usan los mismos acoplamientos para la energía potencial
+    assert sim.diagnosticos()["energia_potencial"] == pytest.approx(-0.5 * 1.0 * 2.0 / 1.0)
+
+def test_acoplamientos_reutilizados_mientras_no_cambian():
+    sim = Simulador(G=1.0)
+    sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("B", 2.0, Vector3D(1, 0, 0), Vector3D(0, 0, 0))
+    sim.ejecutar(3, 0.01)
+    acoplamientos = sim._cache_acoplamientos
+    sim.ejecutar(3, 0.01)
+    assert sim._cache_acoplamientos is acoplamientos
+    assert acoplamientos["pares"] == [[2.0], []]
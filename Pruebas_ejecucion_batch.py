@@ -0,0 +1,76 @@
+import pytest
+from Ejecucion_batch import ejecutar_escenario, ejecutar_batch, crear_motor
+from Checkpoint_binario import leer_checkpoint
+from Trayectorias import LectorTrayectoria
+import json
+
+ESCENARIO = {
+    "G": 1.0,
+    "almacenamiento": "arrays",
+    "condiciones_iniciales": {"plummer": {"n": 20, "semilla": 3}},
+    "integrador": "leapfrog",
+    "pasos": 10,
+    "dt": 1e-3,
+}
+
+def test_resumen():
+    resumen = ejecutar_escenario(ESCENARIO)
+    assert resumen["pasos"] == 10
+    assert resumen["tiempo_simulado"] == pytest.approx(0.01)
+    assert resumen["cuerpos_iniciales"] == resumen["cuerpos_finales"] == 20
+    assert resumen["error_relativo_energia"] < 1e-4
+    assert resumen["instrumentacion"]["contadores"]["pasos"] == 10
+    assert resumen["checkpoints"] == []
+
+def test_checkpoints_y_salidas(tmp_path):
+    escenario = {**ESCENARIO, "checkpoint_cada": 5, "checkpoint": "salida/estado_{paso}.bin",
+                 "diagnosticos_cada": 2, "salida_diagnosticos": "diagnosticos.jsonl",
+                 "trayectoria": {"archivo": "salida/orbitas.tray", "cada": 5}}
+    resumen = ejecutar_escenario(escenario, str(tmp_path))
+    assert resumen["checkpoints"] == [str(tmp_path / "salida" / f"estado_{paso}.bin") for paso in (5, 10)]
+    assert leer_checkpoint(resumen["checkpoints"][-1])["tiempo"] == pytest.approx(0.01)
+    lineas = (tmp_path / "diagnosticos.jsonl").read_text().splitlines()
+    assert [json.loads(linea)["paso"] for linea in lineas] == [2, 4, 6, 8, 10]
+    assert LectorTrayectoria(str(tmp_path / "salida" / "orbitas.tray")).pasos.tolist() == [0, 5, 10]
+
+def test_reanudar_desde_checkpoint(tmp_path):
+    ejecutar_escenario({**ESCENARIO, "checkpoint_cada": 10, "checkpoint": "estado_{paso}.bin"}, str(tmp_path))
+    resumen = ejecutar_escenario({**ESCENARIO, "condiciones_iniciales": {"archivo": "estado_10.bin"}}, str(tmp_path))
+    assert resumen["tiempo_simulado"] == pytest.approx(0.02)
+
+def test_g_del_checkpoint_sin_g_en_el_escenario(tmp_path):
+    # Sin "G" en el escenario se conserva la del checkpoint (G = 1), no la del SI
+    ejecutar_escenario({**ESCENARIO, "checkpoint_cada": 10, "checkpoint": "estado_{paso}.bin"}, str(tmp_path))
+    sin_g = {clave: valor for clave, valor in ESCENARIO.items() if clave != "G"}
+    resumen = ejecutar_escenario({**sin_g, "condiciones_iniciales": {"archivo": "estado_10.bin"}}, str(tmp_path))
+    assert resumen["energia_inicial"] < 0  # Con G del SI solo quedaría la energía cinética
+    assert resumen["error_relativo_energia"] < 1e-4
+    assert leer_checkpoint(str(tmp_path / "estado_10.bin"))["G"] == 1.0
+    # Con "G" en el escenario, esa tiene prioridad
+    resumen = ejecutar_escenario({**sin_g, "G": 1e-11, "condiciones_iniciales": {"archivo": "estado_10.bin"}},
+                                 str(tmp_path))
+    assert resumen["energia_inicial"] > 0
+
+def test_motor_e_integrador_con_parametros():
+    assert crear_motor("directo") is None
+    assert crear_motor({"nombre": "barnes_hut", "theta": 0.7}).theta == 0.7
+    resumen = ejecutar_escenario({**ESCENARIO, "motor": {"nombre": "barnes_hut", "theta": 0.7},
+                                  "integrador": {"nombre": "yoshida4"}})
+    assert resumen["cuerpos_finales"] == 20
+
+def test_errores_de_escenario():
+    with pytest.raises(ValueError):
+        ejecutar_escenario({**ESCENARIO, "motor": "inexistente"})
+    with pytest.raises(ValueError):
+        ejecutar_escenario({"condiciones_iniciales": {"plummer": {"n": 5}}})
+    with pytest.raises(ValueError):
+        ejecutar_escenario({**ESCENARIO, "condiciones_iniciales": {}})
+
+def test_linea_de_ordenes(tmp_path, capsys):
+    archivo = tmp_path / "escenario.json"
+    archivo.write_text(json.dumps(ESCENARIO))
+    resumen = tmp_path / "resumen.json"
+    assert ejecutar_batch(["--escenario", str(archivo), "--pasos", "4", "--resumen", str(resumen)]) == 0
+    assert json.loads(resumen.read_text())["pasos"] == 4
+    assert ejecutar_batch(["--escenario", str(tmp_path / "no_existe.json")]) == 1
+    assert "Error en la ejecución" in capsys.readouterr().err
@@ -0,0 +1,148 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Elementos_orbitales import (ELEMENTOS, cartesianas_a_elementos, elementos_a_cartesianas, elementos_estado,
+                                 elementos_trayectoria)
+from Wisdom_holman import deriva_kepler
+from Trayectorias import GrabadorTrayectoria, LectorTrayectoria
+from Checkpoint_binario import leer_checkpoint
+import contextlib
+import csv
+import io
+import json
+import math
+import numpy as np
+
+def sistema(integrador='wisdom_holman'):
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador=integrador)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.agregar_cuerpo("Sol", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+        sim.agregar_cuerpo("Planeta", 1e-3, Vector3D(1, 0, 0), Vector3D(0, 1.1, 0.2))
+        sim.agregar_cuerpo("Luna", 1e-6, Vector3D(0, -2, 0.1), Vector3D(0.65, 0, 0))
+    return sim
+
+def diferencia_angular(x, y):
+    return np.abs(np.angle(np.exp(1j * (x - y))))
+
+def test_orbita_conocida():
+    # Elipse con e = 0.5 y a = 2 vista en el periapsis, inclinada 30 grados alrededor del eje x
+    mu = 1.0
+    r_peri = 2 * (1 - 0.5)
+    v_peri = math.sqrt(mu * (1 + 0.5) / r_peri)
+    i = math.radians(30)
+    elementos = cartesianas_a_elementos([r_peri, 0, 0], [0, v_peri * math.cos(i), v_peri * math.sin(i)], mu)
+    assert elementos.shape == (6,)
+    assert elementos == pytest.approx([2.0, 0.5, i, 0.0, 0.0, 0.0], abs=1e-12)
+
+def test_convenios_circular_y_ecuatorial():
+    # Circular ecuatorial: nodo y periapsis en el eje x, la anomalía es la longitud verdadera
+    elementos = cartesianas_a_elementos([[0, 1, 0], [-1, 0, 0]], [[-1, 0, 0], [0, -1, 0]], 1.0)
+    assert np.allclose(elementos[:, :5], [[1, 0, 0, 0, 0]] * 2, rtol=0, atol=1e-12)
+    assert np.allclose(elementos[:, 5], [math.pi / 2, math.pi], rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize("escala_velocidad", [0.7, 1.6])  # Mayoría elípticas / hiperbólicas
+def test_ida_y_vuelta_desde_cartesianas(escala_velocidad):
+    rng = np.random.default_rng(1)
+    posicion = rng.normal(size=(4, 500, 3))  # Con dimensiones delanteras, como una trayectoria
+    velocidad = rng.normal(size=(4, 500, 3)) * escala_velocidad
+    mu = rng.uniform(0.5, 2.0, size=(4, 500))
+    elementos = cartesianas_a_elementos(posicion, velocidad, mu)
+    assert elementos.shape == (4, 500, 6)
+    # Lejos de la parábola, donde el semieje mayor está mal condicionado
+    validos = np.abs(elementos[..., 1] - 1) > 1e-3
+    nueva_posicion, nueva_velocidad = elementos_a_cartesianas(elementos, mu)
+    assert np.allclose(nueva_posicion[validos], posicion[validos], rtol=0, atol=1e-9)
+    assert np.allclose(nueva_velocidad[validos], velocidad[validos], rtol=0, atol=1e-9)
+
+def test_ida_y_vuelta_desde_elementos():
+    rng = np.random.default_rng(2)
+    n = 2000
+    elementos = np.column_stack((rng.uniform(0.5, 5, n), rng.uniform(0.01, 0.95, n), rng.uniform(0.01, 3.1, n),
+                                 rng.uniform(0, 2 * np.pi, (n, 3))))
+    recuperados = cartesianas_a_elementos(*elementos_a_cartesianas(elementos, 1.0), 1.0)
+    assert np.allclose(recuperados[:, :3], elementos[:, :3], rtol=1e-10, atol=1e-12)
+    assert np.all(diferencia_angular(recuperados[:, 3:], elementos[:, 3:]) < 1e-8)
+
+def test_avanzar_la_anomalia_media_es_la_deriva_kepleriana():
+    rng = np.random.default_rng(3)
+    posicion = rng.uniform(-2, 2, (100, 3))
+    velocidad = rng.uniform(-0.8, 0.8, (100, 3))
+    elementos = cartesianas_a_elementos(posicion, velocidad, 1.0)
+    elipticas = elementos[:, 1] < 0.99
+    elementos = elementos[elipticas]
+    elementos[:, 5] += 2.5 * elementos[:, 0] ** -1.5  # M += n t
+    esperada, esperada_v = posicion[elipticas].copy(), velocidad[elipticas].copy()
+    deriva_kepler(esperada, esperada_v, 1.0, 2.5)
+    nueva, nueva_v = elementos_a_cartesianas(elementos, 1.0)
+    assert np.allclose(nueva, esperada, atol=1e-8)
+    assert np.allclose(nueva_v, esperada_v, atol=1e-8)
+
+def test_elementos_del_simulador_respecto_a_un_cuerpo_y_al_baricentro():
+    sim = sistema()
+    sim.agregar_particula("Asteroide", Vector3D(2.5, 0, 0), Vector3D(0, 1 / math.sqrt(2.5), 0))
+    ids, elementos = sim.elementos_orbitales("Sol")
+    assert ids == ["Sol", "Planeta", "Luna", "Asteroide"]
+    assert np.all(np.isnan(elementos[0]))
+    assert elementos[3, :2] == pytest.approx([2.5, 0.0], abs=1e-12)  # mu = G * m_Sol para partículas
+    # Respecto al Sol, mu = G (m_Sol + m_Planeta)
+    r, v2 = 1.0, 1.1 ** 2 + 0.2 ** 2
+    assert elementos[1, 0] == pytest.approx(1 / (2 / r - v2 / 1.001))
+    baricentricos = sim.elementos_orbitales()[1]
+    assert not np.any(np.isnan(baricentricos))
+    assert np.allclose(baricentricos[1:, 0], elementos[1:, 0], rtol=1e-2)
+    with pytest.raises(ValueError, match="No existe un cuerpo"):
+        sim.elementos_orbitales("Plutón")
+
+def test_elementos_casi_constantes_con_wisdom_holman():
+    # La Luna apenas perturba al planeta: su órbita osculadora casi no cambia en ~4 vueltas
+    sim = sistema()
+    inicial = sim.elementos_orbitales("Sol")[1][1]
+    sim.ejecutar(200, 0.1)
+    final = sim.elementos_orbitales("Sol")[1][1]
+    assert np.allclose(final[:3], inicial[:3], rtol=1e-4)
+    assert np.all(diferencia_angular(final[3:5], inicial[3:5]) < 1e-4)
+
+def test_trayectoria(tmp_path):
+    sim = sistema('leapfrog')
+    archivo = str(tmp_path / "orbitas.tray")
+    with GrabadorTrayectoria(archivo) as grabador:
+        grabador.conectar(sim)
+        sim.ejecutar(30, 0.05)
+    lector = LectorTrayectoria(archivo)
+    masa = sim.estado.masa.copy()
+    elementos = elementos_trayectoria(lector, masa, sim.G, "Sol", marcos_por_bloque=7)
+    assert elementos.shape == (31, 3, 6)
+    for k in (0, 13, 30):
+        _, posicion, velocidad = lector.marco(k)
+        assert np.array_equal(elementos[k], elementos_estado(masa, posicion, velocidad, sim.G, 0), equal_nan=True)
+    with pytest.raises(ValueError, match="una masa por cuerpo"):
+        elementos_trayectoria(lector, masa[:2], sim.G)
+
+def test_guardar_con_elementos(tmp_path):
+    sim = sistema()
+    esperados = sim.elementos_orbitales("Sol")[1]
+    json_archivo, csv_archivo, bin_archivo = (str(tmp_path / n) for n in ("e.json", "e.csv", "e.bin"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for archivo, formato in ((json_archivo, 'json'), (csv_archivo, 'csv'), (bin_archivo, 'binario')):
+            sim.guardar(archivo, formato, elementos=True, centro="Sol")
+
+    with open(json_archivo) as f:
+        datos = json.load(f)
+    assert "elementos" not in datos[0]
+    assert [datos[1]["elementos"][nombre] for nombre in ELEMENTOS] == esperados[1].tolist()
+
+    with open(csv_archivo, newline='') as f:
+        filas = list(csv.reader(f, delimiter=';'))
+    assert filas[0][9:] == list(ELEMENTOS)
+    assert [float(x) for x in filas[2][9:]] == esperados[1].tolist()
+
+    leido = leer_checkpoint(bin_archivo)
+    assert np.array_equal(leido["elementos"], esperados, equal_nan=True)
+    assert leido["metadatos"]["elementos"] == {"centro": "Sol", "columnas": list(ELEMENTOS)}
+
+    # Los archivos con elementos se siguen cargando
+    for archivo, formato in ((json_archivo, 'json'), (csv_archivo, 'csv'), (bin_archivo, 'binario')):
+        otro = Simulador(G=1.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            otro.cargar(archivo, formato)
+        assert otro.obtener_cuerpo("Luna").posicion.to_list() == sim.obtener_cuerpo("Luna").posicion.to_list()
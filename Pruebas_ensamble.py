@@ -0,0 +1,82 @@
+import pytest
+from Simulador import Simulador
+from Ensamble import Ensamble, aceleraciones_ensamble
+from Estado_arrays import aceleraciones_directas
+from Condiciones_iniciales import esfera_plummer
+import Ensamble as modulo_ensamble
+import numpy as np
+
+def crear_simulador(n=12, integrador='leapfrog'):
+    masa, posicion, velocidad = esfera_plummer(n, semilla=4)
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador=integrador)
+    sim.estado.agregar_lote([f"c{i}" for i in range(n)], masa, posicion, velocidad)
+    return sim
+
+def test_aceleraciones_por_miembro(monkeypatch):
+    rng = np.random.default_rng(0)
+    masa = rng.uniform(0.5, 1.5, (5, 20))
+    posicion = rng.standard_normal((5, 20, 3))
+    esperado = np.array([aceleraciones_directas(posicion[k], posicion[k], masa[k]) for k in range(5)])
+    assert np.allclose(aceleraciones_ensamble(masa, posicion, 1.0), esperado, rtol=1e-12)
+    # Con bloques de un miembro se usa el núcleo por filas y el resultado es el mismo
+    monkeypatch.setattr(modulo_ensamble, "ELEMENTOS_POR_BLOQUE", 1)
+    assert np.allclose(aceleraciones_ensamble(masa, posicion, 1.0), esperado, rtol=1e-12)
+
+@pytest.mark.parametrize("integrador", ['euler', 'leapfrog', 'yoshida4'])
+def test_igual_que_simuladores_separados(integrador):
+    ensamble = Ensamble.desde_simulador(crear_simulador(integrador=integrador), 4, dispersion_posicion=1e-3,
+                                        dispersion_velocidad=1e-3, dispersion_masa=0.01, semilla=1)
+    separados = [ensamble.miembro(k) for k in range(4)]
+    ensamble.ejecutar(20, 1e-3)
+    for k, sim in enumerate(separados):
+        sim.ejecutar(20, 1e-3)
+        assert np.allclose(ensamble.posicion[k], sim.estado.posicion, rtol=1e-12, atol=1e-14)
+        assert np.allclose(ensamble.velocidad[k], sim.estado.velocidad, rtol=1e-12, atol=1e-14)
+    assert ensamble.tiempo == pytest.approx(0.02)
+    assert ensamble.pasos == 20
+
+def test_diagnosticos_por_miembro():
+    ensamble = Ensamble.desde_simulador(crear_simulador(), 3, dispersion_velocidad=0.05, semilla=2)
+    diagnosticos = ensamble.diagnosticos()
+    assert diagnosticos["energia_total"].shape == (3,)
+    assert diagnosticos["momento_lineal"].shape == (3, 3)
+    for k in range(3):
+        esperado = ensamble.miembro(k).diagnosticos()
+        assert diagnosticos["energia_cinetica"][k] == pytest.approx(esperado["energia_cinetica"], rel=1e-12)
+        assert diagnosticos["energia_potencial"][k] == pytest.approx(esperado["energia_potencial"], rel=1e-12)
+        assert diagnosticos["momento_lineal"][k] == pytest.approx(esperado["momento_lineal"].to_list(), abs=1e-14)
+
+def test_cuerpos_coincidentes():
+    posicion = np.zeros((2, 2, 3))
+    posicion[0, 1, 0] = 1.0
+    diagnosticos = Ensamble(np.ones(2), posicion, np.zeros_like(posicion), G=1.0).diagnosticos()
+    assert diagnosticos["energia_potencial"][0] == pytest.approx(-0.5 * 1.0 * 2)  # 1/2 sum m_i phi_i
+    assert diagnosticos["energia_potencial"][1] == float('-inf')
+
+def test_perturbaciones_reproducibles():
+    sim = crear_simulador()
+    a = Ensamble.desde_simulador(sim, 3, dispersion_posicion=0.1, semilla=7)
+    b = Ensamble.desde_simulador(sim, 3, dispersion_posicion=0.1, semilla=7)
+    assert np.array_equal(a.posicion, b.posicion)
+    assert not np.array_equal(a.posicion[0], a.posicion[1])
+    assert np.array_equal(a.masa[1], sim.estado.masa)
+
+def test_procesos_igual_que_serie():
+    sim = crear_simulador()
+    serie = Ensamble.desde_simulador(sim, 5, dispersion_posicion=1e-2, semilla=3)
+    with Ensamble.desde_simulador(sim, 5, dispersion_posicion=1e-2, semilla=3, procesos=2) as paralelo:
+        for ensamble in (serie, paralelo):
+            ensamble.ejecutar(10, 1e-3)
+            ensamble.ejecutar(5, 1e-3)
+        assert np.array_equal(paralelo.posicion, serie.posicion)
+        assert np.array_equal(paralelo.velocidad, serie.velocidad)
+
+def test_errores():
+    with pytest.raises(ValueError, match="forma"):
+        Ensamble(np.ones(3), np.zeros((3, 3)), np.zeros((3, 3)))
+    with pytest.raises(ValueError, match="positiva"):
+        Ensamble(np.zeros(3), np.zeros((2, 3, 3)), np.zeros((2, 3, 3)))
+    with pytest.raises(ValueError, match="no admite ensambles"):
+        Ensamble(np.ones(3), np.zeros((2, 3, 3)), np.zeros((2, 3, 3)), integrador='bloques')
+    with pytest.raises(ValueError, match="procesos"):
+        Ensamble(np.ones(3), np.zeros((2, 3, 3)), np.zeros((2, 3, 3)), procesos=0)
@@ -0,0 +1,149 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Estado_arrays import EstadoArrays, fuerzas_directas, energia_potencial_directa
+import numpy as np
+
+# Constante de gravitación universal para pruebas
+G_TEST = 6.674e-11
+
+def _poblar(sim):
+    sim.agregar_cuerpo("Sol", 1.989e30, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("Tierra", 5.972e24, Vector3D(1.5e11, 0, 0), Vector3D(0, 3e4, 0))
+    sim.agregar_cuerpo("Luna", 7.342e22, Vector3D(1.5e11 + 3.84e8, 0, 0), Vector3D(0, 3e4 + 1e3, 0))
+    return sim
+
+@pytest.fixture
+def par_simuladores():
+    return _poblar(Simulador(G=G_TEST)), _poblar(Simulador(G=G_TEST, almacenamiento='arrays'))
+
+def test_almacenamiento_no_soportado():
+    with pytest.raises(ValueError, match="Almacenamiento 'gpu' no soportado"):
+        Simulador(G=G_TEST, almacenamiento='gpu')
+
+def test_fachada_agregar_obtener():
+    sim = Simulador(G=G_TEST, almacenamiento='arrays')
+    sim.agregar_cuerpo("Marte", 6.39e23, Vector3D(1, 2, 3), Vector3D(4, 5, 6))
+    assert "Marte" in sim.cuerpos
+    assert sim.estado.indice["Marte"] == 0
+    marte = sim.obtener_cuerpo("Marte")
+    assert marte.masa == 6.39e23
+    assert marte.posicion.to_list() == [1.0, 2.0, 3.0]
+    assert marte.velocidad.to_list() == [4.0, 5.0, 6.0]
+    assert sim.obtener_cuerpo("NoExiste") is None
+
+    with pytest.raises(ValueError, match="Ya existe un cuerpo con el ID 'Marte'."):
+        sim.agregar_cuerpo("Marte", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+
+def test_vista_escribe_en_arrays():
+    sim = Simulador(G=G_TEST, almacenamiento='arrays')
+    sim.agregar_cuerpo("C1", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    cuerpo = sim.obtener_cuerpo("C1")
+    cuerpo.aplicar_fuerza(Vector3D(10, 0, 0), 1.0)
+    cuerpo.mover(0.5)
+    assert sim.estado.velocidad[0].tolist() == [10.0, 0.0, 0.0]
+    assert sim.estado.posicion[0].tolist() == [5.0, 0.0, 0.0]
+
+def test_eliminar_reindexa():
+    estado = EstadoArrays()
+    estado.agregar("A", 1.0, [0, 0, 0], [0, 0, 0])
+    estado.agregar("B", 2.0, [1, 0, 0], [0, 0, 0])
+    estado.agregar("C", 3.0, [2, 0, 0], [0, 0, 0])
+    version = estado.version
+    estado.eliminar("A")
+    # El último cuerpo ocupa la fila del eliminado; los demás conservan la suya
+    assert estado.ids == ["C", "B"]
+    assert estado.indice == {"C": 0, "B": 1}
+    assert estado.masa.tolist() == [3.0, 2.0]
+    assert estado.posicion[:, 0].tolist() == [2.0, 1.0]
+    assert estado.version > version
+    estado.eliminar("B")
+    assert estado.ids == ["C"] and estado.indice == {"C": 0}
+
+def test_capacidad_se_duplica():
+    estado = EstadoArrays(capacidad_inicial=2)
+    for i in range(5):
+        estado.agregar(f"c{i}", 1.0 + i, [i, 0, 0], [0, i, 0])
+    assert estado.capacidad == 8
+    assert estado.masa.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert estado.velocidad[:, 1].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    estado.agregar_lote(["d0", "d1", "d2", "d3"], np.ones(4), np.zeros((4, 3)), np.zeros((4, 3)))
+    assert estado.capacidad == 16 and len(estado) == 9
+    assert estado.indice["d3"] == 8
+    # Las vistas comparten memoria con el almacenamiento: los integradores escriben en el sitio
+    estado.posicion += 1.0
+    assert estado.posicion[0].tolist() == [1.0, 1.0, 1.0]
+
+def test_version_cambia_con_el_conjunto():
+    estado = EstadoArrays()
+    versiones = [estado.version]
+    estado.agregar("A", 1.0, [0, 0, 0], [0, 0, 0])
+    versiones.append(estado.version)
+    estado.agregar_lote(["B"], np.ones(1), np.zeros((1, 3)), np.zeros((1, 3)))
+    versiones.append(estado.version)
+    estado.posicion[0] = [1.0, 2.0, 3.0]  # Mover cuerpos no cambia el conjunto
+    versiones.append(estado.version)
+    estado.limpiar()
+    versiones.append(estado.version)
+    assert versiones[0] < versiones[1] < versiones[2] == versiones[3] < versiones[4]
+    assert len(estado) == 0 and len(estado.masa) == 0
+
+def test_fuerzas_iguales_a_objetos(par_simuladores):
+    sim_obj, sim_arr = par_simuladores
+    f_obj = sim_obj.calcular_fuerzas()
+    f_arr = sim_arr.calcular_fuerzas()
+    for c_id, fuerza in f_obj.items():
+        for a, b in zip(fuerza.to_list(), f_arr[c_id].to_list()):
+            assert a == pytest.approx(b, rel=1e-12, abs=1e-30)
+
+def test_fuerzas_directas_misma_posicion():
+    masa = np.array([1.0, 1.0])
+    posicion = np.zeros((2, 3))
+    assert np.all(fuerzas_directas(masa, posicion, G_TEST) == 0)
+    assert energia_potencial_directa(masa, posicion, G_TEST) == float('-inf')
+
+def test_paso_igual_a_objetos(par_simuladores, capsys):
+    sim_obj, sim_arr = par_simuladores
+    for _ in range(3):
+        sim_obj.paso_simulacion(100.0)
+        sim_arr.paso_simulacion(100.0)
+    for c_id, cuerpo in sim_obj.cuerpos.items():
+        vista = sim_arr.cuerpos[c_id]
+        for a, b in zip(cuerpo.posicion.to_list(), vista.posicion.to_list()):
+            assert a == pytest.approx(b, rel=1e-12)
+        for a, b in zip(cuerpo.velocidad.to_list(), vista.velocidad.to_list()):
+            assert a == pytest.approx(b, rel=1e-12, abs=1e-12)
+
+    salida = capsys.readouterr().out
+    assert salida.count("Energía Potencial Total") == 6
+
+def test_energias_iguales_a_objetos(par_simuladores):
+    sim_obj, sim_arr = par_simuladores
+    lista = list(sim_obj.cuerpos.values())
+    potencial = sum(lista[i].energia_potencial_con(lista[j], G_TEST)
+                    for i in range(len(lista)) for j in range(i + 1, len(lista)))
+    cinetica = sum(c.energia_cinetica() for c in lista)
+    assert sim_arr.estado.energia_potencial(G_TEST) == pytest.approx(potencial, rel=1e-12)
+    assert sim_arr.estado.energia_cinetica() == pytest.approx(cinetica, rel=1e-12)
+
+def test_guardar_cargar_arrays(par_simuladores, tmp_path):
+    _, sim_arr = par_simuladores
+    for formato in ('json', 'csv'):
+        archivo = tmp_path / f"estado.{formato}"
+        sim_arr.guardar(str(archivo), formato)
+        nuevo = Simulador(G=G_TEST, almacenamiento='arrays')
+        nuevo.agregar_cuerpo("Temp", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+        nuevo.cargar(str(archivo), formato)
+        assert list(nuevo.cuerpos) == ["Sol", "Tierra", "Luna"]
+        assert np.array_equal(nuevo.estado.masa, sim_arr.estado.masa)
+        assert np.allclose(nuevo.estado.posicion, sim_arr.estado.posicion, rtol=1e-15)
+
+def test_pasada_fusionada_igual_a_separada():
+    from Estado_arrays import fuerzas_y_potencial_directos
+    rng = np.random.default_rng(0)
+    masa = rng.uniform(1.0, 2.0, 300)
+    posicion = rng.normal(size=(300, 3))
+    fuerzas, energia, potenciales = fuerzas_y_potencial_directos(masa, posicion, 1.0)
+    assert np.array_equal(fuerzas, fuerzas_directas(masa, posicion, 1.0))
+    assert energia == pytest.approx(energia_potencial_directa(masa, posicion, 1.0), rel=1e-12)
+    assert potenciales[0] == pytest.approx(-np.sum(masa[1:] / np.linalg.norm(posicion[1:] - posicion[0], axis=1)))
@@ -0,0 +1,53 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Fuerzas_paralelas import MotorParalelo
+from Estado_arrays import fuerzas_directas, fuerzas_y_potencial_directos
+from Condiciones_iniciales import esfera_plummer
+import numpy as np
+
+@pytest.fixture(scope="module")
+def motor():
+    with MotorParalelo(procesos=2) as motor:
+        yield motor
+
+def test_procesos_invalidos():
+    with pytest.raises(ValueError, match="El número de procesos debe ser al menos 1."):
+        MotorParalelo(procesos=-1)
+
+def test_igual_que_serie(motor):
+    masa, posicion, _ = esfera_plummer(500, semilla=1)
+    assert np.allclose(motor.calcular_fuerzas(masa, posicion, 1.0), fuerzas_directas(masa, posicion, 1.0),
+                       rtol=1e-12, atol=1e-15)
+
+def test_potencial_igual_que_serie(motor):
+    masa, posicion, _ = esfera_plummer(300, semilla=2)
+    fuerzas, energia, potenciales = motor.calcular_fuerzas_y_potencial(masa, posicion, 1.0)
+    fuerzas_serie, energia_serie, potenciales_serie = fuerzas_y_potencial_directos(masa, posicion, 1.0)
+    assert np.allclose(fuerzas, fuerzas_serie, rtol=1e-12, atol=1e-15)
+    assert energia == pytest.approx(energia_serie, rel=1e-12)
+    assert np.allclose(potenciales, potenciales_serie, rtol=1e-12)
+
+def test_cambio_de_tamano(motor):
+    # La memoria compartida crece cuando aumenta N y se reutiliza cuando disminuye
+    for n in (10, 800, 50):
+        masa, posicion, _ = esfera_plummer(n, semilla=n)
+        assert np.allclose(motor.calcular_fuerzas(masa, posicion, 1.0), fuerzas_directas(masa, posicion, 1.0),
+                           rtol=1e-12, atol=1e-15)
+
+def test_misma_posicion(motor):
+    masa = np.ones(3)
+    posicion = np.array([[0.0, 0, 0], [0.0, 0, 0], [1.0, 0, 0]])
+    _, energia, _ = motor.calcular_fuerzas_y_potencial(masa, posicion, 1.0)
+    assert energia == float('-inf')
+
+def test_simulador_con_motor_paralelo(motor, capsys):
+    sims = []
+    for motor_sim in (None, motor):
+        sim = Simulador(G=1.0, almacenamiento='arrays', motor=motor_sim, integrador='leapfrog')
+        sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+        sim.agregar_cuerpo("B", 0.5, Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+        sim.agregar_cuerpo("C", 0.1, Vector3D(0, 2, 0), Vector3D(-0.7, 0, 0))
+        sim.ejecutar(20, 0.01)
+        sims.append(sim)
+    assert np.allclose(sims[0].estado.posicion, sims[1].estado.posicion, rtol=1e-12, atol=1e-15)
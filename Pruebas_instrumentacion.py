@@ -0,0 +1,93 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Instrumentacion import Instrumentacion
+import json
+import time
+import numpy as np
+
+def _simulador(almacenamiento='arrays', **opciones):
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, **opciones)
+    sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("B", 1.0, Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    sim.agregar_cuerpo("C", 1.0, Vector3D(0, 2, 0), Vector3D(-1, 0, 0))
+    return sim
+
+def test_desactivada_no_registra(capsys):
+    sim = _simulador()
+    sim.ejecutar(5, 0.01, diagnosticos_cada=1, callback=lambda d: None)
+    assert sim.instrumentacion.a_dict() == {"activa": False, "tiempo_total": 0, "fases": {}, "contadores": {}}
+
+def test_fases_anidadas_descuentan_hijas():
+    instrumentacion = Instrumentacion(activa=True)
+    with instrumentacion.fase("externa"):
+        time.sleep(0.01)
+        with instrumentacion.fase("interna"):
+            time.sleep(0.02)
+    assert 0.02 <= instrumentacion.tiempos["interna"] < 0.03 + 0.05
+    assert 0.01 <= instrumentacion.tiempos["externa"] < 0.02 + 0.05
+    assert instrumentacion.llamadas == {"externa": 1, "interna": 1}
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_contadores_y_fases(almacenamiento, capsys):
+    sim = _simulador(almacenamiento)
+    sim.instrumentacion.activar()
+    for _ in range(4):
+        sim.paso_simulacion(0.01)
+    datos = sim.instrumentacion.a_dict()
+    assert set(datos["fases"]) == {"integracion", "fuerzas", "diagnosticos", "salida", "ganchos"}
+    assert datos["fases"]["salida"]["llamadas"] == 4
+    assert datos["tiempo_total"] == pytest.approx(sum(f["segundos"] for f in datos["fases"].values()))
+    contadores = datos["contadores"]
+    assert contadores["pasos"] == 4
+    assert contadores["cuerpos_avanzados"] == 12
+    # Una evaluación por paso más la primera; los diagnósticos reutilizan la del paso siguiente
+    assert contadores["evaluaciones_fuerza"] == 5
+    assert contadores["pares_evaluados"] == 5 * 3
+    assert contadores["pares_cero_omitidos"] == 0
+    assert json.loads(sim.instrumentacion.a_json()) == datos
+
+    sim.instrumentacion.reiniciar()
+    assert sim.instrumentacion.a_dict()["contadores"] == {}
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_pares_cero(almacenamiento, capsys):
+    sim = _simulador(almacenamiento)
+    sim.agregar_cuerpo("D", 1.0, Vector3D(1, 0, 0), Vector3D(0, 0, 0))
+    sim.instrumentacion.activar()
+    sim.diagnosticos()
+    assert sim.instrumentacion.contadores["pares_cero_omitidos"] == 1
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_pares_cero_en_los_pasos(almacenamiento):
+    # También se cuentan en las evaluaciones de los pasos, sin potencial: una por paso con Euler
+    sim = _simulador(almacenamiento)
+    sim.agregar_cuerpo("D", 1.0, Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    sim.instrumentacion.activar()
+    sim.ejecutar(3, 0.01)
+    assert sim.instrumentacion.contadores["pares_cero_omitidos"] == 3
+
+def test_pares_con_cuerpos_activos():
+    # Pasos jerárquicos: cada par distinto con algún cuerpo activo cuenta una vez, como N(N-1)/2
+    # cuando todos son activos
+    sim = _simulador()
+    sim.agregar_cuerpo("D", 1.0, Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    ids, masa, posicion = sim._arrays_masa_posicion()
+    fila_b, fila_d = ids.index("B"), ids.index("D")
+    sim.instrumentacion.activar()
+    sim._aceleraciones_activos(masa, posicion, np.array([fila_b]))
+    assert sim.instrumentacion.contadores["pares_cero_omitidos"] == 1
+    assert sim.instrumentacion.contadores["pares_evaluados"] == 3
+    sim._aceleraciones_activos(masa, posicion, np.array([ids.index("A"), fila_b, fila_d]))
+    assert sim.instrumentacion.contadores["pares_cero_omitidos"] == 2
+    assert sim.instrumentacion.contadores["pares_evaluados"] == 3 + 6  # Los 6 pares tocan algún activo
+    sim._aceleraciones_activos(masa, posicion, np.arange(4))
+    assert sim.instrumentacion.contadores["pares_evaluados"] == 3 + 6 + 4 * 3 // 2
+
+def test_perfilar(tmp_path):
+    sim = _simulador(integrador='leapfrog')
+    archivo = tmp_path / "perfil.prof"
+    estadisticas = sim.perfilar(10, 0.01, archivo=str(archivo))
+    assert sim.pasos == 10
+    assert archivo.exists()
+    assert any(funcion[2] == "_avanzar" for funcion in estadisticas.stats)
@@ -0,0 +1,89 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Integradores import crear_integrador, Leapfrog, Yoshida4
+import numpy as np
+import math
+
+# Unidades naturales: G = 1, masa central 1, órbita circular de radio 1 (periodo 2*pi)
+PERIODO = 2 * math.pi
+
+def _orbita(integrador, almacenamiento='arrays', excentricidad=0.5):
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, integrador=integrador)
+    sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    # Planeta de masa despreciable en el pericentro de una órbita excéntrica
+    velocidad = math.sqrt(1.0 + excentricidad)
+    sim.agregar_cuerpo("Planeta", 1e-6, Vector3D(1, 0, 0), Vector3D(0, velocidad, 0))
+    return sim
+
+def _error_energia(integrador, pasos_por_orbita, orbitas=3, almacenamiento='arrays'):
+    sim = _orbita(integrador, almacenamiento)
+    energia_inicial = sim.diagnosticos()["energia_total"]
+    dt = PERIODO / pasos_por_orbita
+    errores = []
+    sim.ejecutar(pasos_por_orbita * orbitas, dt, diagnosticos_cada=10,
+                 callback=lambda d: errores.append(abs(d["energia_total"] / energia_inicial - 1)))
+    return max(errores)
+
+def test_crear_integrador():
+    assert isinstance(crear_integrador('leapfrog'), Leapfrog)
+    instancia = Yoshida4()
+    assert crear_integrador(instancia) is instancia
+    with pytest.raises(ValueError, match="Integrador 'rk45' no soportado"):
+        crear_integrador('rk45')
+    with pytest.raises(ValueError, match="Integrador 'rk45' no soportado"):
+        Simulador(integrador='rk45')
+
+def test_euler_arrays_igual_que_objetos(capsys):
+    sim_obj = _orbita('euler', 'objetos')
+    sim_arr = _orbita('euler', 'arrays')
+    sim_obj.ejecutar(20, 0.01)
+    sim_arr.ejecutar(20, 0.01)
+    for c_id in ("Estrella", "Planeta"):
+        for a, b in zip(sim_obj.cuerpos[c_id].posicion.to_list(), sim_arr.cuerpos[c_id].posicion.to_list()):
+            assert a == pytest.approx(b, rel=1e-10, abs=1e-14)
+
+@pytest.mark.parametrize("integrador", ['leapfrog', 'verlet', 'yoshida4'])
+def test_objetos_igual_que_arrays(integrador):
+    sim_obj = _orbita(integrador, 'objetos')
+    sim_arr = _orbita(integrador, 'arrays')
+    sim_obj.ejecutar(50, 0.05)
+    sim_arr.ejecutar(50, 0.05)
+    for c_id in ("Estrella", "Planeta"):
+        assert sim_obj.cuerpos[c_id].posicion.to_list() == sim_arr.cuerpos[c_id].posicion.to_list()
+        assert sim_obj.cuerpos[c_id].velocidad.to_list() == sim_arr.cuerpos[c_id].velocidad.to_list()
+
+def test_simplecticos_con_pasos_mayores():
+    # Con pasos 10 veces mayores, los integradores de segundo orden y superiores
+    # conservan la energía mejor que Euler
+    error_euler = _error_energia('euler', 2000)
+    for integrador in ('leapfrog', 'verlet', 'yoshida4'):
+        assert _error_energia(integrador, 200) < error_euler
+
+def test_leapfrog_y_verlet_equivalentes():
+    sim_lf = _orbita('leapfrog')
+    sim_vv = _orbita('verlet')
+    sim_lf.ejecutar(100, 0.05)
+    sim_vv.ejecutar(100, 0.05)
+    assert np.allclose(sim_lf.estado.posicion, sim_vv.estado.posicion, rtol=1e-10, atol=1e-12)
+
+def test_ordenes_de_convergencia():
+    # Reducir el paso a la mitad divide el error de energía por ~4 (orden 2) o ~16 (orden 4)
+    razon_leapfrog = _error_energia('leapfrog', 200, orbitas=1) / _error_energia('leapfrog', 400, orbitas=1)
+    razon_yoshida = _error_energia('yoshida4', 200, orbitas=1) / _error_energia('yoshida4', 400, orbitas=1)
+    assert 3.0 < razon_leapfrog < 5.0
+    assert 12.0 < razon_yoshida < 20.0
+
+def test_una_evaluacion_por_paso_en_leapfrog():
+    llamadas = []
+
+    class Motor:
+        def calcular_fuerzas(self, masa, posicion, G):
+            from Estado_arrays import fuerzas_directas
+            llamadas.append(1)
+            return fuerzas_directas(masa, posicion, G)
+
+    sim = _orbita('leapfrog')
+    sim.motor = Motor()
+    sim.ejecutar(10, 0.01)
+    assert len(llamadas) == 11
@@ -0,0 +1,57 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Particula_malla import MotorParticulaMalla
+from Condiciones_iniciales import esfera_plummer
+from Estado_arrays import fuerzas_directas
+import numpy as np
+
+def test_celdas_invalidas():
+    with pytest.raises(ValueError, match="al menos 6 celdas"):
+        MotorParticulaMalla(celdas=5)
+
+def test_plummer_reproducible():
+    masa1, pos1, vel1 = esfera_plummer(500, semilla=7)
+    masa2, pos2, vel2 = esfera_plummer(500, semilla=7)
+    assert np.array_equal(pos1, pos2) and np.array_equal(vel1, vel2)
+    assert masa1.sum() == pytest.approx(1.0)
+    assert np.allclose(masa1 @ pos1, 0.0, atol=1e-12)
+    assert np.allclose(masa1 @ vel1, 0.0, atol=1e-12)
+
+def test_precision_frente_a_directo():
+    masa, posicion, _ = esfera_plummer(2000, semilla=3)
+    exactas = fuerzas_directas(masa, posicion, 1.0)
+    aproximadas = MotorParticulaMalla(celdas=64).calcular_fuerzas(masa, posicion, 1.0)
+    error = np.linalg.norm(aproximadas - exactas, axis=1) / np.linalg.norm(exactas, axis=1)
+    fuera_del_nucleo = np.linalg.norm(posicion, axis=1) > 1.0
+    assert np.median(error[fuera_del_nucleo]) < 0.1
+    # Las fuerzas interpoladas con CIC son antisimétricas: la fuerza total es casi nula
+    assert np.linalg.norm(aproximadas.sum(axis=0)) < 1e-5 * np.abs(exactas).sum()
+
+def test_mejora_con_la_resolucion():
+    masa, posicion, _ = esfera_plummer(1000, semilla=5)
+    exactas = fuerzas_directas(masa, posicion, 1.0)
+    errores = []
+    for celdas in (16, 32, 64):
+        aproximadas = MotorParticulaMalla(celdas=celdas).calcular_fuerzas(masa, posicion, 1.0)
+        errores.append(np.median(np.linalg.norm(aproximadas - exactas, axis=1) / np.linalg.norm(exactas, axis=1)))
+    assert errores[0] > errores[1] > errores[2]
+
+def test_simulador_con_particula_malla(capsys):
+    sim = Simulador(G=1.0, almacenamiento='arrays', motor=MotorParticulaMalla(celdas=32))
+    sim.agregar_cuerpo("A", 1.0, Vector3D(-10, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("B", 1.0, Vector3D(10, 0, 0), Vector3D(0, 0, 0))
+    fuerzas = sim.calcular_fuerzas()
+    # Dos masas separadas 20 celdas: la fuerza se parece a la newtoniana 1/20^2
+    assert fuerzas["A"].x == pytest.approx(1.0 / 20.0**2, rel=0.05)
+    assert fuerzas["B"].x == pytest.approx(-fuerzas["A"].x)
+    sim.paso_simulacion(1.0)
+    assert sim.cuerpos["A"].velocidad.x > 0
+
+def test_potencial_de_la_malla():
+    from Estado_arrays import fuerzas_y_potencial_directos
+    masa, posicion, _ = esfera_plummer(2000, semilla=1)
+    _, energia, _ = fuerzas_y_potencial_directos(masa, posicion, 1.0)
+    _, energia_malla, potenciales = MotorParticulaMalla(celdas=128).calcular_fuerzas_y_potencial(masa, posicion, 1.0)
+    assert energia_malla == pytest.approx(energia, rel=0.02)
+    assert np.all(potenciales < 0)
@@ -0,0 +1,121 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Particulas_prueba import ParticulasPrueba
+import contextlib
+import io
+import math
+import numpy as np
+
+def sistema(integrador='leapfrog', almacenamiento='arrays'):
+    # Estrella y planeta (G = 1)
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, integrador=integrador)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, -1e-3 / math.sqrt(5.2), 0))
+        sim.agregar_cuerpo("Planeta", 1e-3, Vector3D(5.2, 0, 0), Vector3D(0, 1 / math.sqrt(5.2), 0))
+    return sim
+
+def asteroides(num, semilla=0):
+    # Cinturón de órbitas casi circulares entre 2 y 3.3
+    rng = np.random.default_rng(semilla)
+    r = rng.uniform(2.0, 3.3, num)
+    angulo = rng.uniform(0, 2 * np.pi, num)
+    posicion = np.column_stack((r * np.cos(angulo), r * np.sin(angulo), rng.normal(0, 0.01, num)))
+    velocidad = np.column_stack((-np.sin(angulo), np.cos(angulo), np.zeros(num))) / np.sqrt(r)[:, None]
+    return [f"a{i}" for i in range(num)], posicion, velocidad
+
+def test_almacenamiento_crece_y_elimina_por_intercambio():
+    particulas = ParticulasPrueba(capacidad_inicial=2)
+    ids, posicion, velocidad = asteroides(5)
+    particulas.agregar_lote(ids[:4], posicion[:4], velocidad[:4])
+    particulas.agregar(ids[4], posicion[4].tolist(), velocidad[4].tolist())
+    assert particulas.capacidad == 8
+    particulas.eliminar("a1")
+    assert particulas.ids == ["a0", "a4", "a2", "a3"]
+    assert particulas.indice["a4"] == 1
+    assert np.array_equal(particulas.posicion[1], posicion[4])
+    with pytest.raises(ValueError, match="Ya existe una partícula"):
+        particulas.agregar("a0", [0, 0, 0], [0, 0, 0])
+
+@pytest.mark.parametrize("integrador", ['euler', 'leapfrog', 'yoshida4', 'wisdom_holman', 'bloques'])
+def test_las_particulas_no_afectan_a_los_cuerpos(integrador):
+    con = sistema(integrador)
+    sin = sistema(integrador)
+    con.agregar_particulas(*asteroides(50))
+    con.ejecutar(40, 0.1)
+    sin.ejecutar(40, 0.1)
+    # Solo cambia el redondeo: el centro de masas de Wisdom-Holman suma también las masas cero
+    # y con pasos jerárquicos la deriva de los cuerpos se parte en los subpasos de las partículas
+    assert np.allclose(con.estado.posicion, sin.estado.posicion, rtol=1e-12, atol=1e-15)
+    assert np.allclose(con.estado.velocidad, sin.estado.velocidad, rtol=1e-12, atol=1e-15)
+    if integrador in ('euler', 'leapfrog', 'yoshida4'):
+        assert np.array_equal(con.estado.posicion, sin.estado.posicion)
+
+@pytest.mark.parametrize("integrador", ['euler', 'leapfrog', 'wisdom_holman'])
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_igual_que_un_cuerpo_de_masa_despreciable(integrador, almacenamiento):
+    ids, posicion, velocidad = asteroides(3)
+    con_particulas = sistema(integrador, almacenamiento)
+    con_particulas.agregar_particulas(ids, posicion, velocidad)
+    con_cuerpos = sistema(integrador, almacenamiento)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for c_id, pos, vel in zip(ids, posicion.tolist(), velocidad.tolist()):
+            con_cuerpos.agregar_cuerpo(c_id, 1e-30, Vector3D(*pos), Vector3D(*vel))
+    con_particulas.ejecutar(100, 0.05)
+    con_cuerpos.ejecutar(100, 0.05)
+    for c_id, pos in zip(ids, con_particulas.particulas.posicion):
+        assert np.allclose(pos, con_cuerpos.obtener_cuerpo(c_id).posicion.to_list(), rtol=0, atol=1e-12)
+
+def test_orbita_kepleriana_sin_planeta():
+    # Alrededor de una sola estrella fija, con Wisdom-Holman la órbita es exacta salvo redondeo
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador='wisdom_holman')
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_particula("p", Vector3D(1, 0, 0), Vector3D(0, 1.2, 0))
+    periodo = 2 * math.pi * (1 / (2 - 1.2 ** 2)) ** 1.5
+    sim.ejecutar(7, periodo / 7)
+    assert np.allclose(sim.particulas.posicion[0], [1, 0, 0], atol=1e-10)
+
+def test_diagnosticos_solo_de_los_cuerpos():
+    sim = sistema()
+    antes = sim.diagnosticos()
+    sim.agregar_particulas(*asteroides(20))
+    despues = sim.diagnosticos()
+    assert despues["energia_total"] == antes["energia_total"]
+    assert len(sim.cuerpos) == 2 and len(sim.particulas) == 20
+
+def test_ids_unicos_y_eliminacion():
+    sim = sistema()
+    with pytest.raises(ValueError, match="Ya existe un cuerpo"):
+        sim.agregar_particula("Planeta", Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    sim.agregar_particula("p", Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    with pytest.raises(ValueError, match="Ya existe un cuerpo"):
+        sim.agregar_cuerpo("p", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.eliminar_particula("p")
+    assert len(sim.particulas) == 0
+    with pytest.raises(ValueError, match="No existe una partícula"):
+        sim.eliminar_particula("p")
+
+def test_coste_lineal_en_particulas():
+    sim = sistema()
+    sim.agregar_particulas(*asteroides(2000))
+    sim.instrumentacion.activar()
+    sim.ejecutar(1, 0.01)
+    # Leapfrog sin fuerzas previas: dos evaluaciones, cada una con 1 par de cuerpos y 2 x 2000
+    # pares cuerpo-partícula, en lugar de los ~2 millones de pares con 2002 cuerpos
+    assert sim.instrumentacion.a_dict()["contadores"]["pares_evaluados"] == 2 * (1 + 2 * 2000)
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_acoplamientos_reutilizados_con_particulas(almacenamiento):
+    # G·m de las partículas y acoplamientos de objetos no deben desalojarse entre sí en cada paso
+    sim = sistema('euler', almacenamiento)
+    sim.agregar_particulas(*asteroides(10))
+    sim.ejecutar(1, 0.01)
+    caches = (sim._cache_gm, sim._cache_acoplamientos)
+    reconstrucciones = 0
+    for _ in range(99):
+        sim.ejecutar(1, 0.01)
+        reconstrucciones += sum(nueva is not anterior for nueva, anterior in
+                                zip((sim._cache_gm, sim._cache_acoplamientos), caches))
+        caches = (sim._cache_gm, sim._cache_acoplamientos)
+    assert reconstrucciones == 0
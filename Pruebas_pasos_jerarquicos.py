@@ -0,0 +1,61 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Pasos_jerarquicos import PasosJerarquicos
+from Integradores import crear_integrador
+import numpy as np
+import math
+
+def _sistema_con_binaria(integrador, num_lejanos=10):
+    # Estrella central, una binaria muy cerrada a distancia 1 y cuerpos ligeros lejanos
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador=integrador)
+    sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    masa_binaria, separacion = 1e-3, 0.01
+    v_binaria = math.sqrt(2 * masa_binaria / separacion) / 2
+    sim.agregar_cuerpo("B1", masa_binaria, Vector3D(1 + separacion / 2, 0, 0), Vector3D(0, 1 + v_binaria, 0))
+    sim.agregar_cuerpo("B2", masa_binaria, Vector3D(1 - separacion / 2, 0, 0), Vector3D(0, 1 - v_binaria, 0))
+    rng = np.random.default_rng(0)
+    for k in range(num_lejanos):
+        r = rng.uniform(4, 8)
+        angulo = rng.uniform(0, 2 * math.pi)
+        v = math.sqrt(1 / r)
+        sim.agregar_cuerpo(f"P{k}", 1e-7, Vector3D(r * math.cos(angulo), r * math.sin(angulo), 0),
+                           Vector3D(-v * math.sin(angulo), v * math.cos(angulo), 0))
+    return sim
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError, match="eta debe ser positivo"):
+        PasosJerarquicos(eta=0)
+    with pytest.raises(ValueError, match="niveles no puede ser negativo"):
+        PasosJerarquicos(niveles_max=-1)
+
+def test_registrado_por_nombre():
+    assert isinstance(crear_integrador('bloques'), PasosJerarquicos)
+
+def test_binaria_en_niveles_finos(capsys):
+    integrador = PasosJerarquicos(eta=0.02, niveles_max=12)
+    sim = _sistema_con_binaria(integrador)
+    sim.ejecutar(2, 0.25)
+    niveles = dict(zip(sim.estado.ids, integrador.niveles.tolist()))
+    assert niveles["B1"] >= 8 and niveles["B2"] >= 8
+    assert max(niveles[f"P{k}"] for k in range(10)) <= 2
+    # Solo se reevalúan las fuerzas de los cuerpos activos en cada subpaso
+    num_cuerpos = len(sim.cuerpos)
+    assert integrador.evaluaciones_cuerpo < 0.2 * num_cuerpos * 2 * (1 << 12)
+
+def test_conserva_energia_y_sincroniza(capsys):
+    sim = _sistema_con_binaria(PasosJerarquicos(eta=0.02, niveles_max=12))
+    referencia = _sistema_con_binaria('leapfrog')
+    energia_inicial = sim.diagnosticos()["energia_total"]
+    sim.ejecutar(4, 0.25)
+    referencia.ejecutar(2000, 5e-4)
+    assert abs(sim.diagnosticos()["energia_total"] / energia_inicial - 1) < 1e-5
+    assert sim.tiempo == pytest.approx(referencia.tiempo)
+    # Al final del paso todos los cuerpos están en el mismo instante
+    assert np.allclose(sim.estado.posicion, referencia.estado.posicion, atol=1e-3)
+
+def test_sin_interaccion_equivale_a_leapfrog(capsys):
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador=PasosJerarquicos(niveles_max=4))
+    sim.agregar_cuerpo("A", 1.0, Vector3D(0, 0, 0), Vector3D(1, 0, 0))
+    sim.ejecutar(3, 1.0)
+    assert sim.estado.posicion[0].tolist() == [3.0, 0.0, 0.0]
@@ -0,0 +1,77 @@
+import pytest
+from Simulador import Simulador
+from Precision_mixta import MotorPrecisionMixta
+from Estado_arrays import fuerzas_y_potencial_directos
+from Condiciones_iniciales import esfera_plummer
+import numpy as np
+
+def errores_relativos(fuerzas, referencia):
+    return np.linalg.norm(fuerzas - referencia, axis=1) / np.linalg.norm(referencia, axis=1)
+
+@pytest.mark.parametrize("desplazamiento", [0.0, 1e4])
+def test_fuerzas_y_energia_frente_a_float64(desplazamiento):
+    # Lejos del origen también: el núcleo trabaja con posiciones relativas al centro
+    masa, posicion, _ = esfera_plummer(2000, semilla=1)
+    posicion = posicion + desplazamiento
+    fuerzas, energia, potencial = MotorPrecisionMixta(fuentes_por_bloque=256).calcular_fuerzas_y_potencial(masa, posicion, 1.0)
+    fuerzas_64, energia_64, potencial_64 = fuerzas_y_potencial_directos(masa, posicion, 1.0)
+    errores = errores_relativos(fuerzas, fuerzas_64)
+    assert fuerzas.dtype == np.float64
+    assert np.median(errores) < 1e-6
+    assert errores.max() < 1e-3
+    assert energia == pytest.approx(energia_64, rel=1e-6)
+    assert np.allclose(potencial, potencial_64, rtol=1e-5)
+
+@pytest.mark.parametrize("distancia", [1.5e11, 1e14, 1e16, 3e20])
+def test_unidades_si(distancia):
+    # Sol y un cuerpo a distancias del sistema solar a galácticas, con G del SI: sin escalar, en
+    # float32 las fuerzas pierden precisión, se anulan o desbordan
+    masa = np.array([1.989e30, 5.972e24])
+    posicion = np.array([[0.0, 0.0, 0.0], [distancia, 0.3 * distancia, 0.0]])
+    motor = MotorPrecisionMixta()
+    with np.errstate(all='raise'):
+        fuerzas, energia, potencial = motor.calcular_fuerzas_y_potencial(masa, posicion, 6.67430e-11)
+    fuerzas_64, energia_64, potencial_64 = fuerzas_y_potencial_directos(masa, posicion, 6.67430e-11)
+    assert errores_relativos(fuerzas, fuerzas_64).max() < 1e-6
+    assert energia == pytest.approx(energia_64, rel=1e-6)
+    assert np.allclose(potencial, potencial_64, rtol=1e-6)
+
+def test_sistema_solar_en_unidades_si():
+    # Sol, Tierra, Júpiter y Neptuno: masas y distancias que abarcan muchos órdenes de magnitud
+    masa = np.array([1.989e30, 5.972e24, 1.898e27, 1.024e26])
+    posicion = np.array([[0.0, 0, 0], [1.496e11, 0, 0], [0, 7.785e11, 1e9], [-4.495e12, 1e10, 0]])
+    fuerzas = MotorPrecisionMixta().calcular_fuerzas(masa, posicion, 6.67430e-11)
+    referencia = fuerzas_y_potencial_directos(masa, posicion, 6.67430e-11)[0]
+    assert errores_relativos(fuerzas, referencia).max() < 1e-6
+
+def test_bloques_de_fuentes_no_cambian_la_precision():
+    masa, posicion, _ = esfera_plummer(1500, semilla=2)
+    referencia = fuerzas_y_potencial_directos(masa, posicion, 1.0)[0]
+    for fuentes in (7, 100, 1500):
+        fuerzas = MotorPrecisionMixta(fuentes_por_bloque=fuentes).calcular_fuerzas(masa, posicion, 1.0)
+        assert np.median(errores_relativos(fuerzas, referencia)) < 1e-6
+
+def test_cuerpos_coincidentes():
+    masa = np.array([1.0, 1.0, 2.0])
+    posicion = np.array([[0.0, 0, 0], [0.0, 0, 0], [1.0, 0, 0]])
+    motor = MotorPrecisionMixta()
+    fuerzas, energia, _ = motor.calcular_fuerzas_y_potencial(masa, posicion, 1.0)
+    assert energia == float('-inf')
+    assert motor.pares_cero == 3 + 2
+    assert fuerzas[0].tolist() == pytest.approx([2.0, 0.0, 0.0])
+
+def test_en_el_simulador_conserva_la_energia():
+    masa, posicion, velocidad = esfera_plummer(200, semilla=3)
+    energias = []
+    for motor in (None, MotorPrecisionMixta()):
+        sim = Simulador(G=1.0, almacenamiento='arrays', motor=motor, integrador='leapfrog')
+        sim.estado.agregar_lote([f"c{i}" for i in range(200)], masa, posicion, velocidad)
+        sim.ejecutar(50, 1e-3)
+        energias.append(sim.diagnosticos()["energia_total"])
+    assert energias[1] == pytest.approx(energias[0], rel=1e-5)
+
+def test_vacio_y_parametros():
+    fuerzas = MotorPrecisionMixta().calcular_fuerzas(np.zeros(0), np.zeros((0, 3)), 1.0)
+    assert fuerzas.shape == (0, 3)
+    with pytest.raises(ValueError):
+        MotorPrecisionMixta(fuentes_por_bloque=0)
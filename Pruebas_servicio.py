@@ -0,0 +1,89 @@
+import pytest
+from Simulador import Simulador
+from Servicio import ServicioSimulacion, enviar_orden
+from Checkpoint_binario import leer_checkpoint
+from Condiciones_iniciales import esfera_plummer
+import asyncio
+import time
+import numpy as np
+
+def crear_servicio(**opciones):
+    masa, posicion, velocidad = esfera_plummer(30, semilla=5)
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador='leapfrog')
+    sim.estado.agregar_lote([f"c{i}" for i in range(30)], masa, posicion, velocidad)
+    return ServicioSimulacion(sim, dt=1e-4, pasos_por_lote=5, **opciones)
+
+def esperar(condicion, limite=10.0):
+    inicio = time.perf_counter()
+    while not condicion():
+        assert time.perf_counter() - inicio < limite
+        time.sleep(0.005)
+
+def test_instantanea_independiente_del_simulador():
+    servicio = crear_servicio()
+    instantanea = servicio.instantanea
+    servicio.sim.estado.posicion[0] = [9.0, 9.0, 9.0]
+    assert instantanea["posicion"][0].tolist() != [9.0, 9.0, 9.0]
+    assert instantanea["pasos"] == 0 and instantanea["diagnosticos"]["energia_total"] < 0
+
+def test_avanza_en_segundo_plano_y_se_detiene():
+    servicio = crear_servicio(n_pasos=23)
+    servicio.iniciar()
+    esperar(lambda: servicio.instantanea["pasos"] == 23)
+    servicio.detener()
+    assert servicio.sim.pasos == 23
+    assert servicio.instantanea["tiempo"] == pytest.approx(23e-4)
+    assert servicio.error is None
+
+def test_pausa_reanuda_y_dt():
+    servicio = crear_servicio()
+    servicio.iniciar()
+    esperar(lambda: servicio.instantanea["pasos"] > 0)
+    assert servicio.pausar(espera=10.0)
+    pasos = servicio.sim.pasos
+    time.sleep(0.05)
+    assert servicio.sim.pasos == pasos and servicio.instantanea["pasos"] == pasos
+    servicio.cambiar_dt(2e-4)
+    servicio.reanudar()
+    esperar(lambda: servicio.instantanea["pasos"] >= pasos + 5)
+    servicio.detener()
+    assert servicio.instantanea["dt"] == 2e-4
+    with pytest.raises(ValueError):
+        servicio.cambiar_dt(0)
+
+def test_ordenes_por_socket(tmp_path):
+    servicio = crear_servicio()
+
+    async def sesion():
+        servidor = await servicio.servir(puerto=0)
+        puerto = servidor.sockets[0].getsockname()[1]
+        await asyncio.to_thread(esperar, lambda: servicio.instantanea["pasos"] > 0)
+        pausa = await enviar_orden(puerto, orden="pausar")
+        estado = await enviar_orden(puerto, orden="estado")
+        cuerpos = await enviar_orden(puerto, orden="cuerpos", ids=["c3"])
+        archivo = str(tmp_path / "estado.bin")
+        checkpoint = await enviar_orden(puerto, orden="checkpoint", archivo=archivo)
+        dt = await enviar_orden(puerto, orden="dt", valor=5e-5)
+        errores = [await enviar_orden(puerto, orden="inexistente"),
+                   await enviar_orden(puerto, orden="cuerpos", ids=["nadie"])]
+        detenido = await enviar_orden(puerto, orden="detener")
+        return pausa, estado, cuerpos, checkpoint, dt, errores, detenido, archivo
+
+    pausa, estado, cuerpos, checkpoint, dt, errores, detenido, archivo = asyncio.run(sesion())
+    assert pausa["ok"] and pausa["pausado"]
+    # En pausa, la instantánea coincide con el simulador
+    assert estado["pasos"] == servicio.sim.pasos and estado["num_cuerpos"] == 30
+    assert "energia_total" in estado["diagnosticos"]
+    assert cuerpos["cuerpos"][0]["id"] == "c3"
+    assert cuerpos["cuerpos"][0]["posicion"] == servicio.sim.estado.posicion[3].tolist()
+    datos = leer_checkpoint(archivo)
+    assert datos["tiempo"] == checkpoint["tiempo"] == servicio.sim.tiempo
+    assert datos["metadatos"]["pasos"] == checkpoint["pasos"] == servicio.sim.pasos > 0
+    reanudado = Simulador(almacenamiento='arrays')
+    reanudado.cargar(archivo, 'binario')
+    assert reanudado.pasos == servicio.sim.pasos
+    assert np.array_equal(datos["posicion"], servicio.sim.estado.posicion)
+    assert dt == {"ok": True, "dt": 5e-5}
+    assert [e["ok"] for e in errores] == [False, False]
+    assert "no soportada" in errores[0]["error"]
+    assert detenido["ok"] and not detenido["en_marcha"]
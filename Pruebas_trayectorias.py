@@ -0,0 +1,87 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Trayectorias import GrabadorTrayectoria, LectorTrayectoria
+import numpy as np
+
+def _simulador(almacenamiento='arrays'):
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, integrador='leapfrog')
+    sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+    sim.agregar_cuerpo("Planeta", 1e-3, Vector3D(1, 0, 0), Vector3D(0, 1, 0))
+    return sim
+
+@pytest.mark.parametrize("almacenamiento", ['objetos', 'arrays'])
+def test_grabar_y_leer_con_diezmado(almacenamiento, tmp_path, capsys):
+    archivo = str(tmp_path / "orbita.tray")
+    sim = _simulador(almacenamiento)
+    esperados = []
+    with GrabadorTrayectoria(archivo, cada=5, capacidad_inicial=2) as grabador:
+        grabador.conectar(sim)
+        esperados.append(sim._arrays_estado()[2].copy())
+        for _ in range(20):
+            sim.ejecutar(1, 0.01)
+            if sim.pasos % 5 == 0:
+                _, _, posicion, _ = sim._arrays_estado()
+                esperados.append(posicion.copy())
+    assert sim.ganchos_paso == []
+
+    lector = LectorTrayectoria(archivo)
+    assert len(lector) == 5
+    assert lector.ids == ["Estrella", "Planeta"]
+    assert lector.pasos.tolist() == [0, 5, 10, 15, 20]
+    assert np.allclose(lector.tiempos, [0.0, 0.05, 0.1, 0.15, 0.2])
+    for k in range(5):
+        tiempo, posicion, velocidad = lector.marco(k)
+        assert np.array_equal(posicion, esperados[k])
+    _, posicion, velocidad = lector.marco(4)
+    assert posicion.tolist() == [sim.cuerpos[c].posicion.to_list() for c in lector.ids]
+    assert velocidad.tolist() == [sim.cuerpos[c].velocidad.to_list() for c in lector.ids]
+    assert lector.posiciones.shape == (5, 2, 3)
+
+def test_lectura_sin_cerrar(tmp_path):
+    archivo = str(tmp_path / "orbita.tray")
+    sim = _simulador()
+    grabador = GrabadorTrayectoria(archivo)
+    grabador.conectar(sim)
+    sim.ejecutar(3, 0.01)
+    grabador.vaciar()
+    assert len(LectorTrayectoria(archivo)) == 4
+    grabador.cerrar()
+
+def test_marcos_indexados_completos_sin_vaciar(tmp_path):
+    # Sin vaciar ni cerrar, todo marco cuyo registro ya está en el índice tiene sus datos en el archivo
+    archivo = str(tmp_path / "orbita.tray")
+    sim = _simulador()
+    grabador = GrabadorTrayectoria(archivo)
+    esperados = []
+    sim.ganchos_paso.append(lambda s: esperados.append(s._arrays_estado()[2].copy()))
+    grabador.conectar(sim)
+    esperados.insert(0, sim._arrays_estado()[2].copy())
+    indexados = 0
+    for _ in range(700):
+        sim.ejecutar(1, 0.01)
+        lector = LectorTrayectoria(archivo)
+        if len(lector) > indexados:
+            indexados = len(lector)
+            assert np.array_equal(lector.posiciones[-1], esperados[indexados - 1])
+    assert indexados > 0
+    grabador.cerrar()
+
+def test_cambio_de_cuerpos(tmp_path, capsys):
+    sim = _simulador()
+    grabador = GrabadorTrayectoria(str(tmp_path / "orbita.tray"))
+    grabador.conectar(sim)
+    sim.agregar_cuerpo("Cometa", 1e-9, Vector3D(5, 0, 0), Vector3D(0, 0.3, 0))
+    with pytest.raises(ValueError, match="Los cuerpos de la simulación cambiaron"):
+        sim.ejecutar(1, 0.01)
+    grabador.cerrar()
+
+def test_intervalo_invalido(tmp_path):
+    with pytest.raises(ValueError, match="El intervalo de grabación debe ser al menos 1."):
+        GrabadorTrayectoria(str(tmp_path / "x.tray"), cada=0)
+
+def test_archivo_no_valido(tmp_path):
+    archivo = tmp_path / "x.tray"
+    archivo.write_bytes(b"basura")
+    with pytest.raises(ValueError, match="no es una trayectoria válida"):
+        LectorTrayectoria(str(archivo))
@@ -81,4 +81,27 @@ def test_vector3d_from_list_invalid_length():
     with pytest.raises(ValueError, match="La lista debe contener 3 elementos para un Vector3D."):
         Vector3D.from_list([1, 2])
     with pytest.raises(ValueError, match="La lista debe contener 3 elementos para un Vector3D."):
-        Vector3D.from_list([1, 2, 3, 4])
\ No newline at end of file
+        Vector3D.from_list([1, 2, 3, 4])
+
+def test_vector3d_in_place():
+    v = Vector3D(1, 2, 3)
+    original = v
+    v += Vector3D(1, 1, 1)
+    v -= Vector3D(0, 1, 2)
+    v *= 2
+    assert v is original
+    assert v.to_list() == [4, 4, 4]
+
+def test_vector3d_add_scaled():
+    v = Vector3D(1, 0, 0)
+    assert v.add_scaled(Vector3D(1, 2, 3), 0.5) is v
+    assert v.to_list() == [1.5, 1.0, 1.5]
+
+def test_vector3d_magnitude_squared():
+    assert Vector3D(3, 4, 0).magnitude_squared() == 25
+
+def test_vector3d_slots():
+    v = Vector3D(1, 2, 3)
+    assert not hasattr(v, "__dict__")
+    with pytest.raises(AttributeError):
+        v.w = 4
@@ -0,0 +1,103 @@
+import pytest
+from Simulador import Simulador
+from Clase_vector_3D import Vector3D
+from Wisdom_holman import WisdomHolman, deriva_kepler
+import contextlib
+import io
+import math
+import numpy as np
+
+def sistema_planetario(integrador, almacenamiento='arrays'):
+    # Estrella y dos planetas en órbitas algo excéntricas e inclinadas (G = 1, periodo interior ~2*pi)
+    sim = Simulador(G=1.0, almacenamiento=almacenamiento, integrador=integrador)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, 0, 0))
+        sim.agregar_cuerpo("Interior", 1e-3, Vector3D(1, 0, 0), Vector3D(0, 1.0, 0.01))
+        sim.agregar_cuerpo("Exterior", 3e-4, Vector3D(0, 1.9, 0.05), Vector3D(-1.02 / math.sqrt(1.9), 0, 0))
+    return sim
+
+def error_maximo_energia(sim, n_pasos, dt):
+    energia_inicial = sim.diagnosticos()["energia_total"]
+    errores = []
+    sim.ejecutar(n_pasos, dt, diagnosticos_cada=5,
+                 callback=lambda d: errores.append(abs(d["energia_total"] / energia_inicial - 1)))
+    return max(errores)
+
+def test_deriva_kepler_vuelve_tras_un_periodo():
+    # Órbitas elípticas con distinta excentricidad (circular, e = 0.44 y e = 0.64)
+    posicion = np.array([[1.0, 0, 0]] * 3)
+    velocidad = np.array([[0, v, 0] for v in (1.0, 1.2, 0.6)])
+    a = 1 / (2 - np.sum(velocidad ** 2, axis=1))
+    periodo = 2 * math.pi * a ** 1.5
+    for k in range(3):
+        pos, vel = posicion[k:k + 1].copy(), velocidad[k:k + 1].copy()
+        deriva_kepler(pos, vel, 1.0, float(periodo[k]))
+        assert np.allclose(pos, posicion[k:k + 1], atol=1e-10)
+        assert np.allclose(vel, velocidad[k:k + 1], atol=1e-10)
+
+@pytest.mark.parametrize("velocidad_inicial", [[0.0, 1.1, 0.2], [0.3, 1.6, 0.0], [0.0, math.sqrt(2), 0.0]])
+def test_deriva_kepler_frente_a_integracion_fina(velocidad_inicial):
+    # Elíptica, hiperbólica y parabólica: la solución analítica coincide con muchos pasos leapfrog
+    posicion = np.array([[1.0, 0.0, 0.0]])
+    velocidad = np.array([velocidad_inicial])
+    pos, vel = posicion.copy(), velocidad.copy()
+    deriva_kepler(pos, vel, 1.0, 2.0)
+
+    p, v = posicion[0].copy(), velocidad[0].copy()
+    h = 2.0 / 20000
+    for _ in range(20000):
+        v -= p / np.linalg.norm(p) ** 3 * h / 2
+        p += v * h
+        v -= p / np.linalg.norm(p) ** 3 * h / 2
+    assert np.allclose(pos[0], p, atol=1e-6)
+    assert np.allclose(vel[0], v, atol=1e-6)
+
+def test_deriva_kepler_conserva_energia_y_momento_angular():
+    rng = np.random.default_rng(0)
+    posicion = rng.uniform(-2, 2, (50, 3))
+    velocidad = rng.uniform(-1, 1, (50, 3))
+    energia = 0.5 * np.sum(velocidad ** 2, axis=1) - 1 / np.linalg.norm(posicion, axis=1)
+    momento = np.cross(posicion, velocidad)
+    deriva_kepler(posicion, velocidad, 1.0, 3.7)
+    assert np.allclose(0.5 * np.sum(velocidad ** 2, axis=1) - 1 / np.linalg.norm(posicion, axis=1), energia, atol=1e-10)
+    assert np.allclose(np.cross(posicion, velocidad), momento, atol=1e-10)
+
+def test_dos_cuerpos_con_pasos_grandes():
+    # Con un solo planeta solo queda el error del término de salto, ~(m / m0)^2: basta con 5 pasos por órbita
+    sim = Simulador(G=1.0, almacenamiento='arrays', integrador='wisdom_holman')
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.agregar_cuerpo("Estrella", 1.0, Vector3D(0, 0, 0), Vector3D(0, -1e-3, 0))
+        sim.agregar_cuerpo("Planeta", 1e-3, Vector3D(1, 0, 0), Vector3D(0, 1.0, 0))
+    assert error_maximo_energia(sim, 100, 2 * math.pi / 5) < 1e-8
+
+def test_sistema_planetario_frente_a_leapfrog():
+    # 20 pasos por órbita interior durante 50 órbitas
+    dt = 2 * math.pi / 20
+    error_wh = error_maximo_energia(sistema_planetario('wisdom_holman'), 1000, dt)
+    error_leapfrog = error_maximo_energia(sistema_planetario('leapfrog'), 1000, dt)
+    assert error_wh < 1e-5
+    assert error_wh < error_leapfrog / 100
+
+def test_conserva_momento_y_centro_de_masas():
+    sim = sistema_planetario('wisdom_holman')
+    antes = sim.diagnosticos()
+    masa = sim.estado.masa
+    centro = masa @ sim.estado.posicion / masa.sum()
+    sim.ejecutar(200, 0.1)
+    despues = sim.diagnosticos()
+    assert np.allclose(despues["momento_lineal"].to_list(), antes["momento_lineal"].to_list(), atol=1e-15)
+    velocidad_centro = np.array(antes["momento_lineal"].to_list()) / masa.sum()
+    assert np.allclose(masa @ sim.estado.posicion / masa.sum(), centro + velocidad_centro * 20.0, atol=1e-12)
+
+def test_almacenamiento_de_objetos_igual_que_arrays():
+    arrays = sistema_planetario('wisdom_holman')
+    objetos = sistema_planetario('wisdom_holman', almacenamiento='objetos')
+    arrays.ejecutar(50, 0.2)
+    objetos.ejecutar(50, 0.2)
+    for c_id in ("Estrella", "Interior", "Exterior"):
+        assert np.allclose(objetos.obtener_cuerpo(c_id).posicion.to_list(),
+                           arrays.obtener_cuerpo(c_id).posicion.to_list(), atol=1e-12)
+
+def test_necesita_masas():
+    with pytest.raises(ValueError, match="necesita las masas"):
+        WisdomHolman().paso(np.zeros((2, 3)), np.zeros((2, 3)), 0.1, lambda p: np.zeros_like(p))
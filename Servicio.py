@@ -0,0 +1,251 @@
+from Simulador import Simulador
+from Checkpoint_binario import escribir_checkpoint
+from Ejecucion_batch import crear_motor, crear_integrador_escenario, _cargar_condiciones, G_POR_DEFECTO
+from Clase_vector_3D import Vector3D
+import argparse
+import asyncio
+import json
+import os
+import threading
+
+# Servicio de simulación en segundo plano: un hilo avanza el Simulador en lotes de pasos y,
+# al final de cada lote, publica una instantánea (copia del estado y de los diagnósticos del
+# último paso). Mientras tanto, un servidor asyncio en localhost atiende órdenes en JSON, una
+# por línea, y responde con otra línea JSON:
+#   {"orden": "estado"}                      tiempo, pasos, dt, pausado y diagnósticos
+#   {"orden": "cuerpos", "ids": [...]}       masa, posición y velocidad (de todos o de esos ids)
+#   {"orden": "pausar"} / {"orden": "reanudar"}
+#   {"orden": "dt", "valor": 0.01}           nuevo paso de tiempo desde el siguiente lote
+#   {"orden": "checkpoint", "archivo": "estado.bin"}
+#   {"orden": "detener"}
+# Las consultas leen siempre la última instantánea publicada: el hilo construye la siguiente
+# aparte y la sustituye de una vez (doble búfer), así que nunca ven un estado a medio paso ni
+# detienen la simulación. El checkpoint se escribe desde la instantánea en otro hilo.
+
+
+class ServicioSimulacion:
+    def __init__(self, sim: Simulador, dt: float, pasos_por_lote: int = 10, n_pasos: int | None = None):
+        if dt <= 0:
+            raise ValueError("El paso de tiempo debe ser positivo.")
+        if pasos_por_lote < 1:
+            raise ValueError("El número de pasos por lote debe ser al menos 1.")
+        self.sim = sim
+        self.dt = dt
+        self.pasos_por_lote = pasos_por_lote
+        self.n_pasos = n_pasos  # Pasos a dar en total (None: hasta detener)
+        self.error: BaseException | None = None
+        self._instantanea = self._capturar(sim.diagnosticos())
+        self._en_marcha = threading.Event()
+        self._en_marcha.set()
+        self._inactivo = threading.Event()  # El hilo está en pausa o terminado, no a mitad de un lote
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+        self._servidor: asyncio.Server | None = None
+        self._fin: asyncio.Event | None = None  # Se activa con la orden detener
+
+    @property
+    def instantanea(self) -> dict:
+        return self._instantanea
+
+    @property
+    def pausado(self) -> bool:
+        return not self._en_marcha.is_set()
+
+    def _capturar(self, diagnosticos: dict) -> dict:
+        # Copia independiente del estado: no comparte memoria con el simulador
+        ids, masa, posicion, velocidad = self.sim._arrays_estado()
+        return {
+            "tiempo": self.sim.tiempo,
+            "pasos": self.sim.pasos,
+            "dt": self.dt,
+            "G": self.sim.G,
+            "ids": list(ids),
+            "masa": masa.copy(),
+            "posicion": posicion.copy(),
+            "velocidad": velocidad.copy(),
+            "radio": self.sim._radios().copy(),
+            "diagnosticos": {clave: valor.to_list() if isinstance(valor, Vector3D) else valor
+                             for clave, valor in diagnosticos.items()},
+        }
+
+    def _bucle(self):
+        try:
+            while not self._detener.is_set():
+                if not self._en_marcha.is_set():
+                    self._inactivo.set()
+                    self._en_marcha.wait(timeout=0.1)
+                    continue
+                self._inactivo.clear()
+                if not self._en_marcha.is_set() or self._detener.is_set():
+                    continue
+                pasos = self.pasos_por_lote
+                if self.n_pasos is not None:
+                    pasos = min(pasos, self.n_pasos - self.sim.pasos)
+                    if pasos <= 0:
+                        break
+                # Los diagnósticos del último paso del lote salen de la misma pasada que sus fuerzas
+                diagnosticos = []
+                self.sim.ejecutar(pasos, self.dt, diagnosticos_cada=pasos, callback=diagnosticos.append)
+                self._instantanea = self._capturar(diagnosticos[-1])
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._inactivo.set()
+
+    def iniciar(self):
+        if self._hilo is not None:
+            raise RuntimeError("El servicio ya está en marcha.")
+        self._hilo = threading.Thread(target=self._bucle, name="simulacion", daemon=True)
+        self._hilo.start()
+
+    def pausar(self, espera: float | None = None) -> bool:
+        # Pide la pausa y espera (como mucho espera segundos) a que termine el lote en curso.
+        # Devuelve True si el hilo ya está parado.
+        self._en_marcha.clear()
+        if self._hilo is None:
+            return True
+        return self._inactivo.wait(espera)
+
+    def reanudar(self):
+        self._en_marcha.set()
+
+    def cambiar_dt(self, dt: float):
+        if dt <= 0:
+            raise ValueError("El paso de tiempo debe ser positivo.")
+        self.dt = dt  # El hilo lo lee al empezar cada lote
+
+    def detener(self):
+        self._detener.set()
+        self._en_marcha.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def guardar_checkpoint(self, archivo: str) -> dict:
+        instantanea = self._instantanea
+        # Con los pasos, como Auto_checkpoint, para que al reanudar sigan los ganchos con pasos % cada
+        escribir_checkpoint(archivo, instantanea["ids"], instantanea["masa"], instantanea["posicion"],
+                            instantanea["velocidad"], instantanea["G"], instantanea["tiempo"], instantanea["radio"],
+                            metadatos={"pasos": instantanea["pasos"]})
+        return {"archivo": archivo, "tiempo": instantanea["tiempo"], "pasos": instantanea["pasos"]}
+
+    def _resumen(self) -> dict:
+        instantanea = self._instantanea
+        return {"tiempo": instantanea["tiempo"], "pasos": instantanea["pasos"], "dt": self.dt,
+                "pausado": self.pausado, "en_marcha": self._hilo is not None and self._hilo.is_alive(),
+                "num_cuerpos": len(instantanea["ids"]), "diagnosticos": instantanea["diagnosticos"]}
+
+    async def atender(self, orden: dict) -> dict:
+        # Ejecuta una orden y devuelve la respuesta ({"ok": True, ...} o {"ok": False, "error": ...})
+        nombre = orden.get("orden")
+        try:
+            if nombre == "estado":
+                respuesta = self._resumen()
+            elif nombre == "cuerpos":
+                instantanea = self._instantanea
+                filas = range(len(instantanea["ids"]))
+                if "ids" in orden:
+                    indice = {c_id: i for i, c_id in enumerate(instantanea["ids"])}
+                    desconocidos = [c_id for c_id in orden["ids"] if c_id not in indice]
+                    if desconocidos:
+                        raise ValueError(f"No existe un cuerpo con el ID '{desconocidos[0]}'.")
+                    filas = [indice[c_id] for c_id in orden["ids"]]
+                respuesta = {"tiempo": instantanea["tiempo"], "pasos": instantanea["pasos"], "cuerpos": [
+                    {"id": instantanea["ids"][i], "masa": float(instantanea["masa"][i]),
+                     "posicion": instantanea["posicion"][i].tolist(), "velocidad": instantanea["velocidad"][i].tolist()}
+                    for i in filas]}
+            elif nombre == "pausar":
+                await asyncio.to_thread(self.pausar)
+                respuesta = self._resumen()
+            elif nombre == "reanudar":
+                self.reanudar()
+                respuesta = self._resumen()
+            elif nombre == "dt":
+                self.cambiar_dt(float(orden["valor"]))
+                respuesta = {"dt": self.dt}
+            elif nombre == "checkpoint":
+                respuesta = await asyncio.to_thread(self.guardar_checkpoint, orden.get("archivo", "estado.bin"))
+            elif nombre == "detener":
+                await asyncio.to_thread(self.detener)
+                if self._fin is not None:
+                    self._fin.set()
+                respuesta = self._resumen()
+            else:
+                raise ValueError(f"Orden '{nombre}' no soportada.")
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, **respuesta}
+
+    async def _conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        try:
+            while linea := await lector.readline():
+                try:
+                    orden = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    respuesta = {"ok": False, "error": f"JSON no válido: {e}"}
+                else:
+                    respuesta = await self.atender(orden if isinstance(orden, dict) else {})
+                escritor.write(json.dumps(respuesta).encode("utf-8") + b"\n")
+                await escritor.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host: str = "127.0.0.1", puerto: int = 0) -> asyncio.Server:
+        # Arranca el hilo de simulación y el servidor; con puerto 0 el sistema elige uno libre
+        # (servidor.sockets[0].getsockname()[1]). El servidor sigue aceptando conexiones hasta
+        # que se cierra; la orden detener solo para la simulación y avisa a _servir_escenario.
+        self._fin = asyncio.Event()
+        self._servidor = await asyncio.start_server(self._conexion, host, puerto)
+        if self._hilo is None:
+            self.iniciar()
+        return self._servidor
+
+
+async def enviar_orden(puerto: int, host: str = "127.0.0.1", **orden) -> dict:
+    # Cliente mínimo: envía una orden y devuelve la respuesta
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        escritor.write(json.dumps(orden).encode("utf-8") + b"\n")
+        await escritor.drain()
+        return json.loads(await lector.readline())
+    finally:
+        escritor.close()
+        await escritor.wait_closed()
+
+
+async def _servir_escenario(servicio: ServicioSimulacion, host: str, puerto: int):
+    servidor = await servicio.servir(host, puerto)
+    print(f"Servicio de simulación en {host}:{servidor.sockets[0].getsockname()[1]}")
+    try:
+        await servicio._fin.wait()
+    finally:
+        servidor.close()
+        servicio.detener()
+
+
+def main(argumentos: list[str] | None = None):
+    # python Servicio.py --escenario escenario.json --puerto 8765
+    parser = argparse.ArgumentParser(description="Servicio de simulación en segundo plano.")
+    parser.add_argument("--escenario", required=True, help="Archivo JSON con el escenario (como en Ejecucion_batch.py).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--pasos-por-lote", type=int, default=10, dest="pasos_por_lote")
+    args = parser.parse_args(argumentos)
+
+    with open(args.escenario) as f:
+        escenario = json.load(f)
+    sim = Simulador(G=escenario.get("G", G_POR_DEFECTO), almacenamiento=escenario.get("almacenamiento", "arrays"),
+                    motor=crear_motor(escenario.get("motor", "directo")),
+                    integrador=crear_integrador_escenario(escenario.get("integrador", "euler")))
+    _cargar_condiciones(sim, escenario["condiciones_iniciales"], os.path.dirname(os.path.abspath(args.escenario)),
+                        escenario.get("G"))
+    servicio = ServicioSimulacion(sim, escenario["dt"], args.pasos_por_lote, escenario.get("pasos") or None)
+    try:
+        asyncio.run(_servir_escenario(servicio, args.host, args.puerto))
+    except KeyboardInterrupt:
+        servicio.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,62 @@
 from Cuerpos_celestes import CuerpoCeleste
 from Clase_vector_3D import Vector3D
+from Estado_arrays import EstadoArrays, VistaCuerpos, MotorDirecto, energia_potencial_directa, _nucleo_directo
+from Integradores import crear_integrador, EulerSemiImplicito
+from Checkpoint_binario import escribir_checkpoint, leer_checkpoint
+from Carga_streaming import leer_csv_por_bloques, ResumenCarga, FILAS_POR_BLOQUE
+from Instrumentacion import Instrumentacion
+from Colisiones import pares_en_contacto, grupos_de_colision, fusionar
+from Particulas_prueba import ParticulasPrueba, aceleraciones_particulas
+from Elementos_orbitales import ELEMENTOS, elementos_estado
+from collections.abc import MutableMapping, Callable
+import cProfile
+import pstats
 import json
 import csv
 import math
+import numpy as np
+
+# Con hasta este número de cuerpos, el bucle de objetos guarda el acoplamiento G·m_i·m_j de cada
+# par (N^2 / 2 números); con más, solo G·m_i, para no crecer en memoria cuadráticamente
+MAX_CUERPOS_ACOPLAMIENTO = 1000
 
 class Simulador:
-    def __init__(self, G: float = 6.67430e-11):  # Constante de gravitación universal
-        self.cuerpos: dict[str, CuerpoCeleste] = {}
+    def __init__(self, G: float = 6.67430e-11,  # Constante de gravitación universal
+                 almacenamiento: str = 'objetos', motor=None, integrador='euler', colisiones: bool = False):
+        if almacenamiento not in ('objetos', 'arrays'):
+            raise ValueError(f"Almacenamiento '{almacenamiento}' no soportado. Use 'objetos' o 'arrays'.")
         self.G = G
+        self.tiempo = 0.0  # Tiempo de simulación transcurrido (s)
+        self.almacenamiento = almacenamiento
+        # Con 'arrays' el estado vive en arrays contiguos y self.cuerpos es una fachada sobre ellos
+        self.estado: EstadoArrays | None = None
+        self.cuerpos: MutableMapping[str, CuerpoCeleste] = {}
+        if almacenamiento == 'arrays':
+            self.estado = EstadoArrays()
+            self.cuerpos = VistaCuerpos(self.estado)
+        # Partículas de prueba sin masa, fuera de self.cuerpos: sienten la gravedad de los
+        # cuerpos pero no la ejercen (Particulas_prueba.py)
+        self.particulas = ParticulasPrueba()
+        # Motor de fuerzas con método calcular_fuerzas(masa, posicion, G) -> array (N, 3).
+        # Con None se usa la suma directa (bucle de objetos o núcleo vectorizado según el almacenamiento)
+        self.motor = motor
+        # Integrador temporal: nombre de Integradores.INTEGRADORES o instancia con método paso(...)
+        self.integrador = crear_integrador(integrador)
+        # Con colisiones, tras cada paso se fusionan los cuerpos cuyos radios se solapan
+        self.colisiones = colisiones
+        self._cache_fuerzas: dict | None = None
+        # Términos G·m_i (y G·m_i·m_j por pares con pocos cuerpos), recalculados solo al cambiar
+        # G, los cuerpos o sus masas
+        self._cache_acoplamientos: dict | None = None
+        # G·m_i como array (partículas de prueba, Wisdom-Holman), con su propia entrada para no
+        # desalojar los acoplamientos de objetos cuando se usan los dos en el mismo paso
+        self._cache_gm: dict | None = None
+        self.pasos = 0  # Pasos dados desde el inicio
+        # Funciones gancho(simulador) llamadas al final de cada paso (p. ej. GrabadorTrayectoria)
+        self.ganchos_paso: list[Callable[['Simulador'], None]] = []
+        # Cronómetros por fase y contadores; desactivada (sin coste apreciable) hasta activar()
+        self.instrumentacion = Instrumentacion()
+        self._motor_directo = MotorDirecto()
 
     def listar_cuerpos(self):
         if not self.cuerpos:
@@ -21,11 +70,11 @@ class Simulador:
             print(f"   Velocidad: {cuerpo.velocidad} m/s")
         print("-----------------------------------")
 
-    def agregar_cuerpo(self, id: str, masa: float, posicion: Vector3D, velocidad: Vector3D):
-        if id in self.cuerpos:
+    def agregar_cuerpo(self, id: str, masa: float, posicion: Vector3D, velocidad: Vector3D, radio: float = 0.0):
+        if id in self.cuerpos or id in self.particulas:
             raise ValueError(f"Ya existe un cuerpo con el ID '{id}'.")
         try:
-            nuevo_cuerpo = CuerpoCeleste(id, masa, posicion, velocidad)
+            nuevo_cuerpo = CuerpoCeleste(id, masa, posicion, velocidad, radio)
             self.cuerpos[id] = nuevo_cuerpo
             print(f"Cuerpo '{id}' agregado exitosamente.")
         except ValueError as e:
@@ -34,77 +83,506 @@ class Simulador:
     def obtener_cuerpo(self, id: str) -> CuerpoCeleste | None:
         return self.cuerpos.get(id)
 
-    def calcular_fuerzas(self) -> dict[str, Vector3D]:
-        fuerzas_netas: dict[str, Vector3D] = {c_id: Vector3D(0, 0, 0) for c_id in self.cuerpos}
+    def eliminar_cuerpo(self, id: str) -> CuerpoCeleste:
+        # Quita un cuerpo (eyecciones, fusiones) y devuelve una copia independiente de sus datos.
+        # Con arrays cuesta O(1): el último cuerpo pasa a ocupar su fila.
+        if id not in self.cuerpos:
+            raise ValueError(f"No existe un cuerpo con el ID '{id}'.")
+        cuerpo = self.cuerpos[id]
+        eliminado = CuerpoCeleste(id, cuerpo.masa, cuerpo.posicion, cuerpo.velocidad, cuerpo.radio)
+        del self.cuerpos[id]
+        return eliminado
+
+    def agregar_particula(self, id: str, posicion: Vector3D, velocidad: Vector3D):
+        if id in self.cuerpos:
+            raise ValueError(f"Ya existe un cuerpo con el ID '{id}'.")
+        self.particulas.agregar(id, posicion.to_list(), velocidad.to_list())
+
+    def agregar_particulas(self, ids: list[str], posicion: np.ndarray, velocidad: np.ndarray):
+        # Añade un lote de partículas de prueba (posiciones y velocidades (K, 3)) de una vez
+        repetidos = [p_id for p_id in ids if p_id in self.cuerpos]
+        if repetidos:
+            raise ValueError(f"Ya existe un cuerpo con el ID '{repetidos[0]}'.")
+        self.particulas.agregar_lote(ids, posicion, velocidad)
+
+    def eliminar_particula(self, id: str):
+        if id not in self.particulas:
+            raise ValueError(f"No existe una partícula con el ID '{id}'.")
+        self.particulas.eliminar(id)
 
+    def _arrays_masa_posicion(self) -> tuple[list[str], np.ndarray, np.ndarray]:
+        if self.estado is not None:
+            return self.estado.ids, self.estado.masa, self.estado.posicion
         cuerpos_lista = list(self.cuerpos.values())
+        masa = np.array([cuerpo.masa for cuerpo in cuerpos_lista], dtype=float)
+        posicion = np.array([cuerpo.posicion.to_list() for cuerpo in cuerpos_lista], dtype=float).reshape(-1, 3)
+        return [cuerpo.id for cuerpo in cuerpos_lista], masa, posicion
+
+    def _arrays_estado(self) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+        # Con arrays devuelve el propio almacenamiento; con objetos, copias para volcar después
+        if self.estado is not None:
+            return self.estado.ids, self.estado.masa, self.estado.posicion, self.estado.velocidad
+        ids, masa, posicion = self._arrays_masa_posicion()
+        velocidad = np.array([cuerpo.velocidad.to_list() for cuerpo in self.cuerpos.values()], dtype=float).reshape(-1, 3)
+        return ids, masa, posicion, velocidad
+
+    def _radios(self) -> np.ndarray:
+        if self.estado is not None:
+            return self.estado.radio
+        return np.array([cuerpo.radio for cuerpo in self.cuerpos.values()], dtype=float)
+
+    def _volcar_estado(self, ids: list[str], posicion: np.ndarray, velocidad: np.ndarray):
+        if self.estado is not None:
+            return
+        for c_id, pos, vel in zip(ids, posicion.tolist(), velocidad.tolist()):
+            # Vectores nuevos, no escritos en el sitio: los que haya obtenido el usuario no cambian
+            cuerpo = self.cuerpos[c_id]
+            cuerpo.posicion = Vector3D(*pos)
+            cuerpo.velocidad = Vector3D(*vel)
+
+    def _usa_bucle_objetos(self) -> bool:
+        # Camino original: objetos, suma directa y Euler semi-implícito con Vector3D
+        return self.estado is None and self.motor is None and isinstance(self.integrador, EulerSemiImplicito)
+
+    def _fuerzas_array(self, masa: np.ndarray, posicion: np.ndarray,
+                       con_potencial: bool = False) -> tuple[np.ndarray, float | None, np.ndarray | None]:
+        # Devuelve (fuerzas, energía potencial total, potencial de cada cuerpo); las dos últimas
+        # solo si se piden, y en la misma pasada que las fuerzas cuando el motor lo permite
+        motor = self.motor if self.motor is not None else self._motor_directo
+        instrumentacion = self.instrumentacion
+        if instrumentacion.activa:
+            instrumentacion.contar("evaluaciones_fuerza")
+            if self.motor is None:
+                instrumentacion.contar("pares_evaluados", len(masa) * (len(masa) - 1) // 2)
+        with instrumentacion.fase("fuerzas"):
+            if not con_potencial:
+                resultado = motor.calcular_fuerzas(masa, posicion, self.G), None, None
+            elif hasattr(motor, 'calcular_fuerzas_y_potencial'):
+                resultado = motor.calcular_fuerzas_y_potencial(masa, posicion, self.G)
+            else:
+                return motor.calcular_fuerzas(masa, posicion, self.G), energia_potencial_directa(masa, posicion, self.G), None
+        if self.motor is None:
+            instrumentacion.contar("pares_cero_omitidos", motor.pares_cero)
+        return resultado
+
+    def _version_masas(self) -> int | None:
+        # Con arrays, la versión del almacenamiento identifica el conjunto de cuerpos y sus masas
+        # sin compararlas; con objetos no hay versión y se comparan los valores
+        return self.estado.version if self.estado is not None else None
+
+    def _cache_valido(self, ids: list[str] | None, masa: np.ndarray, posicion: np.ndarray,
+                      con_potencial: bool) -> tuple | None:
+        # La última evaluación sirve si masas, posiciones, G y motor no han cambiado desde entonces
+        cache = self._cache_fuerzas
+        version = self._version_masas()
+        if (cache is not None and (cache["energia"] is not None or not con_potencial)
+                and cache["G"] == self.G and cache["motor"] is self.motor and cache["ids"] == ids
+                and (cache["version"] == version if version is not None else np.array_equal(cache["masa"], masa))
+                and np.array_equal(cache["posicion"], posicion)):
+            return cache["fuerzas"], cache["energia"], cache["potenciales"]
+        return None
+
+    def _guardar_cache(self, ids: list[str] | None, masa: np.ndarray, posicion: np.ndarray, resultado: tuple):
+        fuerzas, energia, potenciales = resultado
+        version = self._version_masas()
+        self._cache_fuerzas = {
+            "G": self.G,
+            "motor": self.motor,
+            "ids": None if ids is None else list(ids),
+            "version": version,
+            "masa": masa.copy() if version is None else None,
+            "posicion": posicion.copy(),
+            "fuerzas": fuerzas,
+            "energia": energia,
+            "potenciales": potenciales
+        }
+
+    def _gm(self, masa: np.ndarray) -> np.ndarray:
+        # G·m_i de los cuerpos en el orden de masa, reutilizado mientras no cambien G ni las masas
+        cache = self._cache_gm
+        version = self._version_masas()
+        if (cache is None or cache["G"] != self.G
+                or (cache["version"] != version if version is not None else not np.array_equal(cache["masa"], masa))):
+            cache = self._cache_gm = {"G": self.G, "version": version,
+                                      "masa": masa.copy() if version is None else None, "gm": self.G * masa}
+        return cache["gm"]
+
+    def _acoplamientos_objetos(self) -> tuple[list[CuerpoCeleste], list[float], list[float], list[list[float]] | None]:
+        # Para el bucle de objetos: lista de cuerpos, masas, G·m_i y, con hasta
+        # MAX_CUERPOS_ACOPLAMIENTO cuerpos, los acoplamientos G·m_i·m_j de cada par i < j
+        # (fila i, columna j - i - 1). Se reutilizan mientras sigan los mismos cuerpos (por
+        # identidad) con las mismas masas y la misma G; comprobarlo cuesta O(N), no O(N^2).
+        cuerpos_lista = list(self.cuerpos.values())
+        masas = [cuerpo.masa for cuerpo in cuerpos_lista]
+        cache = self._cache_acoplamientos
+        if (cache is None or cache["G"] != self.G or cache["cuerpos"] != cuerpos_lista or cache["masas"] != masas):
+            gm = [self.G * m for m in masas]
+            pares = None
+            if len(masas) <= MAX_CUERPOS_ACOPLAMIENTO:
+                pares = [[gm_i * m_j for m_j in masas[i + 1:]] for i, gm_i in enumerate(gm)]
+            cache = self._cache_acoplamientos = {"G": self.G, "cuerpos": cuerpos_lista, "masas": masas,
+                                                 "gm": gm, "pares": pares}
+        return cache["cuerpos"], cache["masas"], cache["gm"], cache["pares"]
+
+    def _fuerzas_en(self, masa: np.ndarray, posicion: np.ndarray, con_potencial: bool = False) -> tuple:
+        # Evaluación con arrays en unas posiciones dadas, reutilizando la anterior si coincide
+        resultado = self._cache_valido(None, masa, posicion, con_potencial)
+        if resultado is None:
+            resultado = self._fuerzas_array(masa, posicion, con_potencial)
+            self._guardar_cache(None, masa, posicion, resultado)
+        return resultado
+
+    def _aceleraciones_activos(self, masa: np.ndarray, posicion: np.ndarray, activos: np.ndarray) -> np.ndarray:
+        # Aceleraciones de un subconjunto de cuerpos debidas a todos los demás. Con la suma
+        # directa cuesta O(N_activos x N); otros motores evalúan todo y se queda con los activos
+        if self.motor is None:
+            instrumentacion = self.instrumentacion
+            k = len(activos)
+            if instrumentacion.activa:
+                # Pares distintos con algún cuerpo activo (los de dos activos cuentan una vez)
+                instrumentacion.contar("evaluaciones_fuerza")
+                instrumentacion.contar("pares_evaluados", k * (len(masa) - 1) - k * (k - 1) // 2)
+            with instrumentacion.fase("fuerzas"):
+                aceleraciones, _, pares_cero = _nucleo_directo(posicion[activos], posicion, self._gm(masa), False)
+            # Cada activo está a distancia cero de sí mismo; el resto son pares coincidentes, vistos
+            # dos veces si los dos cuerpos son activos
+            if instrumentacion.activa and pares_cero > k:
+                repetidos = np.unique(posicion[activos], axis=0, return_counts=True)[1]
+                pares_cero -= int(np.sum(repetidos * (repetidos - 1))) // 2
+            instrumentacion.contar("pares_cero_omitidos", pares_cero - k)
+            return aceleraciones
+        return self._fuerzas_en(masa, posicion)[0][activos] / masa[activos, None]
+
+    def _aceleraciones_particulas(self, masa: np.ndarray, pos_masivos: np.ndarray,
+                                  pos_particulas: np.ndarray) -> np.ndarray:
+        # Aceleraciones de partículas de prueba debidas a los cuerpos masivos, siempre por suma
+        # directa (O(N x K)): con pocos cuerpos masivos es exacta y más barata que cualquier motor
+        if self.instrumentacion.activa:
+            self.instrumentacion.contar("pares_evaluados", len(pos_particulas) * len(masa))
+        with self.instrumentacion.fase("fuerzas"):
+            return aceleraciones_particulas(pos_particulas, pos_masivos, self._gm(masa))
+
+    def _evaluar_fuerzas(self, con_potencial: bool = False) -> tuple:
+        # Fuerzas del estado actual: diccionarios por id en el camino de objetos y arrays por
+        # fila en los demás. Así los diagnósticos al final de un paso dejan calculadas las
+        # fuerzas del paso siguiente.
+        ids, masa, posicion = self._arrays_masa_posicion()
+        if not self._usa_bucle_objetos():
+            return self._fuerzas_en(masa, posicion, con_potencial)
+        resultado = self._cache_valido(ids, masa, posicion, con_potencial)
+        if resultado is None:
+            resultado = self._calcular_fuerzas_objetos(con_potencial)
+            self._guardar_cache(ids, masa, posicion, resultado)
+        return resultado
+
+    def calcular_fuerzas(self) -> dict[str, Vector3D]:
+        if self.estado is None and self.motor is None:
+            return self._calcular_fuerzas_objetos(con_potencial=False)[0]
+        ids, masa, posicion = self._arrays_masa_posicion()
+        fuerzas = self._fuerzas_array(masa, posicion)[0]
+        return {c_id: Vector3D(*f) for c_id, f in zip(ids, fuerzas.tolist())}
+
+    def calcular_fuerzas_y_potencial(self) -> tuple[dict[str, Vector3D], float, dict[str, float] | None]:
+        # Fuerzas netas, energía potencial total y potencial gravitatorio de cada cuerpo en una sola pasada
+        if self.estado is None and self.motor is None:
+            return self._calcular_fuerzas_objetos(con_potencial=True)
+        ids, masa, posicion = self._arrays_masa_posicion()
+        fuerzas, energia, potenciales = self._fuerzas_array(masa, posicion, con_potencial=True)
+        if potenciales is not None:
+            potenciales = dict(zip(ids, potenciales.tolist()))
+        return {c_id: Vector3D(*f) for c_id, f in zip(ids, fuerzas.tolist())}, energia, potenciales
+
+    def _calcular_fuerzas_objetos(self, con_potencial: bool) -> tuple[dict[str, Vector3D], float | None, dict[str, float] | None]:
+        instrumentacion = self.instrumentacion
+        with instrumentacion.fase("fuerzas"):
+            fuerzas_netas, energia_potencial_total, potenciales, pares_cero = self._bucle_fuerzas_objetos(con_potencial)
+        if instrumentacion.activa:
+            num_cuerpos = len(fuerzas_netas)
+            instrumentacion.contar("evaluaciones_fuerza")
+            instrumentacion.contar("pares_evaluados", num_cuerpos * (num_cuerpos - 1) // 2)
+            instrumentacion.contar("pares_cero_omitidos", pares_cero)
+        return fuerzas_netas, energia_potencial_total, potenciales
+
+    def _bucle_fuerzas_objetos(self, con_potencial: bool) -> tuple[dict[str, Vector3D], float | None, dict[str, float] | None, int]:
+        cuerpos_lista, masas, gm, acoplamientos = self._acoplamientos_objetos()
         num_cuerpos = len(cuerpos_lista)
+        fuerzas = [Vector3D(0, 0, 0) for _ in range(num_cuerpos)]
+        energia_potencial_total = 0.0 if con_potencial else None
+        potenciales = [0.0] * num_cuerpos if con_potencial else None
+        pares_cero = 0
 
         for i in range(num_cuerpos):
+            posicion1 = cuerpos_lista[i].posicion
+            fuerza1 = fuerzas[i]
+            gm1 = gm[i]
+            fila = acoplamientos[i] if acoplamientos is not None else None
             for j in range(i + 1, num_cuerpos):
-                cuerpo1 = cuerpos_lista[i]
-                cuerpo2 = cuerpos_lista[j]
+                r_vector = cuerpos_lista[j].posicion - posicion1
+                distancia_cuadrado = r_vector.magnitude_squared()
 
-                r_vector = cuerpo2.posicion - cuerpo1.posicion
-                distancia = r_vector.magnitude()
-
-                if distancia == 0:
+                if distancia_cuadrado == 0:
                     # Cuerpos en la misma posición, fuerza indefinida o muy grande
                     # Podríamos simular una colisión o simplemente evitar la división por cero
+                    pares_cero += 1
+                    if con_potencial:
+                        energia_potencial_total = float('-inf')  # Potencial infinito
                     continue
 
                 # Ley de gravitación universal: F = G * (m1 * m2) / r^2
-                # Para la forma vectorial: F_ij = G * (m_i * m_j) / r_ij^3 * (r_j - r_i)
-                fuerza_magnitud = (self.G * cuerpo1.masa * cuerpo2.masa) / (distancia**2)
-                fuerza_direccion = r_vector.normalize()
+                # Para la forma vectorial: F_ij = G * (m_i * m_j) / r_ij^3 * (r_j - r_i),
+                # con G * m_i * m_j ya precalculado: aquí solo queda la geometría
+                distancia = math.sqrt(distancia_cuadrado)
+                acoplamiento = fila[j - i - 1] if fila is not None else gm1 * masas[j]
+                coeficiente = acoplamiento / (distancia_cuadrado * distancia)
 
-                fuerza_ij = fuerza_direccion * fuerza_magnitud
-                fuerza_ji = fuerza_ij * -1.0 # La fuerza de j sobre i es igual y opuesta
+                # Acumulación en el sitio; la fuerza de j sobre i es igual y opuesta
+                fuerza1.add_scaled(r_vector, coeficiente)
+                fuerzas[j].add_scaled(r_vector, -coeficiente)
 
-                fuerzas_netas[cuerpo1.id] = fuerzas_netas[cuerpo1.id] + fuerza_ij
-                fuerzas_netas[cuerpo2.id] = fuerzas_netas[cuerpo2.id] + fuerza_ji
-        return fuerzas_netas
+                if con_potencial:
+                    # U_ij = -G * (m_i * m_j) / r_ij, con la distancia ya calculada para la fuerza
+                    energia_potencial_total -= acoplamiento / distancia
+                    potenciales[i] -= gm[j] / distancia
+                    potenciales[j] -= gm1 / distancia
 
-    def paso_simulacion(self, dt: float):
-        fuerzas = self.calcular_fuerzas()
+        ids = list(self.cuerpos)
+        fuerzas_netas = dict(zip(ids, fuerzas))
+        if con_potencial:
+            potenciales = dict(zip(ids, potenciales))
+        return fuerzas_netas, energia_potencial_total, potenciales, pares_cero
+
+    def _avanzar(self, dt: float, con_potencial: bool = False):
+        # Avanza un paso sin diagnósticos ni salida por consola. Con con_potencial las
+        # evaluaciones de fuerza del paso acumulan también el potencial, por si el paso
+        # termina con diagnósticos.
+        instrumentacion = self.instrumentacion
+        with instrumentacion.fase("integracion"):
+            if self._usa_bucle_objetos():
+                fuerzas = self._evaluar_fuerzas()[0]
+                if len(self.particulas):
+                    # Con las posiciones de los cuerpos antes de moverlos, como sus propias fuerzas
+                    _, masa, posicion = self._arrays_masa_posicion()
+                    particulas = self.particulas
+                    particulas.velocidad += self._aceleraciones_particulas(masa, posicion, particulas.posicion) * dt
+                    particulas.posicion += particulas.velocidad * dt
+
+                # Aplicar fuerzas y actualizar velocidades
+                for cuerpo_id, fuerza_neta in fuerzas.items():
+                    cuerpo = self.cuerpos[cuerpo_id]
+                    cuerpo.aplicar_fuerza(fuerza_neta, dt)
+
+                # Actualizar posiciones
+                for cuerpo in self.cuerpos.values():
+                    cuerpo.mover(dt)
+            elif len(self.particulas):
+                self._avanzar_con_particulas(dt, con_potencial)
+            else:
+                ids, masa, posicion, velocidad = self._arrays_estado()
+
+                def aceleracion(pos: np.ndarray, activos: np.ndarray | None = None) -> np.ndarray:
+                    if activos is None:
+                        return self._fuerzas_en(masa, pos, con_potencial)[0] / masa[:, None]
+                    return self._aceleraciones_activos(masa, pos, activos)
+
+                if getattr(self.integrador, 'necesita_masas', False):
+                    self.integrador.paso(posicion, velocidad, dt, aceleracion, masa=masa, G=self.G)
+                else:
+                    self.integrador.paso(posicion, velocidad, dt, aceleracion)
+                self._volcar_estado(ids, posicion, velocidad)
+        self.tiempo += dt
+        self.pasos += 1
+        if instrumentacion.activa:
+            instrumentacion.contar("pasos")
+            instrumentacion.contar("cuerpos_avanzados", len(self.cuerpos) + len(self.particulas))
+        if self.colisiones:
+            with instrumentacion.fase("colisiones"):
+                self.resolver_colisiones()
+        with instrumentacion.fase("ganchos"):
+            for gancho in self.ganchos_paso:
+                gancho(self)
+
+    def _avanzar_con_particulas(self, dt: float, con_potencial: bool):
+        # El integrador avanza cuerpos y partículas juntos, como un único estado (N + K, 3) en el
+        # que las filas n: son las partículas, para que en cada etapa del paso sientan a los
+        # cuerpos en sus posiciones de esa etapa. Los integradores que reciben masas ven las
+        # partículas con masa cero.
+        ids, masa, posicion, velocidad = self._arrays_estado()
+        particulas = self.particulas
+        n = len(masa)
+        pos_total = np.concatenate((posicion, particulas.posicion))
+        vel_total = np.concatenate((velocidad, particulas.velocidad))
 
-        # Aplicar fuerzas y actualizar velocidades
-        for cuerpo_id, fuerza_neta in fuerzas.items():
-            cuerpo = self.cuerpos[cuerpo_id]
-            cuerpo.aplicar_fuerza(fuerza_neta, dt)
+        def aceleracion(pos: np.ndarray, activos: np.ndarray | None = None) -> np.ndarray:
+            if activos is None:
+                resultado = np.empty_like(pos)
+                if n:
+                    resultado[:n] = self._fuerzas_en(masa, pos[:n], con_potencial)[0] / masa[:, None]
+                resultado[n:] = self._aceleraciones_particulas(masa, pos[:n], pos[n:])
+                return resultado
+            # Los activos vienen ordenados: primero los cuerpos y después las partículas
+            masivos = activos[activos < n]
+            resultado = np.empty((len(activos), 3))
+            if len(masivos):
+                resultado[:len(masivos)] = self._aceleraciones_activos(masa, pos[:n], masivos)
+            resultado[len(masivos):] = self._aceleraciones_particulas(masa, pos[:n], pos[activos[len(masivos):]])
+            return resultado
 
-        # Actualizar posiciones
-        for cuerpo in self.cuerpos.values():
-            cuerpo.mover(dt)
+        if getattr(self.integrador, 'necesita_masas', False):
+            masa_total = np.concatenate((masa, np.zeros(len(particulas))))
+            self.integrador.paso(pos_total, vel_total, dt, aceleracion, masa=masa_total, G=self.G)
+        else:
+            self.integrador.paso(pos_total, vel_total, dt, aceleracion)
+        posicion[:] = pos_total[:n]
+        velocidad[:] = vel_total[:n]
+        particulas.posicion = pos_total[n:]
+        particulas.velocidad = vel_total[n:]
+        self._volcar_estado(ids, posicion, velocidad)
+
+    def resolver_colisiones(self) -> list[tuple[str, list[str]]]:
+        # Fusiona los grupos de cuerpos en contacto en uno solo que conserva masa, momento lineal
+        # y volumen. Mantiene el ID el más masivo de cada grupo. Devuelve (superviviente, absorbidos)
+        # por cada fusión.
+        ids, masa, posicion, velocidad = self._arrays_estado()
+        ids = list(ids)
+        radio = self._radios()
+        pares = pares_en_contacto(posicion, radio)
+        if len(pares) == 0:
+            return []
+
+        fusiones, resultados = [], []
+        for grupo in grupos_de_colision(len(ids), pares):
+            superviviente = int(grupo[np.argmax(masa[grupo])])
+            fusiones.append((ids[superviviente], [ids[k] for k in grupo.tolist() if k != superviviente]))
+            resultados.append(fusionar(masa, posicion, velocidad, radio, grupo))
+
+        for (c_id, absorbidos), (m, pos, vel, r) in zip(fusiones, resultados):
+            cuerpo = self.cuerpos[c_id]
+            cuerpo.masa = m
+            cuerpo.posicion = Vector3D(*pos.tolist())
+            cuerpo.velocidad = Vector3D(*vel.tolist())
+            cuerpo.radio = r
+            for absorbido in absorbidos:
+                self.eliminar_cuerpo(absorbido)
+            self.instrumentacion.contar("fusiones", len(absorbidos))
+        return fusiones
+
+    def diagnosticos(self) -> dict:
+        # Energías y momento lineal totales del estado actual. La energía potencial sale de la
+        # misma pasada que las fuerzas, que quedan guardadas para el siguiente paso
+        with self.instrumentacion.fase("diagnosticos"):
+            return self._diagnosticos()
+
+    def _diagnosticos(self) -> dict:
+        energia_potencial_total = self._evaluar_fuerzas(con_potencial=True)[1]
+        if self.estado is not None:
+            energia_cinetica_total = self.estado.energia_cinetica()
+            momento_lineal_total = Vector3D(*self.estado.momento_lineal().tolist())
+        else:
+            energia_cinetica_total = sum(cuerpo.energia_cinetica() for cuerpo in self.cuerpos.values())
+
+            momento_lineal_total = Vector3D(0, 0, 0)
+            for cuerpo in self.cuerpos.values():
+                momento_lineal_total += cuerpo.velocidad * cuerpo.masa
+
+        return {
+            "tiempo": self.tiempo,
+            "energia_cinetica": energia_cinetica_total,
+            "energia_potencial": energia_potencial_total,
+            "energia_total": energia_cinetica_total + energia_potencial_total,
+            "momento_lineal": momento_lineal_total
+        }
+
+    def paso_simulacion(self, dt: float):
+        self._avanzar(dt, con_potencial=True)
 
         # Calcular y mostrar energías y momento
-        energia_cinetica_total = sum(cuerpo.energia_cinetica() for cuerpo in self.cuerpos.values())
+        self._mostrar_diagnosticos(dt, self.diagnosticos())
 
-        energia_potencial_total = 0.0
-        cuerpos_lista = list(self.cuerpos.values())
-        for i in range(len(cuerpos_lista)):
-            for j in range(i + 1, len(cuerpos_lista)):
-                cuerpo1 = cuerpos_lista[i]
-                cuerpo2 = cuerpos_lista[j]
-                energia_potencial_total += cuerpo1.energia_potencial_con(cuerpo2, self.G)
+    def ejecutar(self, n_pasos: int, dt: float, diagnosticos_cada: int = 0,
+                 callback: Callable[[dict], None] | None = None):
+        # Ejecuta n_pasos seguidos. Los diagnósticos solo se calculan cada diagnosticos_cada
+        # pasos (0 para ninguno) y se envían a callback, o se muestran por consola si no hay
+        if n_pasos < 0:
+            raise ValueError("El número de pasos no puede ser negativo.")
+        if dt <= 0:
+            raise ValueError("El paso de tiempo debe ser positivo.")
+        if diagnosticos_cada < 0:
+            raise ValueError("La frecuencia de diagnósticos debe ser 0 o mayor.")
+
+        for paso in range(1, n_pasos + 1):
+            toca_diagnostico = bool(diagnosticos_cada) and paso % diagnosticos_cada == 0
+            self._avanzar(dt, con_potencial=toca_diagnostico)
+            if toca_diagnostico:
+                diagnosticos = self.diagnosticos()
+                diagnosticos["paso"] = paso
+                if callback is not None:
+                    callback(diagnosticos)
+                else:
+                    self._mostrar_diagnosticos(dt, diagnosticos)
 
-        momento_lineal_total = Vector3D(0, 0, 0)
-        for cuerpo in self.cuerpos.values():
-            momento_lineal_total += cuerpo.velocidad * cuerpo.masa
+    def perfilar(self, n_pasos: int, dt: float, archivo: str | None = None, **opciones) -> pstats.Stats:
+        # Ejecuta n_pasos con cProfile activo (opciones como en ejecutar) y devuelve las
+        # estadísticas; con archivo, también las guarda en formato de pstats
+        perfil = cProfile.Profile()
+        perfil.runcall(self.ejecutar, n_pasos, dt, **opciones)
+        if archivo is not None:
+            perfil.dump_stats(archivo)
+        return pstats.Stats(perfil)
 
+    def _mostrar_diagnosticos(self, dt: float, diagnosticos: dict):
+        with self.instrumentacion.fase("salida"):
+            self._imprimir_diagnosticos(dt, diagnosticos)
+
+    def _imprimir_diagnosticos(self, dt: float, diagnosticos: dict):
         print(f"\n--- Paso de Simulación (dt = {dt} s) ---")
-        print(f"Energía Cinética Total: {energia_cinetica_total:.4e} J")
-        print(f"Energía Potencial Total: {energia_potencial_total:.4e} J")
-        print(f"Momento Lineal Total: {momento_lineal_total} kg·m/s")
+        print(f"Energía Cinética Total: {diagnosticos['energia_cinetica']:.4e} J")
+        print(f"Energía Potencial Total: {diagnosticos['energia_potencial']:.4e} J")
+        print(f"Momento Lineal Total: {diagnosticos['momento_lineal']} kg·m/s")
         print("------------------------------------------")
 
 
-    def guardar(self, archivo: str, formato: str = 'json'):
+    def elementos_orbitales(self, centro: str | None = None,
+                            particulas: bool = True) -> tuple[list[str], np.ndarray]:
+        # Elementos orbitales osculadores (N + K, 6), en el orden de Elementos_orbitales.ELEMENTOS,
+        # de los cuerpos y después las partículas de prueba (si se piden), respecto al baricentro
+        # (centro None) o al cuerpo centro, cuya fila queda en NaN
+        if centro is not None and centro not in self.cuerpos:
+            raise ValueError(f"No existe un cuerpo con el ID '{centro}'.")
+        ids, masa, posicion, velocidad = self._arrays_estado()
+        fila_centro = None if centro is None else list(ids).index(centro)
+        ids = list(ids)
+        if particulas and len(self.particulas):
+            masa = np.concatenate((masa, np.zeros(len(self.particulas))))
+            posicion = np.concatenate((posicion, self.particulas.posicion))
+            velocidad = np.concatenate((velocidad, self.particulas.velocidad))
+            ids += self.particulas.ids
+        return ids, elementos_estado(masa, posicion, velocidad, self.G, fila_centro)
+
+    def guardar(self, archivo: str, formato: str = 'json', elementos: bool = False, centro: str | None = None):
+        # Con elementos, guarda también los elementos orbitales de cada cuerpo respecto al
+        # baricentro o al cuerpo centro: un diccionario "elementos" por cuerpo en JSON (salvo en
+        # el centro), columnas adicionales en CSV y la columna elementos en binario
         if not self.cuerpos:
             print("No hay cuerpos para guardar.")
             return
+        tabla_elementos = self.elementos_orbitales(centro, particulas=False)[1] if elementos else None
+
+        if formato.lower() == 'binario':
+            # Columnas float64 en bloque, junto con G, el tiempo de simulación y los pasos dados
+            ids, masa, posicion, velocidad = self._arrays_estado()
+            metadatos = {"pasos": self.pasos}
+            if elementos:
+                metadatos["elementos"] = {"centro": centro, "columnas": list(ELEMENTOS)}
+            escribir_checkpoint(archivo, ids, masa, posicion, velocidad, self.G, self.tiempo, self._radios(),
+                                metadatos=metadatos, elementos=tabla_elementos)
+            print(f"Simulación guardada en '{archivo}' (binario).")
+            return
 
         data_to_save = [cuerpo.to_dict() for cuerpo in self.cuerpos.values()]
+        if elementos:
+            for datos, fila in zip(data_to_save, tabla_elementos.tolist()):
+                if datos['id'] != centro:
+                    datos['elementos'] = dict(zip(ELEMENTOS, fila))
 
         if formato.lower() == 'json':
             with open(archivo, 'w') as f:
@@ -114,8 +592,9 @@ class Simulador:
             with open(archivo, 'w', newline='') as f:
                 writer = csv.writer(f, delimiter=';')
                 # Escribir encabezado
-                writer.writerow(['id', 'masa', 'pos_x', 'pos_y', 'pos_z', 'vel_x', 'vel_y', 'vel_z'])
-                for cuerpo_data in data_to_save:
+                writer.writerow(['id', 'masa', 'pos_x', 'pos_y', 'pos_z', 'vel_x', 'vel_y', 'vel_z', 'radio']
+                                + (list(ELEMENTOS) if elementos else []))
+                for i, cuerpo_data in enumerate(data_to_save):
                     row = [
                         cuerpo_data['id'],
                         cuerpo_data['masa'],
@@ -124,47 +603,34 @@ class Simulador:
                         cuerpo_data['posicion'][2],
                         cuerpo_data['velocidad'][0],
                         cuerpo_data['velocidad'][1],
-                        cuerpo_data['velocidad'][2]
+                        cuerpo_data['velocidad'][2],
+                        cuerpo_data['radio']
                     ]
+                    if elementos:
+                        row += tabla_elementos[i].tolist()
                     writer.writerow(row)
             print(f"Simulación guardada en '{archivo}' (CSV).")
         else:
-            print(f"Formato de archivo '{formato}' no soportado. Use 'json' o 'csv'.")
+            print(f"Formato de archivo '{formato}' no soportado. Use 'json', 'csv' o 'binario'.")
 
-    def cargar(self, archivo: str, formato: str = 'json'):
+    def cargar(self, archivo: str, formato: str = 'json', perezoso: bool = True):
+        # perezoso solo afecta al formato binario (ver _cargar_binario)
         self.cuerpos.clear() # Vaciar colección antes de cargar
 
+        if formato.lower() == 'binario':
+            self._cargar_binario(archivo, perezoso)
+            return
+        if formato.lower() == 'csv':
+            self._cargar_csv(archivo)
+            return
+
         loaded_data = []
         try:
             if formato.lower() == 'json':
                 with open(archivo, 'r') as f:
                     loaded_data = json.load(f)
-            elif formato.lower() == 'csv':
-                with open(archivo, 'r', newline='') as f:
-                    reader = csv.reader(f, delimiter=';')
-                    header = next(reader) # Saltar encabezado
-                    for row in reader:
-                        # Asegurarse de que hay suficientes columnas
-                        if len(row) != 8:
-                            print(f"Advertencia: Fila CSV mal formada, saltando: {row}")
-                            continue
-
-                        try:
-                            id = row[0]
-                            masa = float(row[1])
-                            posicion = [float(row[2]), float(row[3]), float(row[4])]
-                            velocidad = [float(row[5]), float(row[6]), float(row[7])]
-                            loaded_data.append({
-                                "id": id,
-                                "masa": masa,
-                                "posicion": posicion,
-                                "velocidad": velocidad
-                            })
-                        except ValueError as e:
-                            print(f"Error de conversión en fila CSV, saltando: {row}. Error: {e}")
-                            continue
             else:
-                print(f"Formato de archivo '{formato}' no soportado. Use 'json' o 'csv'.")
+                print(f"Formato de archivo '{formato}' no soportado. Use 'json', 'csv' o 'binario'.")
                 return
         except FileNotFoundError:
             print(f"El archivo '{archivo}' no se encontró.")
@@ -182,4 +648,60 @@ class Simulador:
                 self.cuerpos[cuerpo.id] = cuerpo
             except ValueError as e:
                 print(f"Error al cargar cuerpo '{data.get('id', 'N/A')}' desde el archivo: {e}")
-        print(f"Simulación cargada desde '{archivo}'. Se cargaron {len(self.cuerpos)} cuerpos.")
\ No newline at end of file
+        print(f"Simulación cargada desde '{archivo}'. Se cargaron {len(self.cuerpos)} cuerpos.")
+
+    def _cargar_csv(self, archivo: str, filas_por_bloque: int = FILAS_POR_BLOQUE):
+        # Carga por bloques: cada bloque se valida y convierte de una vez y pasa directamente
+        # al almacén de cuerpos; las filas descartadas se resumen al final
+        resumen = ResumenCarga()
+        try:
+            for ids, masa, posicion, velocidad, radio in leer_csv_por_bloques(archivo, resumen, filas_por_bloque):
+                if self.estado is not None:
+                    self.estado.agregar_lote(ids, masa, posicion, velocidad, radio)
+                    continue
+                for c_id, m, pos, vel, r in zip(ids, masa.tolist(), posicion.tolist(), velocidad.tolist(), radio.tolist()):
+                    self.cuerpos[c_id] = CuerpoCeleste(c_id, m, Vector3D(*pos), Vector3D(*vel), r)
+        except FileNotFoundError:
+            print(f"El archivo '{archivo}' no se encontró.")
+            return
+        except Exception as e:
+            print(f"Ocurrió un error inesperado al cargar el archivo: {e}")
+            return
+        if resumen.errores:
+            print(resumen)
+        print(f"Simulación cargada desde '{archivo}'. Se cargaron {len(self.cuerpos)} cuerpos.")
+
+    def _cargar_binario(self, archivo: str, perezoso: bool = True):
+        # Restaura cuerpos, G, tiempo y pasos. Con almacenamiento 'arrays' y perezoso (por
+        # defecto) las columnas se usan directamente como memmaps en copia en escritura, sin leer
+        # el archivo entero: las páginas se leen al usarse y el archivo no se modifica. Guardar
+        # encima es seguro porque escribir_checkpoint sustituye el archivo en lugar de
+        # reescribirlo. Sin perezoso se copian a memoria y el archivo se puede borrar después.
+        try:
+            datos = leer_checkpoint(archivo)
+        except FileNotFoundError:
+            print(f"El archivo '{archivo}' no se encontró.")
+            return
+        except ValueError as e:
+            print(f"Error al cargar el checkpoint: {e}")
+            return
+        # Comprobar las masas leería todas las páginas de la columna: en modo perezoso con
+        # arrays se confía en el archivo, que solo escribe guardar con masas ya validadas
+        perezoso = perezoso and self.estado is not None
+        if not perezoso and np.any(datos["masa"] <= 0):
+            print("Error al cargar el checkpoint: La masa de un cuerpo celeste debe ser mayor que cero.")
+            return
+
+        self.G = datos["G"]
+        self.tiempo = datos["tiempo"]
+        self.pasos = datos["metadatos"].get("pasos", 0)
+        if self.estado is not None:
+            columnas = [datos[nombre] for nombre in ("masa", "posicion", "velocidad", "radio")]
+            if not perezoso:
+                columnas = [np.array(columna, copy=True) for columna in columnas]
+            self.estado.reemplazar(datos["ids"], *columnas)
+        else:
+            for c_id, masa, pos, vel, radio in zip(datos["ids"], datos["masa"].tolist(), datos["posicion"].tolist(),
+                                                   datos["velocidad"].tolist(), datos["radio"].tolist()):
+                self.cuerpos[c_id] = CuerpoCeleste(c_id, masa, Vector3D(*pos), Vector3D(*vel), radio)
+        print(f"Simulación cargada desde '{archivo}'. Se cargaron {len(self.cuerpos)} cuerpos.")
@@ -0,0 +1,158 @@
+import json
+import os
+import numpy as np
+
+# Una trayectoria son dos archivos:
+#   <archivo>      MAGIA | longitud de la cabecera (uint64) | cabecera JSON | marcos
+#                  Cada marco son las posiciones y velocidades (2, N, 3) en float64. El archivo
+#                  se reserva por adelantado y duplica su tamaño cuando se llena.
+#   <archivo>.idx  Índice de solo añadido con un registro (tiempo, paso, desplazamiento) por marco
+# Los datos de cada marco se vuelcan al sistema operativo antes de escribir su registro de índice,
+# así que todo marco indexado está completo aunque el proceso termine sin cerrar el grabador.
+# Ante un corte de corriente solo se garantiza lo grabado hasta el último vaciar() o cerrar().
+MAGIA = b"NTRAYEC1"
+ALINEACION = 64
+REGISTRO_INDICE = np.dtype([("tiempo", "<f8"), ("paso", "<i8"), ("desplazamiento", "<i8")])
+
+
+def _archivo_indice(archivo: str) -> str:
+    return archivo + ".idx"
+
+
+class GrabadorTrayectoria:
+    # Graba el estado de un Simulador cada `cada` pasos. Se engancha con conectar(simulador),
+    # que además graba el estado actual como primer marco.
+    def __init__(self, archivo: str, cada: int = 1, capacidad_inicial: int = 64):
+        if cada < 1:
+            raise ValueError("El intervalo de grabación debe ser al menos 1.")
+        self.archivo = archivo
+        self.cada = cada
+        self.capacidad_inicial = max(1, capacidad_inicial)
+        self.num_marcos = 0
+        self.ids: list[str] | None = None
+        self._datos = None
+        self._indice = None
+        self._inicio_marcos = 0
+        self._bytes_marco = 0
+        self._capacidad = 0
+        self._simulador = None
+
+    def conectar(self, simulador):
+        self._simulador = simulador
+        simulador.ganchos_paso.append(self)
+        self.grabar(simulador)
+
+    def __call__(self, simulador):
+        if simulador.pasos % self.cada == 0:
+            self.grabar(simulador)
+
+    def _abrir(self, ids: list[str]):
+        self.ids = list(ids)
+        cabecera = json.dumps({"ids": self.ids, "num_cuerpos": len(self.ids)}).encode("utf-8")
+        self._inicio_marcos = -(-(len(MAGIA) + 8 + len(cabecera)) // ALINEACION) * ALINEACION
+        self._bytes_marco = 2 * len(self.ids) * 3 * 8
+        self._datos = open(self.archivo, "wb+")
+        self._datos.write(MAGIA)
+        self._datos.write(np.uint64(len(cabecera)).astype("<u8").tobytes())
+        self._datos.write(cabecera)
+        self._reservar(self.capacidad_inicial)
+        self._indice = open(_archivo_indice(self.archivo), "wb")
+
+    def _reservar(self, capacidad: int):
+        self._capacidad = capacidad
+        self._datos.truncate(self._inicio_marcos + capacidad * self._bytes_marco)
+
+    def grabar(self, simulador):
+        ids, _, posicion, velocidad = simulador._arrays_estado()
+        if self._datos is None:
+            self._abrir(ids)
+        elif list(ids) != self.ids:
+            raise ValueError("Los cuerpos de la simulación cambiaron; empiece una trayectoria nueva.")
+
+        if self.num_marcos == self._capacidad:
+            self._reservar(2 * self._capacidad)
+        desplazamiento = self._inicio_marcos + self.num_marcos * self._bytes_marco
+        self._datos.seek(desplazamiento)
+        self._datos.write(np.ascontiguousarray(posicion, dtype="<f8").tobytes())
+        self._datos.write(np.ascontiguousarray(velocidad, dtype="<f8").tobytes())
+        self._datos.flush()
+        registro = np.array([(simulador.tiempo, simulador.pasos, desplazamiento)], dtype=REGISTRO_INDICE)
+        self._indice.write(registro.tobytes())
+        self.num_marcos += 1
+
+    def vaciar(self):
+        # Lleva a disco lo grabado, para que un LectorTrayectoria lo vea sin cerrar el grabador.
+        # Los datos se sincronizan antes que el índice, que nunca apunta a marcos sin escribir.
+        if self._datos is not None:
+            self._datos.flush()
+            os.fsync(self._datos.fileno())
+            self._indice.flush()
+            os.fsync(self._indice.fileno())
+
+    def cerrar(self):
+        # Se desengancha del simulador y recorta la reserva sobrante del archivo
+        if self._simulador is not None:
+            if self in self._simulador.ganchos_paso:
+                self._simulador.ganchos_paso.remove(self)
+            self._simulador = None
+        if self._datos is not None:
+            self._datos.truncate(self._inicio_marcos + self.num_marcos * self._bytes_marco)
+            self.vaciar()
+            self._datos.close()
+            self._indice.close()
+            self._datos = None
+            self._indice = None
+
+    def __enter__(self) -> 'GrabadorTrayectoria':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class LectorTrayectoria:
+    # Acceso aleatorio a una trayectoria grabada: el índice y los marcos se abren con
+    # numpy.memmap, así que leer el marco k no depende del número de marcos anteriores
+    def __init__(self, archivo: str):
+        with open(archivo, "rb") as f:
+            if f.read(len(MAGIA)) != MAGIA:
+                raise ValueError(f"El archivo '{archivo}' no es una trayectoria válida.")
+            longitud = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+            cabecera = json.loads(f.read(longitud).decode("utf-8"))
+        self.ids: list[str] = cabecera["ids"]
+        num_cuerpos = cabecera["num_cuerpos"]
+
+        archivo_indice = _archivo_indice(archivo)
+        num_marcos = os.path.getsize(archivo_indice) // REGISTRO_INDICE.itemsize
+        if num_marcos == 0 or num_cuerpos == 0:
+            self.indice = np.fromfile(archivo_indice, dtype=REGISTRO_INDICE)
+            self.marcos = np.zeros((num_marcos, 2, num_cuerpos, 3))
+            return
+        self.indice = np.memmap(archivo_indice, dtype=REGISTRO_INDICE, mode="r", shape=(num_marcos,))
+        # Los marcos son contiguos y del mismo tamaño: una sola vista (marcos, 2, N, 3)
+        self.marcos = np.memmap(archivo, dtype="<f8", mode="r", offset=int(self.indice["desplazamiento"][0]),
+                                shape=(num_marcos, 2, num_cuerpos, 3))
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    @property
+    def tiempos(self) -> np.ndarray:
+        return self.indice["tiempo"]
+
+    @property
+    def pasos(self) -> np.ndarray:
+        return self.indice["paso"]
+
+    @property
+    def posiciones(self) -> np.ndarray:
+        # Vista (marcos, N, 3) de todas las posiciones
+        return self.marcos[:, 0]
+
+    @property
+    def velocidades(self) -> np.ndarray:
+        return self.marcos[:, 1]
+
+    def marco(self, k: int) -> tuple[float, np.ndarray, np.ndarray]:
+        # (tiempo, posicion (N, 3), velocidad (N, 3)) del marco k, sin leer los demás
+        return float(self.indice["tiempo"][k]), self.marcos[k, 0], self.marcos[k, 1]
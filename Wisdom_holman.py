@@ -0,0 +1,133 @@
+from Estado_arrays import aceleraciones_directas
+from collections.abc import Callable
+import numpy as np
+
+# Número máximo de iteraciones al resolver la ecuación universal de Kepler
+ITERACIONES_KEPLER = 50
+
+
+def _stumpff(z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Funciones de Stumpff c2(z) = (1 - cos sqrt z) / z y c3(z) = (sqrt z - sin sqrt z) / sqrt(z)^3,
+    # con su continuación hiperbólica para z < 0 y la serie de Taylor cerca de 0 (donde las
+    # fórmulas cerradas pierden cifras por cancelación)
+    c2 = np.empty_like(z)
+    c3 = np.empty_like(z)
+    pequeno = np.abs(z) < 0.1
+    eliptico = (z >= 0.1)
+    hiperbolico = (z <= -0.1)
+
+    zs = z[pequeno]
+    c2[pequeno] = 1 / 2 - zs * (1 / 24 - zs * (1 / 720 - zs * (1 / 40320 - zs / 3628800)))
+    c3[pequeno] = 1 / 6 - zs * (1 / 120 - zs * (1 / 5040 - zs * (1 / 362880 - zs / 39916800)))
+    raiz = np.sqrt(z[eliptico])
+    c2[eliptico] = (1 - np.cos(raiz)) / z[eliptico]
+    c3[eliptico] = (raiz - np.sin(raiz)) / raiz ** 3
+    raiz = np.sqrt(-z[hiperbolico])
+    c2[hiperbolico] = (np.cosh(raiz) - 1) / -z[hiperbolico]
+    c3[hiperbolico] = (np.sinh(raiz) - raiz) / raiz ** 3
+    return c2, c3
+
+
+def deriva_kepler(posicion: np.ndarray, velocidad: np.ndarray, mu: float, dt: float):
+    # Avanza en el sitio cada fila (r, v) por su órbita kepleriana alrededor de una masa fija con
+    # parámetro gravitatorio mu durante dt, de forma analítica: variable universal chi, ecuación
+    # universal de Kepler resuelta con el método de Laguerre-Conway (converge para órbitas
+    # elípticas, parabólicas e hiperbólicas) y funciones f y g de Lagrange.
+    r0 = np.sqrt(np.einsum('ij,ij->i', posicion, posicion))
+    v02 = np.einsum('ij,ij->i', velocidad, velocidad)
+    sigma0 = np.einsum('ij,ij->i', posicion, velocidad) / np.sqrt(mu)  # r0 * vr0 / sqrt(mu)
+    alfa = 2 / r0 - v02 / mu  # Inverso del semieje mayor (negativo en órbitas hiperbólicas)
+    raiz_mu = np.sqrt(mu)
+
+    # Estimación inicial: chi = sqrt(mu) * alfa * dt es exacta para órbitas circulares
+    chi = raiz_mu * dt * np.where(alfa > 0, alfa, 1 / r0)
+    n = 5.0
+    for _ in range(ITERACIONES_KEPLER):
+        z = alfa * chi * chi
+        c2, c3 = _stumpff(z)
+        chi2 = chi * chi
+        f = sigma0 * chi2 * c2 + (1 - alfa * r0) * chi2 * chi * c3 + r0 * chi - raiz_mu * dt
+        df = sigma0 * chi * (1 - z * c3) + (1 - alfa * r0) * chi2 * c2 + r0  # = r(chi) > 0
+        d2f = sigma0 * (1 - z * c2) + (1 - alfa * r0) * chi * (1 - z * c3)
+        raiz = np.sqrt(np.abs((n - 1) ** 2 * df * df - n * (n - 1) * f * d2f))
+        delta = n * f / (df + np.copysign(raiz, df))
+        chi = chi - delta
+        if np.all(np.abs(delta) <= 1e-15 * np.maximum(1.0, np.abs(chi))):
+            break
+
+    z = alfa * chi * chi
+    c2, c3 = _stumpff(z)
+    chi2 = chi * chi
+    f = 1 - chi2 / r0 * c2
+    g = dt - chi2 * chi / raiz_mu * c3
+    nueva = f[:, None] * posicion + g[:, None] * velocidad
+    r = np.sqrt(np.einsum('ij,ij->i', nueva, nueva))
+    df = raiz_mu / (r * r0) * chi * (z * c3 - 1)
+    dg = 1 - chi2 / r * c2
+    velocidad[:] = df[:, None] * posicion + dg[:, None] * velocidad
+    posicion[:] = nueva
+
+
+class WisdomHolman:
+    # Integrador simpléctico de variables mixtas de Wisdom y Holman (1991) para sistemas dominados
+    # por una masa central, en coordenadas heliocéntricas democráticas (Duncan, Levison y Lee, 1998):
+    # posiciones relativas a la masa central y velocidades baricéntricas. El hamiltoniano se separa en
+    #   H_kepler      órbita de cada cuerpo alrededor de la masa central, resuelta de forma analítica
+    #   H_interaccion atracción entre los demás cuerpos, aplicada como kicks
+    #   H_salto       (sum_i p_i)^2 / (2 m_0), un desplazamiento común de las posiciones heliocéntricas
+    # y cada paso es kick(dt/2) salto(dt/2) kepler(dt) salto(dt/2) kick(dt/2). El error de energía no
+    # crece con el tiempo y es del orden de (m_planetas / m_0) * dt^2, así que admite pasos de una
+    # fracción apreciable del periodo orbital más corto (p. ej. 1/20) en lugar de los cientos de
+    # pasos por órbita que necesitan los integradores genéricos.
+    #
+    # La masa central es la mayor. Las interacciones entre los demás cuerpos se suman directamente,
+    # sin el motor de fuerzas del simulador, que no sabe separar la atracción de la masa central.
+    nombre = 'wisdom_holman'
+    necesita_masas = True  # Simulador le pasa masa y G en cada paso
+
+    def paso(self, posicion: np.ndarray, velocidad: np.ndarray, dt: float, aceleracion: Callable[..., np.ndarray],
+             masa: np.ndarray | None = None, G: float | None = None):
+        if masa is None or G is None:
+            raise ValueError("El integrador de Wisdom-Holman necesita las masas y G.")
+        if len(masa) < 2:
+            posicion += velocidad * dt
+            return
+
+        central = int(np.argmax(masa))
+        otros = np.arange(len(masa)) != central
+        m0 = masa[central]
+        m = masa[otros]
+        masa_total = float(masa.sum())
+        centro_masas = masa @ posicion / masa_total
+        velocidad_centro = masa @ velocidad / masa_total
+
+        # A coordenadas heliocéntricas democráticas
+        q = posicion[otros] - posicion[central]
+        u = velocidad[otros] - velocidad_centro
+        gm = G * m
+        # Solo atraen los cuerpos con masa: las partículas de prueba (masa cero) no son fuentes
+        fuentes = gm > 0
+
+        def kick(h: float):
+            if fuentes.all():
+                u[:] += aceleraciones_directas(q, q, gm) * h
+            elif fuentes.any():
+                u[:] += aceleraciones_directas(q, q[fuentes], gm[fuentes]) * h
+
+        def salto(h: float):
+            q[:] += (m @ u) / m0 * h
+
+        kick(dt / 2)
+        salto(dt / 2)
+        deriva_kepler(q, u, G * m0, dt)
+        salto(dt / 2)
+        kick(dt / 2)
+
+        # De vuelta a posiciones y velocidades baricéntricas absolutas; el centro de masas se
+        # mueve en línea recta
+        centro_masas = centro_masas + velocidad_centro * dt
+        posicion_central = centro_masas - (m @ q) / masa_total
+        posicion[central] = posicion_central
+        posicion[otros] = q + posicion_central
+        velocidad[central] = velocidad_centro - (m @ u) / m0
+        velocidad[otros] = u + velocidad_centro
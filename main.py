@@ -1,7 +1,16 @@
 from Simulador import Simulador
 from Lanzador import Lanzador
+from Ejecucion_batch import ejecutar_batch
+import sys
+
+def main(argumentos: list[str] | None = None):
+    # Con argumentos (p. ej. --escenario escenario.json) se ejecuta sin interacción y se sale
+    # con el código de la ejecución; sin ellos se abre el menú interactivo
+    if argumentos is None:
+        argumentos = sys.argv[1:]
+    if argumentos:
+        sys.exit(ejecutar_batch(argumentos))
 
-def main():
     simulador = Simulador(G=6.674e-11) # Valor típico de la constante G
     cli = Lanzador(simulador)
 
@@ -16,4 +25,4 @@ def main():
         cli.ejecutar_opcion(opcion)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()